@@ -0,0 +1,138 @@
+"""Cache module of kytos/pathfinder Kytos Network Application."""
+
+import json
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+from napps.kytos.pathfinder.utils import edge_key
+
+
+class ResultCache:
+    """Bounded LRU cache of path results with a time to live.
+
+    Results are keyed on a normalized request payload and cached along
+    with the hashable dependencies they were computed from, which are
+    reverse indexed so that publishing a new graph generation only
+    invalidates the results depending on what changed. Results are only
+    served to and accepted from the latest generation the cache was
+    invalidated for. A ``size`` of 0 disables the cache and a ``ttl`` of 0
+    keeps results until they are evicted.
+    """
+
+    def __init__(self, size, ttl=0, generation=0):
+        self.size = size
+        self.ttl = ttl
+        self.generation = generation
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._dependents = {}
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(payload):
+        """Return the cache key of a payload."""
+        return json.dumps(payload, sort_keys=True, default=str)
+
+    @staticmethod
+    def dependencies(paths, spf_attribute, metrics):
+        """Return what computing paths with these parameters depends on.
+
+        They are ("edge", key) for each edge the paths traverse, the
+        ("weight", spf_attribute) and a ("metric", metric) for each
+        constrained metric, like the ones that
+        ``KytosGraph.changed_dependencies`` invalidates.
+        """
+        dependencies = {("weight", spf_attribute)}
+        dependencies.update(("metric", metric) for metric in metrics)
+        for path in paths:
+            hops = path["hops"] if isinstance(path, dict) else path
+            for endpoint_a, endpoint_b in zip(hops, hops[1:]):
+                dependencies.add(("edge", edge_key(endpoint_a, endpoint_b)))
+        return dependencies
+
+    def _remove(self, key):
+        """Remove an entry and its reverse index references."""
+        _, _, dependencies = self._entries.pop(key)
+        for dependency in dependencies:
+            keys = self._dependents[dependency]
+            keys.discard(key)
+            if not keys:
+                del self._dependents[dependency]
+
+    def get(self, key, generation):
+        """Return the cached result of a key for a generation or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and monotonic() - entry[0] > self.ttl:
+                self._remove(key)
+                self.evictions += 1
+                entry = None
+            if entry is None or generation != self.generation:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, result, generation, dependencies):
+        """Cache a result computed on a generation.
+
+        Results of other generations than the latest one are discarded,
+        and the least recently used results are evicted if full.
+        """
+        if not self.size:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            dependencies = frozenset(dependencies)
+            self._entries[key] = (monotonic(), result, dependencies)
+            for dependency in dependencies:
+                self._dependents.setdefault(dependency, set()).add(key)
+            while len(self._entries) > self.size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, generation, dependencies=None):
+        """Move on to a new generation, invalidating the affected results.
+
+        Only the results with any of the given ``dependencies`` are
+        removed, or all of them if they are None.
+        """
+        with self._lock:
+            self.generation = generation
+            if dependencies is None:
+                keys = set(self._entries)
+            else:
+                keys = set()
+                for dependency in dependencies:
+                    keys.update(self._dependents.get(dependency, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+    def clear(self):
+        """Remove all the cached results."""
+        with self._lock:
+            self._entries.clear()
+            self._dependents.clear()
+
+    @property
+    def stats(self):
+        """Return the cache counters."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,625 @@
+"""Compressed sparse row graph engine of kytos/pathfinder Kytos Network App."""
+
+# pylint: disable=too-many-arguments,too-many-locals,too-many-branches
+from array import array
+from heapq import heappop, heappush
+from itertools import count
+from math import inf
+
+from napps.kytos.pathfinder.landmarks import LandmarkSearch
+from napps.kytos.pathfinder.utils import Path
+
+
+class CSRGraph:
+    """Compact integer indexed switch level representation of a graph.
+
+    Interfaces that only have the edge to their switch, which is given by
+    their ``switch`` node attribute, and at most one link are contracted
+    into their switch, every other node id is interned into a contiguous
+    index. Each remaining edge of the graph gets an edge index, its node id
+    endpoints are kept in ``edge_ends`` and the arcs of node ``u`` are
+    ``targets[offsets[u]:offsets[u + 1]]`` with ``arc_edges`` mapping each
+    arc to its edge index, which is used to index the per spf attribute
+    ``weights`` arrays. The weight of an edge includes the weights of the
+    switch edges of its contracted endpoints, so that searching the
+    contracted graph yields the costs of the original one. Edges whose
+    endpoints are contracted into the same node have no arcs.
+    """
+
+    def __init__(self, graph, weight_funcs):
+        self.owners = {}
+        for node, switch in graph.nodes(data="switch"):
+            if switch is not None and switch in graph[node] and len(graph[node]) <= 2:
+                self.owners[node] = switch
+        self.node_ids = [node for node in graph if node not in self.owners]
+        self.node_index = {node: idx for idx, node in enumerate(self.node_ids)}
+        self.port_weights = {name: {} for name in weight_funcs}
+        for node, switch in self.owners.items():
+            for name, func in weight_funcs.items():
+                weight = func(node, switch, graph[node][switch])
+                if weight != 1:
+                    self.port_weights[name][node] = weight
+        self.edge_ends = []
+        self.loop_edges = {}
+        self.weights = {name: array("d") for name in weight_funcs}
+
+        arcs = [[] for _ in self.node_ids]
+        edge_ids = {}
+        for node, nbrs in graph.adjacency():
+            owner = self.owners.get(node)
+            for nbr, data in nbrs.items():
+                if nbr == owner or self.owners.get(nbr) == node:
+                    continue
+                edge_id = edge_ids.get(id(data))
+                if edge_id is None:
+                    edge_id = edge_ids[id(data)] = len(self.edge_ends)
+                    self.edge_ends.append((node, nbr))
+                    for name, func in weight_funcs.items():
+                        self.weights[name].append(
+                            self._edge_weight(name, func, node, nbr, data)
+                        )
+                idx = self.node_index[owner or node]
+                nbr_idx = self.node_index[self.owners.get(nbr, nbr)]
+                if idx != nbr_idx:
+                    arcs[idx].append((nbr_idx, edge_id))
+                else:
+                    self.loop_edges[frozenset((node, nbr))] = edge_id
+
+        self.offsets = array("i", [0])
+        self.targets = array("i")
+        self.arc_edges = array("i")
+        for node_arcs in arcs:
+            for nbr_idx, edge_id in node_arcs:
+                self.targets.append(nbr_idx)
+                self.arc_edges.append(edge_id)
+            self.offsets.append(len(self.targets))
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    @property
+    def number_of_edges(self):
+        """Return the number of edges that were not contracted."""
+        return len(self.edge_ends)
+
+    def copy(self):
+        """Return a copy that can have its weights updated.
+
+        The structural arrays are never mutated so they are shared.
+        """
+        csr = CSRGraph.__new__(CSRGraph)
+        csr.__dict__.update(self.__dict__)
+        csr.weights = {name: values[:] for name, values in self.weights.items()}
+        return csr
+
+    def port_weight(self, name, node):
+        """Return the weight of the switch edge of a contracted node."""
+        if node not in self.owners:
+            return 0
+        return self.port_weights[name].get(node, 1)
+
+    def _edge_weight(self, name, func, endpoint_a, endpoint_b, data):
+        """Return the weight of an edge including its switch edges."""
+        return (
+            func(endpoint_a, endpoint_b, data)
+            + self.port_weight(name, endpoint_a)
+            + self.port_weight(name, endpoint_b)
+        )
+
+    def index(self, node):
+        """Return the index of the node a node id is contracted into."""
+        return self.node_index[self.owners.get(node, node)]
+
+    def edge_id(self, endpoint_a, endpoint_b):
+        """Return the edge index between two node ids or None."""
+        try:
+            node = self.index(endpoint_a)
+            self.index(endpoint_b)
+        except KeyError:
+            return None
+        ends = {endpoint_a, endpoint_b}
+        for arc in range(self.offsets[node], self.offsets[node + 1]):
+            edge_id = self.arc_edges[arc]
+            if set(self.edge_ends[edge_id]) == ends:
+                return edge_id
+        return self.loop_edges.get(frozenset(ends))
+
+    def node_edges(self, node):
+        """Return the edge indexes of a contracted node id."""
+        owner = self.node_index[self.owners[node]]
+        edges = []
+        for arc in range(self.offsets[owner], self.offsets[owner + 1]):
+            edge_id = self.arc_edges[arc]
+            if node in self.edge_ends[edge_id]:
+                edges.append(edge_id)
+        for ends, edge_id in self.loop_edges.items():
+            if node in ends:
+                edges.append(edge_id)
+        return edges
+
+    def update_weights(self, endpoint_a, endpoint_b, data, weight_funcs):
+        """Update the weights of an edge given its data."""
+        edge_id = self.edge_id(endpoint_a, endpoint_b)
+        if edge_id is None:
+            return
+        for name, func in weight_funcs.items():
+            self.weights[name][edge_id] = self._edge_weight(
+                name, func, endpoint_a, endpoint_b, data
+            )
+
+    def edge_mask(self, edges):
+        """Return a packed bit mask of the edges given as node id pairs.
+
+        Switch edges of contracted nodes are always allowed.
+        """
+        mask = bytearray((self.number_of_edges + 7) // 8)
+        for endpoint_a, endpoint_b, *_ in edges:
+            edge_id = self.edge_id(endpoint_a, endpoint_b)
+            if edge_id is not None:
+                mask[edge_id >> 3] |= 1 << (edge_id & 7)
+        return bytes(mask)
+
+    def path_ids(self, nodes):
+        """Map a path of node indexes back to node ids."""
+        return [self.node_ids[node] for node in nodes]
+
+
+class Query:
+    """Search view of a CSR graph between two node ids.
+
+    Contracted source and target node ids are detached from their switch
+    as virtual nodes, indexed after the CSR nodes, which are joined to
+    their switch by a virtual edge and to the peer of their link by a
+    virtual copy of it. The detached links are in ``detached`` and must
+    be ignored by the searches, while the virtual arcs of a node are in
+    ``extra`` as (nbr, edge, weight) tuples, virtual edges being indexed
+    after the CSR edges. If ``target`` is a list of candidate node ids, it
+    is searched as a virtual sink, joined to each known candidate by a
+    virtual edge with no weight, which is removed from the hops.
+    """
+
+    def __init__(self, csr, source, target, weight, mask=None):
+        self.csr = csr
+        self.weight = weight
+        self.weights = csr.weights[weight]
+        self.mask = mask
+        self.extra = {}
+        self.detached = set()
+        self.virtual_nodes = {}
+        self.virtual_edges = {}
+        self.edge_weights = {}
+        self.source = self._resolve(source)
+        if isinstance(target, list):
+            self.target = self._resolve_sink(target)
+        else:
+            self.target = self._resolve(target)
+        for edge_id in sorted(self.detached):
+            if mask is None or mask[edge_id >> 3] >> (edge_id & 7) & 1:
+                endpoint_a, endpoint_b = csr.edge_ends[edge_id]
+                weight = self.weights[edge_id]
+                for endpoint in (endpoint_a, endpoint_b):
+                    if endpoint in self.virtual_nodes:
+                        weight -= csr.port_weight(self.weight, endpoint)
+                self._add_edge(
+                    self._side(endpoint_a), self._side(endpoint_b), weight, edge_id
+                )
+
+    def _resolve(self, node):
+        """Return the index a source or target node id is searched from."""
+        if node in self.csr.node_index:
+            return self.csr.node_index[node]
+        if node in self.virtual_nodes:
+            return self.virtual_nodes[node]
+        owner = self.csr.node_index[self.csr.owners[node]]
+        virtual = len(self.csr) + len(self.virtual_nodes)
+        self.virtual_nodes[node] = virtual
+        self._add_edge(virtual, owner, self.csr.port_weight(self.weight, node))
+        self.detached.update(self.csr.node_edges(node))
+        return virtual
+
+    def _resolve_sink(self, candidates):
+        """Return the index of a virtual sink joined to some candidates."""
+        indexes = []
+        for candidate in candidates:
+            try:
+                indexes.append(self._resolve(candidate))
+            except KeyError:
+                continue
+        if not indexes:
+            raise KeyError(candidates)
+        sink = len(self.csr) + len(self.virtual_nodes)
+        self.virtual_nodes[None] = sink
+        for index in dict.fromkeys(indexes):
+            self._add_edge(index, sink, 0)
+        return sink
+
+    def _side(self, node):
+        """Return the index a node id is searched as."""
+        if node in self.virtual_nodes:
+            return self.virtual_nodes[node]
+        return self.csr.index(node)
+
+    def _add_edge(self, node, nbr, weight, edge_id=None):
+        """Add a virtual edge, copying the given CSR edge if any."""
+        if node == nbr:
+            return
+        virtual = self.csr.number_of_edges + len(self.virtual_edges)
+        self.virtual_edges[virtual] = edge_id
+        self.edge_weights[virtual] = weight
+        self.extra.setdefault(node, []).append((nbr, virtual, weight))
+        self.extra.setdefault(nbr, []).append((node, virtual, weight))
+
+    def __getitem__(self, edge_id):
+        """Return the weight of a CSR or virtual edge."""
+        if edge_id in self.edge_weights:
+            return self.edge_weights[edge_id]
+        return self.weights[edge_id]
+
+    def search(self, spur_node, ignore_nodes, ignore_edges, cutoff=None):
+        """Search the shortest path from a spur node to the target."""
+        if self.detached:
+            ignore_edges = ignore_edges | self.detached
+        return bidirectional_dijkstra(
+            self.csr,
+            self.weights,
+            spur_node,
+            self.target,
+            ignore_nodes,
+            ignore_edges,
+            self.mask,
+            self.extra,
+            cutoff,
+        )
+
+    def hops(self, nodes, edges):
+        """Expand a path of indexes back to the node ids of the graph."""
+        names = {virtual: node for node, virtual in self.virtual_nodes.items()}
+        node_ids = self.csr.node_ids
+
+        def name(node):
+            return names[node] if node in names else node_ids[node]
+
+        hops = [name(nodes[0])]
+        for node, nbr, edge_id in zip(nodes, nodes[1:], edges):
+            edge_id = self.virtual_edges.get(edge_id, edge_id)
+            if edge_id is not None:
+                endpoint_a, endpoint_b = self.csr.edge_ends[edge_id]
+                if self._side(endpoint_a) != node:
+                    endpoint_a, endpoint_b = endpoint_b, endpoint_a
+                for endpoint in (endpoint_a, endpoint_b):
+                    if endpoint not in (name(node), name(nbr)):
+                        hops.append(endpoint)
+            hops.append(name(nbr))
+        if hops[-1] is None:
+            hops.pop()
+        return hops
+
+
+def bidirectional_dijkstra(
+    csr,
+    weights,
+    source,
+    target,
+    ignore_nodes=(),
+    ignore_edges=(),
+    mask=None,
+    extra=None,
+    cutoff=None,
+):
+    """Return the (cost, nodes, edges) shortest path or None.
+
+    ``ignore_nodes`` and ``ignore_edges`` are containers of node and edge
+    indexes that must not be used, ``mask`` an optional packed bit mask
+    of the CSR edges that are allowed and ``extra`` an optional dict of
+    the virtual (nbr, edge, weight) arcs of each node. Like networkx, both
+    directions are expanded alternately until a node is settled by both
+    of them. If a ``cutoff`` is given, None is returned as soon as a
+    direction settles a node farther than it, since every node of a path
+    that costs at most the cutoff is closer than it from both ends.
+    """
+    if source in ignore_nodes or target in ignore_nodes:
+        return None
+    if source == target:
+        return 0, [source], []
+    offsets, targets, arc_edges = csr.offsets, csr.targets, csr.arc_edges
+    num_nodes = len(csr)
+    extra = extra or {}
+    dists = ({}, {})
+    seen = ({source: 0}, {target: 0})
+    preds = ({source: None}, {target: None})
+    fringe = ([(0, 0, source)], [(0, 1, target)])
+    counter = count(2)
+    best_cost, meet = inf, None
+    direction = 1
+    while fringe[0] and fringe[1]:
+        direction = 1 - direction
+        cost, _, node = heappop(fringe[direction])
+        settled = dists[direction]
+        if node in settled:
+            continue
+        if cutoff is not None and cost > cutoff:
+            return None
+        settled[node] = cost
+        if node in dists[1 - direction]:
+            if cutoff is not None and best_cost > cutoff:
+                return None
+            nodes, edges = _join_paths(preds, meet)
+            return best_cost, nodes, edges
+        node_seen, node_preds = seen[direction], preds[direction]
+        other_seen = seen[1 - direction]
+        if node < num_nodes:
+            for arc in range(offsets[node], offsets[node + 1]):
+                edge = arc_edges[arc]
+                if edge in ignore_edges or (
+                    mask is not None and not mask[edge >> 3] >> (edge & 7) & 1
+                ):
+                    continue
+                nbr = targets[arc]
+                if nbr in settled or nbr in ignore_nodes:
+                    continue
+                nbr_cost = cost + weights[edge]
+                if nbr not in node_seen or nbr_cost < node_seen[nbr]:
+                    node_seen[nbr] = nbr_cost
+                    node_preds[nbr] = (node, edge)
+                    heappush(fringe[direction], (nbr_cost, next(counter), nbr))
+                    total = nbr_cost + other_seen.get(nbr, inf)
+                    if total < best_cost:
+                        best_cost, meet = total, nbr
+        for nbr, edge, weight in extra.get(node, ()):
+            if edge in ignore_edges or nbr in settled or nbr in ignore_nodes:
+                continue
+            nbr_cost = cost + weight
+            if nbr not in node_seen or nbr_cost < node_seen[nbr]:
+                node_seen[nbr] = nbr_cost
+                node_preds[nbr] = (node, edge)
+                heappush(fringe[direction], (nbr_cost, next(counter), nbr))
+                total = nbr_cost + other_seen.get(nbr, inf)
+                if total < best_cost:
+                    best_cost, meet = total, nbr
+    return None
+
+
+class ShortestPathTree:
+    """Shortest path tree of the nodes of a query towards its target.
+
+    The tree is computed once per query, ``dists`` maps the nodes that
+    reach the target to their cost to it and ``succs`` to the (node, edge)
+    that follows them on their tree path. Spur paths deviate from the tree,
+    they are searched with A* guided by the exact tree costs, which stops
+    at the first settled node whose tree path avoids the ignored nodes and
+    edges and the nodes already visited, so that the path is loopless.
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self.dists = {}
+        self.succs = {query.target: None}
+        seen = {query.target: 0}
+        fringe = [(0, 0, query.target)]
+        counter = count(1)
+        while fringe:
+            cost, _, node = heappop(fringe)
+            if node in self.dists:
+                continue
+            self.dists[node] = cost
+            for nbr, edge, weight in self._arcs(node):
+                if nbr in self.dists:
+                    continue
+                nbr_cost = cost + weight
+                if nbr not in seen or nbr_cost < seen[nbr]:
+                    seen[nbr] = nbr_cost
+                    self.succs[nbr] = (node, edge)
+                    heappush(fringe, (nbr_cost, next(counter), nbr))
+
+    def _arcs(self, node):
+        """Yield the (nbr, edge, weight) arcs of a node in the query."""
+        query = self.query
+        csr, mask, weights = query.csr, query.mask, query.weights
+        if node < len(csr):
+            for arc in range(csr.offsets[node], csr.offsets[node + 1]):
+                edge = csr.arc_edges[arc]
+                if edge in query.detached:
+                    continue
+                if mask is not None and not mask[edge >> 3] >> (edge & 7) & 1:
+                    continue
+                yield csr.targets[arc], edge, weights[edge]
+        yield from query.extra.get(node, ())
+
+    def _tree_path(self, node, ignore_nodes, ignore_edges, visited):
+        """Return the (nodes, edges) tree path of a node or None.
+
+        None is returned if the path goes through an ignored edge or an
+        ignored or visited node.
+        """
+        nodes, edges = [node], []
+        while self.succs[node] is not None:
+            node, edge = self.succs[node]
+            if node in ignore_nodes or node in visited or edge in ignore_edges:
+                return None
+            nodes.append(node)
+            edges.append(edge)
+        return nodes, edges
+
+    def search(self, spur_node, ignore_nodes, ignore_edges, cutoff=None):
+        """Search the shortest path from a spur node to the target.
+
+        The estimates of the tree costs are exact lower bounds, so the search
+        stops with None once they exceed the ``cutoff``, if given.
+        """
+        dists = self.dists
+        if spur_node in ignore_nodes or spur_node not in dists:
+            return None
+        seen = {spur_node: 0}
+        preds = {spur_node: None}
+        settled = set()
+        fringe = [(dists[spur_node], 0, spur_node)]
+        counter = count(1)
+        while fringe:
+            estimate, _, node = heappop(fringe)
+            if node in settled:
+                continue
+            if cutoff is not None and estimate > cutoff:
+                return None
+            settled.add(node)
+            nodes, edges = [node], []
+            while preds[nodes[-1]] is not None:
+                pred, edge = preds[nodes[-1]]
+                nodes.append(pred)
+                edges.append(edge)
+            nodes.reverse()
+            edges.reverse()
+            tree = self._tree_path(node, ignore_nodes, ignore_edges, nodes)
+            if tree is not None:
+                return (
+                    seen[node] + dists[node],
+                    nodes + tree[0][1:],
+                    edges + tree[1],
+                )
+            cost = seen[node]
+            for nbr, edge, weight in self._arcs(node):
+                if (
+                    nbr in settled
+                    or nbr in ignore_nodes
+                    or edge in ignore_edges
+                    or nbr not in dists
+                ):
+                    continue
+                nbr_cost = cost + weight
+                if nbr not in seen or nbr_cost < seen[nbr]:
+                    seen[nbr] = nbr_cost
+                    preds[nbr] = (node, edge)
+                    heappush(fringe, (nbr_cost + dists[nbr], next(counter), nbr))
+        return None
+
+
+def _join_paths(preds, meet):
+    """Join the forward and backward predecessors at the meeting node."""
+    nodes, edges = [meet], []
+    node = meet
+    while preds[0][node] is not None:
+        node, edge = preds[0][node]
+        nodes.append(node)
+        edges.append(edge)
+    nodes.reverse()
+    edges.reverse()
+    node = meet
+    while preds[1][node] is not None:
+        node, edge = preds[1][node]
+        nodes.append(node)
+        edges.append(edge)
+    return nodes, edges
+
+
+def shortest_simple_paths(
+    search, weights, source, max_cost=None, search_spurs=None, first=None
+):
+    """Yield loopless (cost, nodes, edges) paths in increasing cost order.
+
+    This procedure is based on Yen's algorithm, ``search`` is called as
+    ``search(spur_node, ignore_nodes, ignore_edges, cutoff)`` and must
+    return the (cost, nodes, edges) shortest path from the spur node to the
+    target or None, also if it costs more than the ``cutoff``, and
+    ``weights`` is used to compute the cost of the root paths. If a
+    ``max_cost`` is given, each spur path is searched with the cost left
+    after its root path as cutoff, so only the paths that cost at most
+    ``max_cost`` are yielded.
+
+    If ``search_spurs`` is given, it is called instead with the list of the
+    (spur_node, ignore_nodes, ignore_edges, cutoff) searches of the spur
+    paths of each path, which it can run concurrently, and must return
+    their results in the same order.
+
+    The ``first`` (cost, nodes, edges) shortest path can be given if it is
+    already known, instead of being searched.
+    """
+    found = search(source, set(), set(), max_cost) if first is None else first
+    if found is None:
+        return
+    counter = count()
+    heap = [(found[0], next(counter), found[1], found[2])]
+    buffered = {tuple(found[2])}
+    yielded = []
+    while heap:
+        cost, _, nodes, edges = heappop(heap)
+        buffered.discard(tuple(edges))
+        yield cost, nodes, edges
+        yielded.append((nodes, edges))
+
+        roots, spurs, searches = [], [], []
+        ignore_nodes, ignore_edges = set(), set()
+        root_cost = 0
+        for i in range(1, len(nodes)):
+            root_nodes, root_edges = nodes[:i], edges[: i - 1]
+            for path_nodes, path_edges in yielded:
+                if path_nodes[:i] == root_nodes and path_edges[: i - 1] == root_edges:
+                    ignore_edges.add(path_edges[i - 1])
+            cutoff = None if max_cost is None else max_cost - root_cost
+            roots.append((root_cost, root_nodes, root_edges))
+            if search_spurs is None:
+                spurs.append(search(root_nodes[-1], ignore_nodes, ignore_edges, cutoff))
+            else:
+                searches.append(
+                    (root_nodes[-1], set(ignore_nodes), set(ignore_edges), cutoff)
+                )
+            ignore_nodes.add(root_nodes[-1])
+            root_cost += weights[edges[i - 1]]
+        if search_spurs is not None:
+            spurs = search_spurs(searches)
+        for (root_cost, root_nodes, root_edges), spur in zip(roots, spurs):
+            if spur is None:
+                continue
+            spur_cost, spur_nodes, spur_edges = spur
+            path_edges = root_edges + spur_edges
+            if tuple(path_edges) not in buffered:
+                buffered.add(tuple(path_edges))
+                heappush(
+                    heap,
+                    (
+                        root_cost + spur_cost,
+                        next(counter),
+                        root_nodes[:-1] + spur_nodes,
+                        path_edges,
+                    ),
+                )
+
+
+def k_shortest_paths(
+    csr,
+    source,
+    target,
+    weight,
+    k=1,
+    mask=None,
+    tree=False,
+    max_cost=None,
+    landmarks=None,
+):
+    """Compute up to k shortest loopless paths between two node ids.
+
+    ``weight`` is the name of the spf attribute whose weights are used, and
+    the paths are expanded back to ``Path`` lists of node ids of the graph
+    with their cost. If
+    ``tree`` is enabled the spur paths deviate from a ``ShortestPathTree``
+    instead of being searched with a bidirectional Dijkstra, otherwise if
+    ``landmarks`` of the ``weight`` are given they are searched with A*
+    guided by their bounds, unless ``target`` is a list of candidates. If
+    a ``max_cost`` is given, the searches are pruned to the paths that
+    cost at most it.
+    """
+    try:
+        query = Query(csr, source, target, weight, mask)
+    except KeyError:
+        return []
+    search = query.search
+    if tree:
+        search = ShortestPathTree(query).search
+    elif landmarks is not None and not isinstance(target, list):
+        search = LandmarkSearch(query, landmarks).search
+    paths = []
+    for cost, nodes, edges in shortest_simple_paths(
+        search, query, query.source, max_cost
+    ):
+        paths.append(Path(query.hops(nodes, edges), cost, weight))
+        if len(paths) == k:
+            break
+    return paths
@@ -0,0 +1,137 @@
+"""Destinations module of kytos/pathfinder Kytos Network Application."""
+
+# pylint: disable=too-many-arguments,too-many-locals
+from napps.kytos.pathfinder import settings
+from napps.kytos.pathfinder.search import shortest_path_tree
+
+
+def k_shortest_paths_many(
+    graph,
+    source,
+    destinations,
+    weight=None,
+    k=1,
+    view=None,
+    engine=None,
+    pool=None,
+    max_cost=None,
+):
+    """Compute up to k shortest paths of a KytosGraph to each destination.
+
+    A single ``search.shortest_path_tree`` rooted at the source on a
+    networkx ``view`` of the graph, which defaults to the whole graph, finds
+    the destinations that are reachable within the ``max_cost``, if given,
+    and the shortest path to each one, which seeds its
+    ``networkx.shortest_simple_paths`` so that only the k > 1 paths are
+    searched. The destinations that have several shortest paths search
+    theirs with ``KytosGraph.k_shortest_paths`` instead, so that the ties
+    are broken like a single destination request. The other engines, and
+    the weights other than the callbacks of ``spf_edge_data_cbs``, search
+    every destination with it too. The paths are returned in a dict by
+    destination, pruned to the ``max_cost`` like ``k_shortest_paths``.
+    """
+    # pylint: disable=protected-access
+    engine = engine or settings.SPF_ENGINE
+    max_cost = graph._cost_bound(weight, max_cost)
+    weight = graph._weight_keys.get(weight, weight)
+
+    def search_paths(destination):
+        return graph.k_shortest_paths(
+            source,
+            destination,
+            weight=weight,
+            k=k,
+            graph=view,
+            engine=engine,
+            pool=pool,
+            max_cost=max_cost,
+        )
+
+    if engine != "networkx" or not graph._spf_attributes.get(weight):
+        return {destination: search_paths(destination) for destination in destinations}
+    if view is graph.graph:
+        view = None
+    nx_graph = graph.graph if view is None else view
+    if source not in nx_graph:
+        return {destination: [] for destination in destinations}
+    dists, preds, ties = shortest_path_tree(nx_graph, source, weight, max_cost)
+    paths = {}
+    for destination in destinations:
+        if destination not in dists:
+            paths[destination] = []
+            continue
+        nodes = [destination]
+        while preds[nodes[-1]] is not None:
+            nodes.append(preds[nodes[-1]])
+        if destination == source or ties.intersection(nodes):
+            paths[destination] = search_paths(destination)
+            continue
+        paths[destination] = graph._simple_paths(
+            source,
+            destination,
+            weight,
+            k,
+            view,
+            pool,
+            max_cost,
+            first=(dists[destination], nodes[::-1]),
+        )
+    return paths
+
+
+def constrained_k_shortest_paths_many(
+    graph,
+    source,
+    destinations,
+    weight=None,
+    k=1,
+    minimum_hits=None,
+    engine=None,
+    pool=None,
+    max_cost=None,
+    **metrics,
+):
+    """Calculate the constrained shortest paths of a KytosGraph to each one.
+
+    Without flexible metrics, the paths to all the destinations are
+    searched at once by ``k_shortest_paths_many`` on the subgraph of the
+    mandatory metrics, otherwise each destination searches the flexible
+    metrics lattice of ``KytosGraph.constrained_k_shortest_paths`` on its
+    own, reusing the same filtered subgraphs. The paths are returned in a
+    dict by destination.
+    """
+    # pylint: disable=protected-access
+    mandatory_metrics = metrics.get("mandatory_metrics", {})
+    if metrics.get("flexible_metrics"):
+        return {
+            destination: graph.constrained_k_shortest_paths(
+                source,
+                destination,
+                weight=weight,
+                k=k,
+                minimum_hits=minimum_hits,
+                engine=engine,
+                pool=pool,
+                max_cost=max_cost,
+                **metrics,
+            )
+            for destination in destinations
+        }
+    _, first_pass = graph._first_pass(metrics)
+    paths = k_shortest_paths_many(
+        graph,
+        source,
+        destinations,
+        weight=weight,
+        k=k,
+        view=graph._subgraph(first_pass),
+        engine=engine,
+        max_cost=max_cost,
+    )
+    return {
+        destination: [
+            {"hops": path, "metrics": dict(mandatory_metrics)}
+            for path in destination_paths
+        ]
+        for destination, destination_paths in paths.items()
+    }
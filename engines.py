@@ -0,0 +1,197 @@
+"""Engines module of kytos/pathfinder Kytos Network Application."""
+
+# pylint: disable=too-many-arguments
+from kytos.core import log
+from napps.kytos.pathfinder import csr, hierarchy, settings
+from napps.kytos.pathfinder.search import (bidirectional_bfs,
+                                           bidirectional_dial,
+                                           bidirectional_dijkstra)
+
+try:
+    from networkx.exception import NetworkXNoPath
+except ImportError:
+    PACKAGE = "networkx==2.5.1"
+    log.error(f"Package {PACKAGE} not found. Please 'pip install {PACKAGE}'")
+
+
+class WeightChecks:
+    """Checks of the edge weights of a graph that select its searches.
+
+    Each check is made once per attribute or weight of a snapshot, and kept
+    until ``clear`` is called on a change of its edges or their data.
+    """
+
+    def __init__(self):
+        self._exact = {}
+        self._integer = {}
+        self._unit = {}
+        self._bucket = {}
+
+    def clear(self):
+        """Drop the checks made so far."""
+        self._exact.clear()
+        self._integer.clear()
+        self._unit.clear()
+        self._bucket.clear()
+
+    def exact(self, graph, attribute):
+        """Return whether the spf weights of an attribute are its values.
+
+        It holds unless the graph has a falsy value of the attribute, which
+        the callbacks of ``KytosGraph.spf_edge_data_cbs`` weigh as 1.
+        """
+        if attribute not in self._exact:
+            self._exact[attribute] = not any(
+                attribute in data and not data[attribute]
+                for _, _, data in graph.edges(data=True)
+            )
+        return self._exact[attribute]
+
+    def integer(self, graph, attribute):
+        """Return whether the values of an attribute are all integers."""
+        if attribute not in self._integer:
+            self._integer[attribute] = all(
+                isinstance(data[attribute], int)
+                for _, _, data in graph.edges(data=True)
+                if attribute in data
+            )
+        return self._integer[attribute]
+
+    def unit(self, graph, weight):
+        """Return whether every edge weighs 1 by a weight attribute.
+
+        It is checked for the ``spf_weight_attributes`` of KytosGraph, like
+        the "hop_weight" of graphs without hop metadata.
+        """
+        if weight not in self._unit:
+            self._unit[weight] = all(
+                weight_value == 1 for _, _, weight_value in graph.edges(data=weight)
+            )
+        return self._unit[weight]
+
+    def bucket(self, graph, weight):
+        """Return the maximum of the integer weights of a weight attribute.
+
+        It is checked for the ``spf_weight_attributes`` of KytosGraph, like
+        the "delay_weight" of small integer delays, and None is returned if
+        any edge weighs a non-integer, a negative or more than
+        ``settings.BUCKET_QUEUE_MAX_WEIGHT`` by it.
+        """
+        if weight not in self._bucket:
+            max_weight = 0
+            for _, _, weight_value in graph.edges(data=weight):
+                if (
+                    not isinstance(weight_value, int)
+                    or isinstance(weight_value, bool)
+                    or not 0 <= weight_value <= settings.BUCKET_QUEUE_MAX_WEIGHT
+                ):
+                    max_weight = None
+                    break
+                max_weight = max(max_weight, weight_value)
+            self._bucket[weight] = max_weight
+        return self._bucket[weight]
+
+
+def spur_path(
+    graph, checks, spur, target, weight, ignore_nodes, ignore_edges, view=None
+):
+    """Return the (length, path) of a spur path or None if there is none.
+
+    It is searched like networkx.shortest_simple_paths does on a networkx
+    ``view`` of ``graph``, which defaults to the whole graph, reading the
+    ``weight``, one of the ``spf_weight_attributes`` of KytosGraph, inline,
+    with a bidirectional BFS if the ``WeightChecks`` ``checks`` find that all
+    the edges weigh 1 by it or with bucket queues if they weigh small
+    integers, which return the same path. The checks are made on the whole
+    ``graph``, since they are cached per snapshot and hold on every view.
+    """
+    unit = checks.unit(graph, weight)
+    max_weight = None if unit else checks.bucket(graph, weight)
+    search_graph = graph if view is None else view
+    try:
+        if unit:
+            return bidirectional_bfs(
+                search_graph, spur, target, ignore_nodes, ignore_edges
+            )
+        if max_weight is not None:
+            return bidirectional_dial(
+                search_graph,
+                spur,
+                target,
+                weight,
+                max_weight,
+                ignore_nodes,
+                ignore_edges,
+            )
+        return bidirectional_dijkstra(
+            search_graph, spur, target, weight, ignore_nodes, ignore_edges
+        )
+    except NetworkXNoPath:
+        return None
+
+
+def csr_paths(
+    graph,
+    source,
+    destination,
+    spf_attribute,
+    k=1,
+    view=None,
+    engine="csr",
+    max_cost=None,
+):
+    """Return the k shortest paths of a KytosGraph searched by a CSR engine.
+
+    A single path to a single destination on the whole graph is searched
+    on the ``KytosGraph.hierarchy`` of the spf attribute by the engines
+    other than "networkx", once it is refreshed. The other paths are
+    searched by ``csr.k_shortest_paths`` on the switch level graph, masked
+    to the edges of a networkx ``view`` if given, deviating from a single
+    shortest path tree with the "deviation" ``engine`` or with A* guided by
+    the ``KytosGraph.landmarks`` of the spf attribute with the "alt" one.
+    """
+    # pylint: disable=protected-access
+    if (
+        k == 1
+        and engine != "networkx"
+        and view is None
+        and not isinstance(destination, list)
+        and source != destination
+    ):
+        contraction = graph.hierarchy(spf_attribute)
+        if contraction is not None:
+            return hierarchy_paths(
+                graph.csr, contraction, source, destination, max_cost
+            )
+    mask = None
+    if view is not None:
+        mask = graph._csr_masks.get(view)
+        if mask is None:
+            mask = graph._csr_masks[view] = graph.csr.edge_mask(view.edges)
+    return csr.k_shortest_paths(
+        graph.csr,
+        source,
+        destination,
+        spf_attribute,
+        k=k,
+        mask=mask,
+        tree=engine == "deviation",
+        max_cost=max_cost,
+        landmarks=graph.landmarks(spf_attribute) if engine == "alt" else None,
+    )
+
+
+def hierarchy_paths(csr_graph, contraction, source, destination, max_cost):
+    """Return the shortest path searched on a contraction hierarchy.
+
+    It is returned in a list, which is empty if there is none within the
+    ``max_cost``, if given.
+    """
+    try:
+        query = csr.Query(csr_graph, source, destination, contraction.weight)
+    except KeyError:
+        return []
+    path = hierarchy.shortest_path(contraction, query)
+    if path is None or max_cost is not None and path.cost > max_cost:
+        return []
+    return [path]
@@ -1,12 +1,21 @@
 """Module Graph of kytos/pathfinder Kytos Network Application."""
 
 # pylint: disable=too-many-arguments,too-many-locals
+import json
+from collections import Counter, OrderedDict
 from itertools import combinations, islice
+from threading import Lock
+from weakref import WeakKeyDictionary
 
 from kytos.core import log
 from kytos.core.common import EntityStatus
-from napps.kytos.pathfinder.utils import (filter_ge, filter_in, filter_le,
-                                          lazy_filter, nx_edge_data_delay,
+from napps.kytos.pathfinder import csr, engines, hierarchy, parallel, settings
+from napps.kytos.pathfinder.engines import WeightChecks
+from napps.kytos.pathfinder.landmarks import Landmarks
+from napps.kytos.pathfinder.metric_index import MetricIndex
+from napps.kytos.pathfinder.utils import (edge_key, filter_ge, filter_in,
+                                          filter_le, lazy_filter,
+                                          nx_edge_data_delay,
                                           nx_edge_data_priority,
                                           nx_edge_data_weight)
 
@@ -21,8 +30,11 @@ except ImportError:
 class KytosGraph:
     """Class responsible for the graph generation."""
 
+    SPF_ENGINES = ("networkx", "csr", "deviation", "alt")
+
     def __init__(self):
         self.graph = nx.Graph()
+        self.generation = 0
         self._filter_functions = {
             "ownership": lazy_filter(str, filter_in("ownership")),
             "bandwidth": lazy_filter((int, float), filter_ge("bandwidth")),
@@ -31,24 +43,368 @@ class KytosGraph:
             "utilization": lazy_filter((int, float), filter_le("utilization")),
             "delay": lazy_filter((int, float), filter_le("delay")),
         }
+        self._filter_orders = {
+            "bandwidth": "ge",
+            "reliability": "ge",
+            "priority": "le",
+            "utilization": "le",
+            "delay": "le",
+        }
         self.spf_edge_data_cbs = {
             "hop": nx_edge_data_weight,
             "delay": nx_edge_data_delay,
             "priority": nx_edge_data_priority,
         }
+        self.applied_deltas = Counter()
+        self.changed_edges = {}
+        self.spf_weight_attributes = {
+            attr: f"{attr}_weight" for attr in self.spf_edge_data_cbs
+        }
+        self._spf_attributes = {
+            func: attr for attr, func in self.spf_edge_data_cbs.items()
+        }
+        self._spf_attributes.update(
+            (key, attr) for attr, key in self.spf_weight_attributes.items()
+        )
+        self._weight_keys = {
+            func: self.spf_weight_attributes[attr]
+            for attr, func in self.spf_edge_data_cbs.items()
+        }
+        self._csr = None
+        self._metric_index = None
+        self._filtered_graphs = OrderedDict()
+        self._filtered_graphs_lock = Lock()
+        self._csr_masks = WeakKeyDictionary()
+        self._weight_checks = WeightChecks()
+        self._landmarks = {}
+        self._hierarchies = {}
+
+    def __getstate__(self):
+        """Return the state a replica of this graph is built from.
+
+        The indexes and caches are rebuilt on demand by the replica.
+        """
+        return {
+            "graph": self.graph,
+            "generation": self.generation,
+            "applied_deltas": self.applied_deltas,
+        }
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.__dict__.update(state)
 
     def clear(self):
         """Remove all nodes and links registered."""
         self.graph.clear()
 
-    def update_topology(self, topology):
-        """Update all nodes and links inside the graph."""
+    def copy(self, edges=None):
+        """Return a copy of this graph as its next generation.
+
+        Published graphs are meant to be read-only snapshots, so writers
+        should update a copy and then publish it instead. The copy records
+        its ``changed_edges`` from this generation on. If ``edges`` are
+        given, only the data of these (endpoint_a, endpoint_b) edges is
+        copied and the rest is shared with this graph, so only their data
+        can be updated, like ``update_link_metadata`` does.
+        """
+        state = {
+            "graph": self.graph.copy() if edges is None else self._copy_edges(edges),
+            "generation": self.generation + 1,
+            "applied_deltas": self.applied_deltas.copy(),
+        }
+        if self._csr is not None:
+            state["_csr"] = self._csr.copy()
+            state["_landmarks"] = dict(self._landmarks)
+            state["_hierarchies"] = dict(self._hierarchies)
+        if self._metric_index is not None:
+            state["_metric_index"] = self._metric_index.copy()
+        graph = KytosGraph.__new__(KytosGraph)
+        graph.__setstate__(state)
+        return graph
+
+    def _copy_edges(self, edges):
+        """Return a networkx graph sharing all but the data of some edges.
+
+        The node and adjacency dicts are copied shallowly, and only the
+        adjacency dicts of the endpoints of the edges and their data are
+        copied in turn.
+        """
+        # pylint: disable=protected-access
+        graph = self.graph.__class__()
+        graph.graph.update(self.graph.graph)
+        graph._node = dict(self.graph._node)
+        graph._adj = adj = dict(self.graph._adj)
+        for endpoint_a, endpoint_b in edges:
+            if not self.graph.has_edge(endpoint_a, endpoint_b):
+                continue
+            data = dict(adj[endpoint_a][endpoint_b])
+            adj[endpoint_a] = {**adj[endpoint_a], endpoint_b: data}
+            adj[endpoint_b] = {**adj[endpoint_b], endpoint_a: data}
+        return graph
+
+    def _reset_indexes(self):
+        """Drop the indexes built from the graph on structural changes."""
+        self._csr = None
+        self._metric_index = None
+        self._landmarks = {}
+        self._hierarchies = {}
+        self._weight_checks.clear()
+        self._clear_filtered_graphs()
+
+    def landmarks(self, spf_attribute):
+        """Return the ``Landmarks`` of an spf attribute or None.
+
+        They are built by ``refresh_landmarks`` and carried over to the next
+        generations until a structural change or until an edge weight they
+        were computed with is lowered.
+        """
+        landmarks = self._landmarks.get(spf_attribute)
+        if landmarks is None or not landmarks.built_on(self.csr):
+            return None
+        return landmarks
+
+    def stale_landmarks(self):
+        """Return the spf attributes whose ``Landmarks`` must be refreshed."""
+        if not settings.LANDMARK_COUNT:
+            return []
+        return [
+            attr for attr in self.spf_edge_data_cbs if self.landmarks(attr) is None
+        ]
+
+    def refresh_landmarks(self):
+        """Build the ``Landmarks`` of the spf attributes that are stale.
+
+        It's meant to be called in the background on a published snapshot,
+        whose searches use the landmarks once they are built.
+        """
+        for attr in self.stale_landmarks():
+            self._landmarks[attr] = Landmarks(
+                self.csr, attr, settings.LANDMARK_COUNT
+            )
+
+    def hierarchy(self, spf_attribute):
+        """Return the ``ContractionHierarchy`` of an spf attribute or None.
+
+        It is built by ``refresh_hierarchies`` and carried over to the next
+        generations until a structural change or until an edge weight it
+        was built with changes.
+        """
+        contraction = self._hierarchies.get(spf_attribute)
+        if contraction is None or not contraction.built_on(self.csr):
+            return None
+        return contraction
+
+    def stale_hierarchies(self):
+        """Return the spf attributes whose hierarchy must be refreshed."""
+        if not settings.CONTRACTION_HIERARCHY:
+            return []
+        return [
+            attr for attr in self.spf_edge_data_cbs if self.hierarchy(attr) is None
+        ]
+
+    def refresh_hierarchies(self):
+        """Build the ``ContractionHierarchy`` of the stale spf attributes.
+
+        It's meant to be called in the background on a published snapshot,
+        whose single shortest path searches use them once they are built.
+        """
+        for attr in self.stale_hierarchies():
+            self._hierarchies[attr] = hierarchy.ContractionHierarchy(self.csr, attr)
+
+    def _clear_filtered_graphs(self):
+        """Drop the cached filtered links and subgraph views."""
+        with self._filtered_graphs_lock:
+            self._filtered_graphs.clear()
+        self._csr_masks.clear()
+
+    @property
+    def csr(self):
+        """Return the CSR representation of the graph, built on demand."""
+        if self._csr is None:
+            self._csr = csr.CSRGraph(self.graph, self.spf_edge_data_cbs)
+        return self._csr
+
+    @property
+    def metric_index(self):
+        """Return the bitset index of the edges metrics, built on demand."""
+        if self._metric_index is None:
+            self._metric_index = MetricIndex(
+                self.graph, self._filter_functions, self._filter_orders
+            )
+        return self._metric_index
+
+    def update_topology(self, topology, incremental=None):
+        """Update all nodes and links inside the graph.
+
+        If ``incremental`` is enabled, which defaults to
+        ``settings.INCREMENTAL_TOPOLOGY_UPDATE``, the topology is diffed
+        against the current graph and only the deltas are applied, which
+        are returned and accumulated in ``applied_deltas``.
+        """
+        if incremental is None:
+            incremental = settings.INCREMENTAL_TOPOLOGY_UPDATE
+        if incremental:
+            return self._apply_topology_deltas(topology)
+        changed_edges = self.changed_edges
+        old_edges = {
+            edge_key(endpoint_a, endpoint_b): data
+            for endpoint_a, endpoint_b, data in self.graph.edges(data=True)
+        }
+        self._reset_indexes()
         self.graph.clear()
         self.update_nodes(topology.switches)
         self.update_links(topology.links)
+        if changed_edges is not None:
+            for endpoint_a, endpoint_b, data in self.graph.edges(data=True):
+                key = edge_key(endpoint_a, endpoint_b)
+                old_data = old_edges.pop(key, None)
+                if old_data != data:
+                    changed_edges.setdefault(key, old_data)
+            for key, old_data in old_edges.items():
+                changed_edges.setdefault(key, old_data)
+        self.changed_edges = changed_edges
+        return None
+
+    def _record_change(self, endpoint_a, endpoint_b):
+        """Record the data of an edge before it is changed.
+
+        ``changed_edges`` maps the changed edges to their data in the parent
+        generation, None if they were added, or is None if the changes are
+        unknown.
+        """
+        key = edge_key(endpoint_a, endpoint_b)
+        if self.changed_edges is None or key in self.changed_edges:
+            return
+        data = self.graph.get_edge_data(endpoint_a, endpoint_b)
+        self.changed_edges[key] = dict(data) if data is not None else None
+
+    def _topology_elements(self, topology):
+        """Return the nodes and edges data that a topology maps to.
+
+        It mirrors what ``update_nodes`` and ``update_links`` would add,
+        nodes are mapped to the switch of interfaces or None.
+        """
+        nodes, edges = {}, {}
+        for node in topology.switches.values():
+            try:
+                if node.status != EntityStatus.UP:
+                    continue
+                nodes[node.id] = None
+
+                for interface in node.interfaces.values():
+                    if interface.status == EntityStatus.UP:
+                        nodes[interface.id] = node.id
+                        edges[edge_key(node.id, interface.id)] = self._set_weights(
+                            {}
+                        )
+
+            except AttributeError as err:
+                raise TypeError(
+                    f"Error when updating nodes inside the graph: {str(err)}"
+                )
+
+        for link in topology.links.values():
+            if link.status != EntityStatus.UP:
+                continue
+            endpoint_a = link.endpoint_a.id
+            endpoint_b = link.endpoint_b.id
+            nodes.setdefault(endpoint_a)
+            nodes.setdefault(endpoint_b)
+            data = edges.setdefault(edge_key(endpoint_a, endpoint_b), {})
+            for key, value in link.metadata.items():
+                if key in self._filter_functions:
+                    data[key] = value
+            self._set_weights(data)
+        return nodes, edges
+
+    def _apply_topology_deltas(self, topology):
+        """Diff a topology against the graph and only apply its deltas."""
+        nodes, edges = self._topology_elements(topology)
+        edge_keys = list(edges)
+        deltas = Counter()
+
+        removed_edges = []
+        for endpoint_a, endpoint_b, data in self.graph.edges(data=True):
+            new_data = edges.pop(edge_key(endpoint_a, endpoint_b), None)
+            if new_data is None:
+                self._record_change(endpoint_a, endpoint_b)
+                removed_edges.append((endpoint_a, endpoint_b))
+            elif new_data != data:
+                self._record_change(endpoint_a, endpoint_b)
+                data.clear()
+                data.update(new_data)
+                deltas["edges_updated"] += 1
+                self._update_indexes(endpoint_a, endpoint_b, data)
+        self.graph.remove_edges_from(removed_edges)
+        deltas["edges_removed"] += len(removed_edges)
+
+        removed_nodes = [node for node in self.graph if node not in nodes]
+        self.graph.remove_nodes_from(removed_nodes)
+        deltas["nodes_removed"] += len(removed_nodes)
+
+        updated_nodes = [
+            node
+            for node, switch in self.graph.nodes(data="switch")
+            if switch != nodes[node]
+        ]
+        for node in updated_nodes:
+            self._set_node_switch(node, nodes[node])
+        deltas["nodes_updated"] += len(updated_nodes)
+
+        added_nodes = [node for node in nodes if node not in self.graph]
+        for node in added_nodes:
+            self._set_node_switch(node, nodes[node])
+        deltas["nodes_added"] += len(added_nodes)
+
+        for (endpoint_a, endpoint_b), data in edges.items():
+            self._record_change(endpoint_a, endpoint_b)
+            self.graph.add_edge(endpoint_a, endpoint_b, **data)
+        deltas["edges_added"] += len(edges)
+
+        reordered = self._rebuild_order(nodes, edge_keys)
+        if reordered or any(
+            (removed_edges, removed_nodes, updated_nodes, added_nodes, edges)
+        ):
+            self._reset_indexes()
+        self.applied_deltas.update(deltas)
+        return deltas
+
+    def _rebuild_order(self, nodes, edge_keys):
+        """Put the nodes and adjacencies in the order of a full rebuild.
+
+        The ``nodes`` and ``edge_keys`` are in the order ``update_nodes``
+        and ``update_links`` add them, which networkx breaks the ties of
+        equal cost paths with. The graph is only rebuilt from its own data,
+        and True returned, if its order differs.
+        """
+        adjacency = {node: [] for node in nodes}
+        for endpoint_a, endpoint_b in edge_keys:
+            adjacency[endpoint_a].append(endpoint_b)
+            adjacency[endpoint_b].append(endpoint_a)
+        if list(self.graph) == list(adjacency) and all(
+            list(self.graph[node]) == nbrs for node, nbrs in adjacency.items()
+        ):
+            return False
+        node_data = dict(self.graph.nodes(data=True))
+        edge_data = {key: self.graph.get_edge_data(*key) for key in edge_keys}
+        self.graph.clear()
+        self.graph.add_nodes_from((node, node_data[node]) for node in adjacency)
+        self.graph.add_edges_from((*key, edge_data[key]) for key in edge_keys)
+        return True
+
+    def _set_node_switch(self, node, switch):
+        """Add a node, setting the switch of interfaces."""
+        self.graph.add_node(node)
+        if switch is None:
+            self.graph.nodes[node].pop("switch", None)
+        else:
+            self.graph.nodes[node]["switch"] = switch
 
     def update_nodes(self, nodes):
         """Update all nodes inside the graph."""
+        self._reset_indexes()
+        self.changed_edges = None
         for node in nodes.values():
             try:
                 if node.status != EntityStatus.UP:
@@ -57,8 +413,9 @@ class KytosGraph:
 
                 for interface in node.interfaces.values():
                     if interface.status == EntityStatus.UP:
-                        self.graph.add_node(interface.id)
+                        self.graph.add_node(interface.id, switch=node.id)
                         self.graph.add_edge(node.id, interface.id)
+                        self._set_weights(self.graph[node.id][interface.id])
 
             except AttributeError as err:
                 raise TypeError(
@@ -67,9 +424,13 @@ class KytosGraph:
 
     def update_links(self, links):
         """Update all links inside the graph."""
+        self._reset_indexes()
+        self.changed_edges = None
         for link in links.values():
             if link.status == EntityStatus.UP:
-                self.graph.add_edge(link.endpoint_a.id, link.endpoint_b.id)
+                endpoint_a, endpoint_b = link.endpoint_a.id, link.endpoint_b.id
+                self.graph.add_edge(endpoint_a, endpoint_b)
+                self._set_weights(self.graph[endpoint_a][endpoint_b])
                 self.update_link_metadata(link)
 
     def update_link_metadata(self, link):
@@ -79,11 +440,86 @@ class KytosGraph:
                 continue
             endpoint_a = link.endpoint_a.id
             endpoint_b = link.endpoint_b.id
+            self._record_change(endpoint_a, endpoint_b)
             self.graph[endpoint_a][endpoint_b][key] = value
+            self._update_indexes(
+                endpoint_a, endpoint_b, self.graph[endpoint_a][endpoint_b]
+            )
+
+    def _set_weights(self, data):
+        """Set the ``spf_weight_attributes`` of an edge data and return it.
+
+        They are the weights of ``spf_edge_data_cbs`` materialized into the
+        edge data, so that searches can weigh the edges by attribute name
+        instead of calling the callbacks on every edge relaxation.
+        """
+        for attr, func in self.spf_edge_data_cbs.items():
+            data[self.spf_weight_attributes[attr]] = func(None, None, data)
+        return data
+
+    def _update_indexes(self, endpoint_a, endpoint_b, data):
+        """Update the weights and built indexes with the new data of an edge."""
+        self._set_weights(data)
+        self._weight_checks.clear()
+        self._clear_filtered_graphs()
+        if self._csr is not None:
+            self._csr.update_weights(
+                endpoint_a, endpoint_b, data, self.spf_edge_data_cbs
+            )
+            edge_id = self._csr.edge_id(endpoint_a, endpoint_b)
+            if edge_id is not None:
+                self._landmarks = {
+                    attr: landmarks
+                    for attr, landmarks in self._landmarks.items()
+                    if landmarks.admissible(self._csr, edge_id)
+                }
+                self._hierarchies = {
+                    attr: contraction
+                    for attr, contraction in self._hierarchies.items()
+                    if contraction.valid(self._csr, edge_id)
+                }
+        if self._metric_index is not None:
+            self._metric_index.update(endpoint_a, endpoint_b, data)
+
+    def changed_dependencies(self):
+        """Return the path dependencies that ``changed_edges`` affect.
+
+        Removing or updating an edge affects the paths that traverse it,
+        lowering its weight affects any path computed with that weight and
+        changing its metrics may admit it into any path constrained on
+        them. None is returned if any path can be affected, like when
+        edges are added.
+        """
+        if self.changed_edges is None:
+            return None
+        dependencies = set()
+        for key, old_data in self.changed_edges.items():
+            data = self.graph.get_edge_data(*key)
+            if old_data is None:
+                if data is not None:
+                    return None
+                continue
+            dependencies.add(("edge", key))
+            if data is None:
+                continue
+            for attribute, func in self.spf_edge_data_cbs.items():
+                if func(*key, data) < func(*key, old_data):
+                    dependencies.add(("weight", attribute))
+            for metric in self._filter_functions:
+                if data.get(metric) != old_data.get(metric):
+                    dependencies.add(("metric", metric))
+        return dependencies
 
     def get_link_metadata(self, endpoint_a, endpoint_b):
-        """Return the metadata of a link."""
-        return self.graph.get_edge_data(endpoint_a, endpoint_b)
+        """Return the metadata of a link.
+
+        The ``spf_weight_attributes`` stored along with them are left out.
+        """
+        data = self.graph.get_edge_data(endpoint_a, endpoint_b)
+        if data is None:
+            return None
+        weights = self.spf_weight_attributes.values()
+        return {key: value for key, value in data.items() if key not in weights}
 
     @staticmethod
     def _remove_switch_hops(circuit):
@@ -93,7 +529,23 @@ class KytosGraph:
                 circuit["hops"].remove(hop)
 
     def _path_cost(self, path, weight="hop", default_cost=1):
-        """Compute the path cost given an attribute."""
+        """Compute the path cost given an attribute.
+
+        The cost that the search of a ``Path`` accumulated is used instead
+        of walking its hops if it was weighed by the same attribute, with the
+        same default, on weights that ``WeightChecks.exact`` and ``integer``
+        find to be exact integers, whose sum doesn't depend on its order. It
+        is converted back to an int if the CSR searches summed them as
+        floats. Float weights are summed in hop order.
+        """
+        if (
+            getattr(path, "cost", None) is not None
+            and path.weight == weight
+            and default_cost == 1
+            and self._weight_checks.exact(self.graph, weight)
+            and self._weight_checks.integer(self.graph, weight)
+        ):
+            return int(path.cost)
         cost = 0
         for node, nbr in nx.utils.pairwise(path):
             cost += self.graph[node][nbr].get(weight, default_cost)
@@ -124,8 +576,29 @@ class KytosGraph:
                 )
         return paths_acc
 
+    def _cost_bound(self, weight, max_cost):
+        """Return the max_cost that a search with a weight is pruned to.
+
+        The ``weight`` callbacks of ``spf_edge_data_cbs`` weigh the falsy
+        values of their attribute as 1 while ``path_cost_builder`` reports
+        them as they are, so None is returned, and nothing is pruned, if the
+        graph has any of them or for any other ``weight``.
+        """
+        attribute = self._spf_attributes.get(weight)
+        if max_cost is None or attribute is None:
+            return None
+        return max_cost if self._weight_checks.exact(self.graph, attribute) else None
+
     def k_shortest_paths(
-        self, source, destination, weight=None, k=1, graph=None
+        self,
+        source,
+        destination,
+        weight=None,
+        k=1,
+        graph=None,
+        engine=None,
+        pool=None,
+        max_cost=None,
     ):
         """
         Compute up to k shortest paths and return them.
@@ -136,27 +609,117 @@ class KytosGraph:
         O(K(|V| + |E|)logV), assuming it's using a heap, where V is the
         number of vertices and E number of egdes.
 
+        The ``engine``, which defaults to ``settings.SPF_ENGINE``, is one of
+        ``SPF_ENGINES``. The "csr" one searches a switch level graph with
+        the interfaces contracted into their switches and expands the paths
+        back to the same hops, and the "deviation" one does the same but
+        computes a single shortest path tree to the destination, from which
+        the spur paths deviate. The "alt" one also searches the switch level
+        graph but with A* guided by the lower bounds of the ``landmarks`` of
+        the weight, or with the "csr" search until they are refreshed. They
+        only support the ``weight`` callbacks of ``spf_edge_data_cbs`` and
+        fall back to networkx. Their paths have the same costs as the
+        networkx ones, but the paths of equal cost can differ in their hops
+        and order, since the switch level graph breaks the ties otherwise.
+
+        If ``destination`` is a list of candidate destinations, the k
+        shortest paths to any of them are searched at once, as paths to a
+        virtual sink joined to all of them, with the "csr" engine unless the
+        "deviation" one is selected. Only the ``weight`` callbacks of
+        ``spf_edge_data_cbs`` are supported then.
+
+        If a ``pool``, a ``ReplicaPool``, is given and at least
+        ``settings.PARALLEL_SPUR_MIN_PATHS`` paths are requested on the whole
+        graph with networkx and a ``weight`` callback of
+        ``spf_edge_data_cbs``, the spur paths of each path are computed
+        concurrently by its workers, which yields the same paths in order.
+
+        A single path on the whole graph is searched on the contraction
+        ``hierarchy`` of the weight by the engines other than "networkx",
+        once it is refreshed, so the networkx paths keep their hops.
+
+        If a ``max_cost`` is given, the searches are pruned to the paths
+        whose cost, as reported by ``path_cost_builder``, is at most it,
+        unless ``_cost_bound`` finds that the weights can't bound them.
+        The paths of the ``weight`` callbacks of ``spf_edge_data_cbs`` are
+        ``Path`` lists with the cost their search accumulated, which
+        ``path_cost_builder`` reuses instead of walking their hops.
+
         References
         ----------
         .. [1] Jin Y. Yen, "Finding the K Shortest Loopless Paths in a
            Network", Management Science, Vol. 17, No. 11, Theory Series
            (Jul., 1971), pp. 712-716.
         """
+        engine = engine or settings.SPF_ENGINE
+        spf_attribute = self._spf_attributes.get(weight)
+        max_cost = self._cost_bound(weight, max_cost)
+        weight = self._weight_keys.get(weight, weight)
+        anycast = isinstance(destination, list)
+        if anycast and not spf_attribute:
+            raise TypeError(
+                "Paths to a list of destinations only support the weights of "
+                f"{', '.join(self.spf_edge_data_cbs)}"
+            )
+        view = None if graph is None or graph is self.graph else graph
+        if (anycast or engine in ("csr", "deviation", "alt")) and spf_attribute:
+            return engines.csr_paths(
+                self, source, destination, spf_attribute, k, view, engine, max_cost
+            )
+        return self._simple_paths(source, destination, weight, k, view, pool, max_cost)
+
+    def _simple_paths(
+        self, source, destination, weight, k, view, pool, max_cost, first=None
+    ):
+        """Return the k networkx.shortest_simple_paths of a view or the graph.
+
+        The ``first`` (length, path) of an spf weight can be given if known.
+        """
+        if view is not None or k < settings.PARALLEL_SPUR_MIN_PATHS:
+            pool = None
         try:
-            return list(
-                islice(
-                    nx.shortest_simple_paths(
-                        graph or self.graph,
-                        source,
-                        destination,
-                        weight=weight,
-                    ),
-                    k,
+            if self._spf_attributes.get(weight):
+                paths = parallel.shortest_simple_paths(
+                    pool,
+                    self,
+                    source,
+                    destination,
+                    weight=weight,
+                    view=view,
+                    max_cost=max_cost,
+                    first=first,
                 )
-            )
+            else:
+                paths = nx.shortest_simple_paths(
+                    self.graph if view is None else view,
+                    source,
+                    destination,
+                    weight=weight,
+                )
+            return list(islice(paths, k))
         except (NodeNotFound, NetworkXNoPath):
             return []
 
+    def _spur_path(
+        self, spur, target, weight, ignore_nodes, ignore_edges, graph=None
+    ):
+        """Return the ``engines.spur_path`` of ``graph`` or the whole graph.
+
+        ``graph`` is a networkx view of the whole graph, whose weights are
+        checked instead. It is called on the replicas of the workers of a
+        ``ReplicaPool``.
+        """
+        return engines.spur_path(
+            self.graph,
+            self._weight_checks,
+            spur,
+            target,
+            weight,
+            ignore_nodes,
+            ignore_edges,
+            view=graph,
+        )
+
     def constrained_k_shortest_paths(
         self,
         source,
@@ -164,36 +727,110 @@ class KytosGraph:
         weight=None,
         k=1,
         minimum_hits=None,
+        engine=None,
+        pool=None,
+        max_cost=None,
         **metrics,
     ):
-        """Calculate the constrained shortest paths with flexibility."""
+        """Calculate the constrained shortest paths with flexibility.
+
+        The flexible metrics combinations form a lattice in which adding a
+        metric can only remove links, so the links of a combination are
+        filtered from the ones of its prefix, and a combination is known to
+        be infeasible, and isn't searched, if any of its subsets is, or else
+        if its links don't connect the source and the destination. When all
+        the flexible metrics are infeasible together, the single metrics are
+        checked first so that their infeasibility prunes the lattice. The
+        ``destination`` can be a list of candidates, like in
+        ``k_shortest_paths``, and the (endpoint_a, endpoint_b) links in the
+        ``excluded_links`` metric are removed before searching. The paths
+        are pruned to the ``max_cost`` if given, like ``k_shortest_paths``.
+
+        If a ``pool``, a ``ReplicaPool``, is given, the feasible combinations
+        of each level are searched concurrently by its workers, and their
+        paths are merged in the same order as if searched one by one.
+        """
         mandatory_metrics = metrics.get("mandatory_metrics", {})
         flexible_metrics = metrics.get("flexible_metrics", {})
-        first_pass_links = list(
-            self._filter_links(
-                self.graph.edges(data=True), **mandatory_metrics
-            )
-        )
+        constraints, first_pass = self._first_pass(metrics)
         length = len(flexible_metrics)
         if minimum_hits is None:
             minimum_hits = 0
         minimum_hits = min(length, max(0, minimum_hits))
 
+        filtered_graphs = {(): first_pass}
+        feasibility = {}
+        connectivity = {}
+
+        def filtered_graph(combo):
+            if combo not in filtered_graphs:
+                filtered_graphs[combo] = self._filtered_graph(
+                    (*constraints, *combo),
+                    lambda: self._filter_links(
+                        links_of(combo[:-1]), **dict(combo[-1:])
+                    ),
+                )
+            return filtered_graphs[combo]
+
+        def links_of(combo):
+            return filtered_graph(combo)[0]
+
+        def is_feasible(combo):
+            if combo not in feasibility:
+                feasibility[combo] = not any(
+                    not feasibility.get(subset, True)
+                    for size in range(len(combo))
+                    for subset in combinations(combo, size)
+                ) and self._connected(
+                    links_of(combo), source, destination, connectivity
+                )
+            return feasibility[combo]
+
         paths = []
+        items = tuple(flexible_metrics.items())
+        if not is_feasible(()):
+            return paths
+        if not is_feasible(items):
+            for item in items:
+                is_feasible((item,))
         for i in range(length, minimum_hits - 1, -1):
-            for combo in combinations(flexible_metrics.items(), i):
-                additional = dict(combo)
-                filtered_links = self._filter_links(
-                    first_pass_links, **additional
+            combos = (
+                combo for combo in combinations(items, i) if is_feasible(combo)
+            )
+            results = None
+            if pool is not None:
+                combos = list(combos)
+                if len(combos) > 1:
+                    results = pool.map(
+                        self,
+                        "_combination_paths",
+                        [
+                            (source, destination, weight, k, engine,
+                             max_cost, metrics, combo)
+                            for combo in combos
+                        ],
+                    )
+            if results is not None:
+                combo_results = zip(combos, results)
+            else:
+                combo_results = (
+                    (
+                        combo,
+                        self.k_shortest_paths(
+                            source,
+                            destination,
+                            weight=weight,
+                            k=k,
+                            graph=self._subgraph(filtered_graph(combo)),
+                            engine=engine,
+                            max_cost=max_cost,
+                        ),
+                    )
+                    for combo in combos
                 )
-                filtered_links = ((u, v) for u, v, d in filtered_links)
-                for path in self.k_shortest_paths(
-                    source,
-                    destination,
-                    weight=weight,
-                    k=k,
-                    graph=self.graph.edge_subgraph(filtered_links),
-                ):
+            for combo, combo_paths in combo_results:
+                additional = dict(combo)
+                for path in combo_paths:
                     paths.append(
                         {
                             "hops": path,
@@ -206,12 +843,153 @@ class KytosGraph:
                 return paths
         return paths
 
+    def _combination_paths(
+        self, source, destination, weight, k, engine, max_cost, metrics, combo
+    ):
+        """Return the k shortest paths of a flexible metrics combination.
+
+        It is called on the replicas of the workers of a ``ReplicaPool``.
+        """
+        constraints, first_pass = self._first_pass(metrics)
+        filtered_graph = self._filtered_graph(
+            (*constraints, *combo),
+            lambda: self._filter_links(first_pass[0], **dict(combo)),
+        )
+        return self.k_shortest_paths(
+            source,
+            destination,
+            weight=weight,
+            k=k,
+            graph=self._subgraph(filtered_graph),
+            engine=engine,
+            max_cost=max_cost,
+        )
+
+    def _first_pass(self, metrics):
+        """Return the constraints and filtered graph of the mandatory metrics.
+
+        The ``excluded_links`` of the metrics are removed from the links.
+        """
+        mandatory_metrics = metrics.get("mandatory_metrics", {})
+        excluded, links = self._excluded_links(metrics.get("excluded_links", ()))
+        constraints = (*mandatory_metrics.items(), *excluded)
+        first_pass = self._filtered_graph(
+            constraints,
+            lambda: self._filter_links(links, **mandatory_metrics),
+        )
+        return constraints, first_pass
+
+    def _excluded_links(self, links):
+        """Return the constraints and bitset of the links without some links.
+
+        The ``links`` are (endpoint_a, endpoint_b) pairs, the ones in the
+        graph are excluded with an ("excluded_links", edge ids) constraint.
+        """
+        index = self.metric_index
+        edge_ids = sorted(
+            {
+                index.edge_ids[key]
+                for key in (edge_key(*link) for link in links)
+                if key in index.edge_ids
+            }
+        )
+        if not edge_ids:
+            return (), index.all_edges
+        excluded = 0
+        for edge_id in edge_ids:
+            excluded |= 1 << edge_id
+        return (("excluded_links", edge_ids),), index.all_edges & ~excluded
+
+    def without_links(self, links):
+        """Return a subgraph view without some (endpoint_a, endpoint_b) links.
+
+        The view is cached like the filtered graphs of metric constraints,
+        and the whole graph is returned if none of the links are in it.
+        """
+        excluded, links = self._excluded_links(links)
+        if not excluded:
+            return self.graph
+        return self._subgraph(self._filtered_graph(excluded, lambda: links))
+
+    def _filtered_graph(self, constraints, filter_links):
+        """Return the cached [links, subgraph] of some metric constraints.
+
+        The constraints are (metric, value) pairs, normalized regardless of
+        their order and whether they are mandatory or flexible, and
+        ``filter_links`` is called to filter their links on a cache miss.
+        The entries are kept in an LRU of up to
+        ``settings.FILTERED_GRAPH_CACHE_SIZE`` entries per snapshot. The
+        subgraph view is only created by ``_subgraph``.
+        """
+        key = tuple(
+            sorted(
+                json.dumps([metric, value], sort_keys=True, default=str)
+                for metric, value in constraints
+                if metric in self._filter_functions or metric == "excluded_links"
+            )
+        )
+        with self._filtered_graphs_lock:
+            entry = self._filtered_graphs.get(key)
+            if entry is not None:
+                self._filtered_graphs.move_to_end(key)
+                return entry
+        entry = [filter_links(), None]
+        size = settings.FILTERED_GRAPH_CACHE_SIZE
+        if size:
+            with self._filtered_graphs_lock:
+                entry = self._filtered_graphs.setdefault(key, entry)
+                while len(self._filtered_graphs) > size:
+                    self._filtered_graphs.popitem(last=False)
+        return entry
+
+    def _subgraph(self, filtered_graph):
+        """Return the subgraph view of a cached filtered graph entry."""
+        if filtered_graph[1] is None:
+            filtered_graph[1] = self.graph.edge_subgraph(
+                self.metric_index.edges(filtered_graph[0])
+            )
+        return filtered_graph[1]
+
+    def _connected(self, links, source, destination, connectivity):
+        """Return whether some links connect the source and destination.
+
+        The ``links`` are an int bitset of the edges of ``metric_index``,
+        the ``destination`` can be a list of candidates of which any must be
+        connected, and ``connectivity`` maps the bitsets already checked to their
+        result, which also holds for their supersets if they are connected
+        and for their subsets if they are not.
+        """
+        for checked, connected in connectivity.items():
+            if connected and links & checked == checked:
+                return True
+            if not connected and not links & ~checked:
+                return False
+        components = nx.utils.UnionFind()
+        for endpoint_a, endpoint_b in self.metric_index.edges(links):
+            components.union(endpoint_a, endpoint_b)
+        destinations = destination if isinstance(destination, list) else [destination]
+        connected = source in components.parents and any(
+            destination in components.parents
+            and components[source] == components[destination]
+            for destination in destinations
+        )
+        connectivity[links] = connected
+        return connected
+
     def _filter_links(self, links, **metrics):
+        """Filter links given the metrics.
+
+        The ``links`` are either (u, v, data) edges or an int bitset of the
+        edges of ``metric_index``, which is then filtered as a bitset.
+        """
         for metric, value in metrics.items():
             filter_func = self._filter_functions.get(metric, None)
             if filter_func is not None:
                 try:
-                    links = filter_func(value, links)
+                    if isinstance(links, int):
+                        links = self.metric_index.filter(metric, value, links)
+                    else:
+                        links = filter_func(value, links)
                 except TypeError as err:
                     raise TypeError(
                         f"Error in {metric} value: {value} err: {err}"
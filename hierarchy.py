@@ -0,0 +1,241 @@
+"""Contraction hierarchy module of kytos/pathfinder Kytos Network App."""
+
+# pylint: disable=too-many-arguments,too-many-locals,too-many-branches
+from heapq import heapify, heappop, heappush
+from itertools import count
+from math import inf
+
+from napps.kytos.pathfinder.utils import Path
+
+
+class ContractionHierarchy:
+    """Contraction hierarchy of a CSR graph by the weights of an attribute.
+
+    The nodes are contracted one at a time in the order of their edge
+    difference, which is updated lazily, and a shortcut is added between
+    each pair of neighbors of a contracted node unless a witness search,
+    limited to ``settle_limit`` settled nodes, finds a path between them
+    that is as short without it. Once the next node has more than
+    ``core_degree`` neighbors, the remaining ones are left as a core that
+    keeps all their arcs. ``upward`` maps each node to a dict of its
+    (weight, via) arcs to the nodes contracted after it, or to the other
+    core nodes, where ``via`` is the CSR edge of the arc or ``-1 - middle``
+    for a shortcut through the ``middle`` node. Shortest paths are then
+    searched upwards from both ends, and ``weights`` keeps the weights the
+    hierarchy was built with.
+    """
+
+    def __init__(self, csr, weight, settle_limit=50, core_degree=16):
+        self.weight = weight
+        self.weights = csr.weights[weight][:]
+        self.offsets = csr.offsets
+        num_nodes = len(csr)
+        adj = [{} for _ in range(num_nodes)]
+        for node in range(num_nodes):
+            for arc in range(csr.offsets[node], csr.offsets[node + 1]):
+                nbr, edge = csr.targets[arc], csr.arc_edges[arc]
+                if nbr not in adj[node] or self.weights[edge] < adj[node][nbr][0]:
+                    adj[node][nbr] = (self.weights[edge], edge)
+        self.upward = [None] * num_nodes
+        deleted = [0] * num_nodes
+        level = [0] * num_nodes
+        queue = [
+            (len(self._shortcuts(adj, node, settle_limit)) - len(adj[node]), node)
+            for node in range(num_nodes)
+        ]
+        heapify(queue)
+        while queue:
+            _, node = heappop(queue)
+            if len(adj[node]) > core_degree:
+                for core_node in [node] + [core_node for _, core_node in queue]:
+                    self.upward[core_node] = adj[core_node]
+                break
+            shortcuts = self._shortcuts(adj, node, settle_limit)
+            priority = len(shortcuts) - len(adj[node]) + deleted[node] + level[node]
+            if queue and priority > queue[0][0]:
+                heappush(queue, (priority, node))
+                continue
+            for source, target, length in shortcuts:
+                adj[source][target] = adj[target][source] = (length, -1 - node)
+            self.upward[node] = adj[node]
+            for nbr in adj[node]:
+                del adj[nbr][node]
+                deleted[nbr] += 1
+                level[nbr] = max(level[nbr], level[node] + 1)
+            adj[node] = {}
+
+    @staticmethod
+    def _shortcuts(adj, node, settle_limit):
+        """Return the (source, target, weight) shortcuts a node needs.
+
+        They join the pairs of its neighbors whose shortest path without
+        it, as found by a witness search, is longer than the one through it.
+        """
+        shortcuts = []
+        nbrs = list(adj[node].items())
+        for idx, (source, (source_weight, _)) in enumerate(nbrs):
+            targets = {
+                target: source_weight + target_weight
+                for target, (target_weight, _) in nbrs[idx + 1:]
+            }
+            if not targets:
+                continue
+            witnesses = _witness_search(
+                adj, source, node, max(targets.values()), settle_limit
+            )
+            for target, weight in targets.items():
+                if witnesses.get(target, inf) > weight:
+                    shortcuts.append((source, target, weight))
+        return shortcuts
+
+    def built_on(self, csr):
+        """Return whether a CSR graph has the structure it was built on."""
+        return csr.offsets is self.offsets
+
+    def valid(self, csr, edge_id):
+        """Return whether an edge still has the weight it was built with.
+
+        ``csr`` must share the structure of the graph it was built on.
+        """
+        return csr.weights[self.weight][edge_id] == self.weights[edge_id]
+
+    def search(self, sources, targets):
+        """Return the (cost, nodes, edges) shortest path or None.
+
+        ``sources`` and ``targets`` map the nodes the search starts from
+        and ends at to their initial cost. Both directions are searched
+        upwards, alternately, until neither can find a shorter path than
+        the best one through a node they both reached, and its shortcuts
+        are unpacked into the nodes and CSR edges of the path.
+        """
+        upward = self.upward
+        dists = ({}, {})
+        preds = ({}, {})
+        fringe = ([], [])
+        counter = count()
+        for direction, seeds in enumerate((sources, targets)):
+            for node, cost in seeds.items():
+                preds[direction][node] = None
+                dists[direction][node] = cost
+                heappush(fringe[direction], (cost, next(counter), node))
+        best_cost, meet = inf, None
+        direction = 1
+        while fringe[0] or fringe[1]:
+            if fringe[1 - direction]:
+                direction = 1 - direction
+            cost, _, node = heappop(fringe[direction])
+            if cost > dists[direction][node]:
+                continue
+            if cost >= best_cost:
+                fringe[direction].clear()
+                continue
+            other = dists[1 - direction]
+            if node in other and cost + other[node] < best_cost:
+                best_cost, meet = cost + other[node], node
+            node_dists, node_preds = dists[direction], preds[direction]
+            for nbr, (weight, via) in upward[node].items():
+                nbr_cost = cost + weight
+                if nbr_cost < node_dists.get(nbr, inf):
+                    node_dists[nbr] = nbr_cost
+                    node_preds[nbr] = (node, via)
+                    heappush(fringe[direction], (nbr_cost, next(counter), nbr))
+        if meet is None:
+            return None
+        nodes, edges = [meet], []
+        for direction in (0, 1):
+            half_nodes, half_edges = [], []
+            node = meet
+            while preds[direction][node] is not None:
+                pred, via = preds[direction][node]
+                arc_nodes, arc_edges = self._unpack(pred, node, via)
+                half_nodes.extend(reversed(arc_nodes[:-1]))
+                half_edges.extend(reversed(arc_edges))
+                node = pred
+            if direction == 0:
+                nodes = half_nodes[::-1] + nodes
+                edges = half_edges[::-1]
+            else:
+                nodes.extend(half_nodes)
+                edges.extend(half_edges)
+        return best_cost, nodes, edges
+
+    def _unpack(self, node, nbr, via):
+        """Return the (nodes, edges) of an arc, unpacking its shortcuts."""
+        if via >= 0:
+            return [node, nbr], [via]
+        middle = -1 - via
+        head_nodes, head_edges = self._unpack(
+            node, middle, self.upward[middle][node][1]
+        )
+        tail_nodes, tail_edges = self._unpack(
+            middle, nbr, self.upward[middle][nbr][1]
+        )
+        return head_nodes + tail_nodes[1:], head_edges + tail_edges
+
+
+def _witness_search(adj, source, excluded, max_cost, settle_limit):
+    """Return the distances from a node that avoid an excluded node.
+
+    The search stops past ``max_cost`` or after ``settle_limit`` settled
+    nodes, so the distances are upper bounds.
+    """
+    dists = {source: 0}
+    fringe = [(0, source)]
+    settled = 0
+    while fringe and settled < settle_limit:
+        cost, node = heappop(fringe)
+        if cost > dists[node]:
+            continue
+        if cost > max_cost:
+            break
+        settled += 1
+        for nbr, (weight, _) in adj[node].items():
+            if nbr == excluded:
+                continue
+            nbr_cost = cost + weight
+            if nbr_cost < dists.get(nbr, inf):
+                dists[nbr] = nbr_cost
+                heappush(fringe, (nbr_cost, nbr))
+    return dists
+
+
+def shortest_path(hierarchy, query):
+    """Return the shortest path of a CSR ``Query`` as a ``Path`` or None.
+
+    Detached source and target interfaces are searched from the ends of
+    their virtual arcs, which are never longer than the detached link they
+    replace, and a virtual arc between them is a path of its own.
+    """
+    seeds = []
+    direct = (inf, None, None)
+    for end, other in ((query.source, query.target), (query.target, query.source)):
+        if end < len(query.csr):
+            seeds.append({end: (0, None)})
+            continue
+        end_seeds = {}
+        for nbr, edge, weight in query.extra.get(end, ()):
+            if nbr == other:
+                if weight < direct[0]:
+                    direct = (weight, [query.source, query.target], [edge])
+            elif nbr not in end_seeds or weight < end_seeds[nbr][0]:
+                end_seeds[nbr] = (weight, edge)
+        seeds.append(end_seeds)
+    found = hierarchy.search(
+        {node: cost for node, (cost, _) in seeds[0].items()},
+        {node: cost for node, (cost, _) in seeds[1].items()},
+    )
+    if found is not None:
+        cost, nodes, edges = found
+        source_edge = seeds[0][nodes[0]][1]
+        if source_edge is not None:
+            nodes, edges = [query.source] + nodes, [source_edge] + edges
+        target_edge = seeds[1][nodes[-1]][1]
+        if target_edge is not None:
+            nodes, edges = nodes + [query.target], edges + [target_edge]
+        found = cost, nodes, edges
+    if direct[1] is not None and (found is None or direct[0] <= found[0]):
+        found = direct
+    if found is None:
+        return None
+    cost, nodes, edges = found
+    return Path(query.hops(nodes, edges), cost, query.weight)
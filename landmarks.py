@@ -0,0 +1,191 @@
+"""Landmark module of kytos/pathfinder Kytos Network Application."""
+
+# pylint: disable=too-many-arguments,too-many-locals,too-many-branches
+from array import array
+from heapq import heappop, heappush
+from itertools import count
+from math import inf
+
+
+class Landmarks:
+    """Distances of the nodes of a CSR graph from a few landmark nodes.
+
+    The landmarks are picked by a farthest first traversal of the graph
+    by the weights of an spf attribute, each one being the node farthest
+    from the ones already picked, and ``dists`` holds an array of the
+    distances of every node from each of them, ``inf`` if unreachable. By
+    the triangle inequality ``|dists[l][u] - dists[l][v]|`` is a lower
+    bound of the distance between ``u`` and ``v``, which holds as long as
+    the edges of the graph are only removed or have their weight raised,
+    so ``admissible`` checks the updated weights of an edge against the
+    ``weights`` the distances were computed with.
+    """
+
+    def __init__(self, csr, weight, size):
+        self.weight = weight
+        self.weights = csr.weights[weight][:]
+        self.offsets = csr.offsets
+        self.nodes = []
+        self.dists = []
+        if not csr:
+            return
+        # the distances to the nearest landmark picked so far
+        nearest = _dijkstra(csr, self.weights, 0)
+        for _ in range(size):
+            node = max(range(len(csr)), key=nearest.__getitem__)
+            if node in self.nodes:
+                break
+            dists = _dijkstra(csr, self.weights, node)
+            self.nodes.append(node)
+            self.dists.append(dists)
+            if len(self.nodes) == 1:
+                nearest = dists[:]
+            else:
+                for idx, dist in enumerate(dists):
+                    nearest[idx] = min(nearest[idx], dist)
+
+    def admissible(self, csr, edge_id):
+        """Return whether the bounds hold for the updated weights of an edge.
+
+        ``csr`` must share the structure of the graph they were built on.
+        """
+        return csr.weights[self.weight][edge_id] >= self.weights[edge_id]
+
+    def built_on(self, csr):
+        """Return whether a CSR graph has the structure they were built on."""
+        return csr.offsets is self.offsets
+
+
+def _dijkstra(csr, weights, source):
+    """Return an array of the distances of the CSR nodes from a node."""
+    offsets, targets, arc_edges = csr.offsets, csr.targets, csr.arc_edges
+    dists = array("d", [inf]) * len(csr)
+    dists[source] = 0
+    fringe = [(0, source)]
+    while fringe:
+        cost, node = heappop(fringe)
+        if cost > dists[node]:
+            continue
+        for arc in range(offsets[node], offsets[node + 1]):
+            nbr = targets[arc]
+            nbr_cost = cost + weights[arc_edges[arc]]
+            if nbr_cost < dists[nbr]:
+                dists[nbr] = nbr_cost
+                heappush(fringe, (nbr_cost, nbr))
+    return dists
+
+
+class LandmarkSearch:
+    """A* search of the spur paths of a query guided by landmark bounds.
+
+    The estimate of a CSR node is the largest lower bound of its distance
+    to the target given by the ``Landmarks``, measured to the switch of the
+    target minus the weight of its switch edge if the target is a detached
+    interface, which keeps the estimates consistent with the virtual arcs.
+    Virtual nodes are estimated as 0. The estimates are cached across the
+    spur searches of the query, which must not be a list of candidates.
+    """
+
+    def __init__(self, query, landmarks):
+        self.query = query
+        csr = query.csr
+        base, offset = query.target, 0
+        if base >= len(csr):
+            names = {virtual: node for node, virtual in query.virtual_nodes.items()}
+            base = csr.index(names[base])
+            offset = csr.port_weight(query.weight, names[query.target])
+        self.offset = offset
+        self.bounds = [
+            (dists, dists[base]) for dists in landmarks.dists if dists[base] < inf
+        ]
+        self.estimates = {}
+
+    def estimate(self, node):
+        """Return the lower bound of the distance of a node to the target."""
+        if node >= len(self.query.csr):
+            return 0
+        estimate = self.estimates.get(node)
+        if estimate is None:
+            estimate = 0
+            for dists, target_dist in self.bounds:
+                dist = dists[node]
+                if dist == inf:
+                    estimate = inf
+                    break
+                estimate = max(estimate, abs(dist - target_dist))
+            estimate = self.estimates[node] = max(0, estimate - self.offset)
+        return estimate
+
+    def search(self, spur_node, ignore_nodes, ignore_edges, cutoff=None):
+        """Search the shortest path from a spur node to the target.
+
+        The estimates are lower bounds, so the search stops with None once
+        they exceed the ``cutoff``, if given.
+        """
+        query = self.query
+        csr, weights, mask, extra = query.csr, query.weights, query.mask, query.extra
+        offsets, targets, arc_edges = csr.offsets, csr.targets, csr.arc_edges
+        num_nodes = len(csr)
+        target = query.target
+        if query.detached:
+            ignore_edges = ignore_edges | query.detached
+        if spur_node in ignore_nodes or target in ignore_nodes:
+            return None
+        estimate = self.estimate
+        seen = {spur_node: 0}
+        preds = {spur_node: None}
+        settled = set()
+        fringe = [(estimate(spur_node), 0, spur_node)]
+        counter = count(1)
+        while fringe:
+            node_estimate, _, node = heappop(fringe)
+            if node in settled:
+                continue
+            if node_estimate == inf or cutoff is not None and node_estimate > cutoff:
+                return None
+            if node == target:
+                return (seen[target], *_trace_path(preds, target))
+            settled.add(node)
+            cost = seen[node]
+            if node < num_nodes:
+                for arc in range(offsets[node], offsets[node + 1]):
+                    edge = arc_edges[arc]
+                    if edge in ignore_edges or (
+                        mask is not None and not mask[edge >> 3] >> (edge & 7) & 1
+                    ):
+                        continue
+                    nbr = targets[arc]
+                    if nbr in settled or nbr in ignore_nodes:
+                        continue
+                    nbr_cost = cost + weights[edge]
+                    if nbr not in seen or nbr_cost < seen[nbr]:
+                        nbr_estimate = estimate(nbr)
+                        if nbr_estimate < inf:
+                            seen[nbr] = nbr_cost
+                            preds[nbr] = (node, edge)
+                            heappush(
+                                fringe, (nbr_cost + nbr_estimate, next(counter), nbr)
+                            )
+            for nbr, edge, weight in extra.get(node, ()):
+                if edge in ignore_edges or nbr in settled or nbr in ignore_nodes:
+                    continue
+                nbr_cost = cost + weight
+                if nbr not in seen or nbr_cost < seen[nbr]:
+                    nbr_estimate = estimate(nbr)
+                    if nbr_estimate < inf:
+                        seen[nbr] = nbr_cost
+                        preds[nbr] = (node, edge)
+                        heappush(fringe, (nbr_cost + nbr_estimate, next(counter), nbr))
+        return None
+
+
+def _trace_path(preds, node):
+    """Return the nodes and edges of the path to a node by its predecessors."""
+    nodes, edges = [node], []
+    while preds[node] is not None:
+        node, edge = preds[node]
+        nodes.append(node)
+        edges.append(edge)
+    nodes.reverse()
+    edges.reverse()
+    return nodes, edges
@@ -1,12 +1,19 @@
 """Main module of kytos/pathfinder Kytos Network Application."""
 
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
 from typing import Generator
 
 from flask import jsonify, request
 from kytos.core import KytosEvent, KytosNApp, log, rest
 from kytos.core.helpers import listen_to
+from napps.kytos.pathfinder import settings
+from napps.kytos.pathfinder.cache import ResultCache
+from napps.kytos.pathfinder.destinations import (
+    constrained_k_shortest_paths_many, k_shortest_paths_many)
 from napps.kytos.pathfinder.graph import KytosGraph
+from napps.kytos.pathfinder.parallel import ReplicaPool
+from napps.kytos.pathfinder.waypoints import waypoint_paths
 # pylint: disable=import-error
 from werkzeug.exceptions import BadRequest
 
@@ -19,8 +26,34 @@ class Main(KytosNApp):
     """
 
     def setup(self):
-        """Create a graph to handle the nodes and edges."""
+        """Create a graph to handle the nodes and edges.
+
+        ``self.graph`` is a read-only snapshot, writers serialize on
+        ``self._lock``, update a copy of it and then publish the copy,
+        so path computations can read the current snapshot without locking.
+        ``v2/`` results are cached per payload, and publishing a snapshot
+        only invalidates the cached results that its changes affect.
+        Paths are searched on ``self.replica_pool`` if enabled. The
+        contraction hierarchies of the published snapshots, once an engine
+        other than "networkx" is used, and their landmarks, once the "alt"
+        engine is used, are refreshed in the background by
+        ``self._index_executor``.
+        """
         self.graph = KytosGraph()
+        self.result_cache = ResultCache(
+            settings.RESULT_CACHE_SIZE,
+            settings.RESULT_CACHE_TTL,
+            self.graph.generation,
+        )
+        self.replica_pool = None
+        if settings.PARALLEL_WORKERS:
+            self.replica_pool = ReplicaPool(settings.PARALLEL_WORKERS)
+        self._index_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="pathfinder_indexes"
+        )
+        self._index_refresh = None
+        self._landmarks_used = False
+        self._hierarchies_used = False
         self._topology = None
         self._lock = Lock()
         self._topology_updated_at = None
@@ -31,6 +64,9 @@ class Main(KytosNApp):
 
     def shutdown(self):
         """Shutdown the napp."""
+        if self.replica_pool is not None:
+            self.replica_pool.shutdown()
+        self._index_executor.shutdown(wait=False)
 
     def _filter_paths_le_cost(self, paths, max_cost):
         """Filter by paths where the cost is le <= max_cost."""
@@ -111,6 +147,35 @@ class Main(KytosNApp):
 
     def _validate_payload(self, data):
         """Validate shortest_path v2/ POST endpoint."""
+        self._validate_endpoints(data)
+        self._validate_links(data)
+        self._validate_desired_links_mode(data)
+        self._validate_spf(data)
+        self._validate_metrics(data)
+        return data
+
+    @staticmethod
+    def _validate_endpoints(data):
+        """Validate the source and the destination or destinations."""
+        if data.get("source") is None:
+            raise BadRequest("source is required")
+
+        destinations = data.get("destinations")
+        if (data.get("destination") is None) == (destinations is None):
+            raise BadRequest("Exactly one of destination or destinations is required")
+        if destinations is not None:
+            if not isinstance(destinations, list) or not destinations:
+                raise BadRequest(
+                    "TypeError: destinations is supposed to be a non empty"
+                    f" list. type: {type(destinations)}"
+                )
+
+        if data.get("anycast") and destinations is None:
+            raise BadRequest("anycast requires a list of destinations")
+
+    @staticmethod
+    def _validate_links(data):
+        """Validate the desired and undesired links."""
         if data.get("desired_links"):
             if not isinstance(data["desired_links"], list):
                 raise BadRequest(
@@ -125,6 +190,30 @@ class Main(KytosNApp):
                     f" type: {type(data['undesired_links'])}"
                 )
 
+    @staticmethod
+    def _validate_desired_links_mode(data):
+        """Validate the desired_links_mode and what it supports."""
+        desired_links_mode = data.get("desired_links_mode", "filter")
+        if desired_links_mode not in ("filter", "waypoints"):
+            raise BadRequest(
+                "Invalid 'desired_links_mode'. Valid values: filter, waypoints"
+            )
+        if desired_links_mode == "waypoints":
+            if data.get("destinations") is not None or data.get(
+                "flexible_metrics"
+            ):
+                raise BadRequest(
+                    "desired_links_mode waypoints doesn't support destinations"
+                    " or flexible_metrics"
+                )
+            if len(data.get("desired_links") or []) > settings.WAYPOINT_MAX_LINKS:
+                raise BadRequest(
+                    "desired_links_mode waypoints supports up to"
+                    f" {settings.WAYPOINT_MAX_LINKS} desired_links"
+                )
+
+    def _validate_spf(self, data):
+        """Validate and normalize the spf parameters."""
         parameter = data.get("parameter")
         spf_attr = data.get("spf_attribute")
         if not spf_attr:
@@ -137,6 +226,13 @@ class Main(KytosNApp):
                 f"{', '.join(self.graph.spf_edge_data_cbs.keys())}"
             )
 
+        spf_engine = data.get("spf_engine")
+        if spf_engine is not None and spf_engine not in KytosGraph.SPF_ENGINES:
+            raise BadRequest(
+                "Invalid 'spf_engine'. Valid values: "
+                f"{', '.join(KytosGraph.SPF_ENGINES)}"
+            )
+
         try:
             data["spf_max_paths"] = max(int(data.get("spf_max_paths", 2)), 1)
         except (TypeError, ValueError):
@@ -155,6 +251,9 @@ class Main(KytosNApp):
                     " be an int"
                 )
 
+    @staticmethod
+    def _validate_metrics(data):
+        """Validate and normalize the metrics and minimum_flexible_hits."""
         data["mandatory_metrics"] = data.get("mandatory_metrics", {})
         data["flexible_metrics"] = data.get("flexible_metrics", {})
 
@@ -170,58 +269,300 @@ class Main(KytosNApp):
                 f"minimum_hits {data.get('minimum_flexible_hits')} must be an int"
             )
 
-        return data
-
     @rest("v2/", methods=["POST"])
     def shortest_path(self):
         """Calculate the best path between the source and destination."""
+        graph = self.graph
         data = request.get_json()
         data = self._validate_payload(data)
+        paths = self._shortest_paths(graph, data)
+        return jsonify({"paths": paths, "graph_generation": graph.generation})
+
+    @rest("v2/batch", methods=["POST"])
+    def shortest_paths_batch(self):
+        """Calculate the best paths of a list of v2/ payloads.
+
+        They are all computed on the same graph snapshot, and the payloads
+        that aren't cached and only differ in their destination are searched
+        at once, like the ``destinations`` of a v2/ payload, on a graph
+        filtered once and, with the networkx engine, from a single shortest
+        path tree of their source.
+        Their paths or errors are returned in order.
+        """
+        graph = self.graph
+        payloads = request.get_json()
+        if not isinstance(payloads, list):
+            raise BadRequest(
+                "TypeError: the payload is supposed to be a list of v2/"
+                f" payloads. type: {type(payloads)}"
+            )
+
+        results = [None] * len(payloads)
+        groups = {}
+        for position, data in enumerate(payloads):
+            try:
+                if not isinstance(data, dict):
+                    raise BadRequest(
+                        "TypeError: each payload is supposed to be a dict."
+                        f" type: {type(data)}"
+                    )
+                data = self._validate_payload(data)
+            except BadRequest as err:
+                results[position] = {"error": err.description}
+                continue
+            cache_key = self.result_cache.key(data)
+            paths = self.result_cache.get(cache_key, graph.generation)
+            if paths is not None:
+                results[position] = {"paths": paths}
+                continue
+            groups.setdefault(self._batch_group(data, position), []).append(
+                (position, data, cache_key)
+            )
+
+        for items in groups.values():
+            found = self._batch_search(graph, items)
+            for position, data, cache_key in items:
+                try:
+                    paths = self._computed_paths(
+                        graph,
+                        data,
+                        cache_key,
+                        None if found is None else found[data["destination"]],
+                    )
+                    results[position] = {"paths": paths}
+                except BadRequest as err:
+                    results[position] = {"error": err.description}
+                except Exception as err:  # pylint: disable=broad-except
+                    log.error(f"POST v2/batch payload {data} failed: {err!r}")
+                    results[position] = {"error": f"{type(err).__name__}: {err}"}
+        return jsonify({"results": results, "graph_generation": graph.generation})
+
+    @staticmethod
+    def _batch_group(data, position):
+        """Return the key of the batch payloads whose paths are searched at once.
+
+        The payloads to a single destination are grouped by everything but
+        their destination and desired links, which only filter their paths,
+        and the other ones are searched on their own.
+        """
+        if data.get("destinations") is not None or (
+            data.get("desired_links_mode") == "waypoints"
+            and data.get("desired_links")
+        ):
+            return position
+        return ResultCache.key(
+            {
+                key: value
+                for key, value in data.items()
+                if key not in ("destination", "desired_links")
+            }
+        )
+
+    def _batch_search(self, graph, items):
+        """Return the paths searched at once for a group of batch payloads.
+
+        They map each destination to its paths before they are costed and
+        filtered, searched from the source to all of the destinations by
+        ``_destination_paths``, which shares the filtered graph and the
+        shortest path tree of the source. None is returned if the group has a single
+        destination or if the search fails, and then each payload is
+        searched on its own and reports its own error.
+        """
+        destinations = list(dict.fromkeys(data["destination"] for _, data, _ in items))
+        if len(destinations) < 2:
+            return None
+        data = {**items[0][1], "destinations": destinations}
+        try:
+            return self._destination_paths(graph, data)
+        except Exception as err:  # pylint: disable=broad-except
+            log.debug(f"POST v2/batch group search failed: {err!r}")
+            return None
+
+    def _shortest_paths(self, graph, data):
+        """Return the best paths of a validated v2/ payload on a graph."""
+        cache_key = self.result_cache.key(data)
+        paths = self.result_cache.get(cache_key, graph.generation)
+        if paths is not None:
+            log.debug(f"POST v2/ cached result: {self.result_cache.stats}")
+            return paths
+        return self._computed_paths(graph, data, cache_key)
 
+    def _computed_paths(self, graph, data, cache_key, found=None):
+        """Compute, filter and cache the best paths of a v2/ payload.
+
+        ``found`` are the paths of the payload before they are costed and
+        filtered if they were already searched.
+        """
         desired = data.get("desired_links")
         undesired = data.get("undesired_links")
 
         spf_attr = data.get("spf_attribute")
-        spf_max_paths = data.get("spf_max_paths")
         spf_max_path_cost = data.get("spf_max_path_cost")
+        destinations = data.get("destinations")
         mandatory_metrics = data.get("mandatory_metrics")
         flexible_metrics = data.get("flexible_metrics")
-        minimum_hits = data.get("minimum_flexible_hits")
         log.debug(f"POST v2/ payload data: {data}")
 
-        try:
-            with self._lock:
-                if any([mandatory_metrics, flexible_metrics]):
-                    paths = self.graph.constrained_k_shortest_paths(
-                        data["source"],
-                        data["destination"],
-                        weight=self.graph.spf_edge_data_cbs[spf_attr],
-                        k=spf_max_paths,
-                        minimum_hits=minimum_hits,
-                        mandatory_metrics=mandatory_metrics,
-                        flexible_metrics=flexible_metrics,
-                    )
-                else:
-                    paths = self.graph.k_shortest_paths(
-                        data["source"],
-                        data["destination"],
-                        weight=self.graph.spf_edge_data_cbs[spf_attr],
-                        k=spf_max_paths,
-                    )
+        self._use_engine(graph, data.get("spf_engine") or settings.SPF_ENGINE)
 
-                paths = self.graph.path_cost_builder(
-                    paths,
-                    weight=spf_attr,
-                )
+        try:
+            if found is not None:
+                paths = found
+            elif destinations is not None and not data.get("anycast"):
+                paths = self._shortest_paths_many(graph, data)
+            else:
+                paths = self._shortest_paths_one(graph, data)
+
+            paths = graph.path_cost_builder(
+                paths,
+                weight=spf_attr,
+            )
             log.debug(f"Found paths: {paths}")
         except TypeError as err:
             raise BadRequest(str(err))
 
+        dependencies = ResultCache.dependencies(
+            paths, spf_attr, {**mandatory_metrics, **flexible_metrics}
+        )
         paths = self._filter_paths_le_cost(paths, max_cost=spf_max_path_cost)
         paths = self._filter_paths_undesired_links(paths, undesired)
         paths = self._filter_paths_desired_links(paths, desired)
         log.debug(f"Filtered paths: {paths}")
-        return jsonify({"paths": paths})
+        self.result_cache.put(cache_key, paths, graph.generation, dependencies)
+        return paths
+
+    def _use_engine(self, graph, engine):
+        """Refresh the indexes of an engine on its first use if stale."""
+        if engine != "networkx" and not self._hierarchies_used:
+            self._hierarchies_used = True
+            if graph.stale_hierarchies():
+                self._refresh_indexes()
+        if engine == "alt":
+            self._landmarks_used = True
+            if graph.stale_landmarks():
+                self._refresh_indexes()
+
+    def _undesired_endpoints(self, data):
+        """Return the (endpoint_a, endpoint_b) of the undesired links."""
+        if not data.get("undesired_links") or self._topology is None:
+            return []
+        return list(self._map_endpoints_from_link_ids(data["undesired_links"]))
+
+    def _shortest_paths_one(self, graph, data):
+        """Return the paths of a v2/ payload to its destination.
+
+        With ``anycast``, the destination is the nearest of the
+        ``destinations``. The undesired links are excluded before searching.
+        """
+        destination = data["destinations"] if data.get("anycast") else None
+        if destination is None:
+            destination = data["destination"]
+        weight = graph.spf_edge_data_cbs[data["spf_attribute"]]
+        excluded_links = self._undesired_endpoints(data)
+        if data.get("desired_links_mode") == "waypoints" and data.get(
+            "desired_links"
+        ):
+            return self._waypoint_paths(graph, data, excluded_links)
+        if any([data["mandatory_metrics"], data["flexible_metrics"]]):
+            return graph.constrained_k_shortest_paths(
+                data["source"],
+                destination,
+                weight=weight,
+                k=data["spf_max_paths"],
+                minimum_hits=data["minimum_flexible_hits"],
+                engine=data.get("spf_engine"),
+                pool=self.replica_pool,
+                max_cost=data.get("spf_max_path_cost") or None,
+                mandatory_metrics=data["mandatory_metrics"],
+                flexible_metrics=data["flexible_metrics"],
+                excluded_links=excluded_links,
+            )
+        return graph.k_shortest_paths(
+            data["source"],
+            destination,
+            weight=weight,
+            k=data["spf_max_paths"],
+            graph=graph.without_links(excluded_links) if excluded_links else None,
+            engine=data.get("spf_engine"),
+            pool=self.replica_pool,
+            max_cost=data.get("spf_max_path_cost") or None,
+        )
+
+    def _waypoint_paths(self, graph, data, excluded_links):
+        """Return the paths of a v2/ payload through its desired links.
+
+        The desired links are waypoints of the paths, which are searched
+        segment by segment instead of filtering the k shortest paths, and
+        there are no paths if any of them isn't a link of the topology.
+        """
+        if self._topology is None:
+            return []
+        desired = set(data["desired_links"])
+        waypoints = list(self._map_endpoints_from_link_ids(desired))
+        if len(waypoints) < len(desired):
+            return []
+        return waypoint_paths(
+            graph,
+            data["source"],
+            data["destination"],
+            waypoints,
+            weight=data["spf_attribute"],
+            k=data["spf_max_paths"],
+            max_cost=data.get("spf_max_path_cost") or None,
+            mandatory_metrics=data["mandatory_metrics"],
+            excluded_links=excluded_links,
+        )
+
+    def _shortest_paths_many(self, graph, data):
+        """Return the paths of a v2/ payload with several destinations.
+
+        They are returned in the order of the destinations.
+        """
+        paths = self._destination_paths(graph, data)
+        return [
+            path
+            for destination in data["destinations"]
+            for path in paths[destination]
+        ]
+
+    def _destination_paths(self, graph, data):
+        """Return the paths of a v2/ payload by destination.
+
+        They are searched from the source to all the destinations at once,
+        without the undesired links, and from a single shortest path tree of
+        the source by ``k_shortest_paths_many`` with the networkx engine,
+        unless there are flexible metrics.
+        """
+        weight = graph.spf_edge_data_cbs[data["spf_attribute"]]
+        excluded_links = self._undesired_endpoints(data)
+        if any([data["mandatory_metrics"], data["flexible_metrics"]]):
+            paths = constrained_k_shortest_paths_many(
+                graph,
+                data["source"],
+                data["destinations"],
+                weight=weight,
+                k=data["spf_max_paths"],
+                minimum_hits=data["minimum_flexible_hits"],
+                engine=data.get("spf_engine"),
+                pool=self.replica_pool,
+                max_cost=data.get("spf_max_path_cost") or None,
+                mandatory_metrics=data["mandatory_metrics"],
+                flexible_metrics=data["flexible_metrics"],
+                excluded_links=excluded_links,
+            )
+        else:
+            paths = k_shortest_paths_many(
+                graph,
+                data["source"],
+                data["destinations"],
+                weight=weight,
+                k=data["spf_max_paths"],
+                view=graph.without_links(excluded_links) if excluded_links else None,
+                engine=data.get("spf_engine"),
+                pool=self.replica_pool,
+                max_cost=data.get("spf_max_path_cost") or None,
+            )
+        return paths
 
     @listen_to(
         "kytos.topology.updated",
@@ -245,10 +586,46 @@ class Main(KytosNApp):
                 return
             self._topology = topology
             self._topology_updated_at = event.timestamp
-            self.graph.update_topology(topology)
+            graph = self.graph.copy()
+            deltas = graph.update_topology(topology)
+            self._publish(graph)
         switches = list(topology.switches.keys())
         links = list(topology.links.keys())
         log.debug(f"Topology graph updated with switches: {switches}, links: {links}.")
+        if deltas is not None:
+            log.debug(f"Topology graph deltas applied: {dict(deltas)}")
+
+    def _publish(self, graph):
+        """Publish a graph snapshot, invalidating the affected results.
+
+        It must be called holding ``self._lock``.
+        """
+        self.graph = graph
+        self.result_cache.invalidate(graph.generation, graph.changed_dependencies())
+        if self._landmarks_used or (
+            self._hierarchies_used and graph.stale_hierarchies()
+        ):
+            self._refresh_indexes()
+
+    def _refresh_indexes(self):
+        """Refresh the stale indexes of the graph in the background.
+
+        The refresh builds the indexes of the snapshot published when it
+        runs, so one that is queued but not running yet is enough.
+        """
+        refresh = self._index_refresh
+        if refresh is None or refresh.running() or refresh.done():
+            self._index_refresh = self._index_executor.submit(
+                self._refresh_current_indexes
+            )
+
+    def _refresh_current_indexes(self):
+        """Build the stale indexes of the current graph snapshot."""
+        graph = self.graph
+        if self._hierarchies_used:
+            graph.refresh_hierarchies()
+        if self._landmarks_used:
+            graph.refresh_landmarks()
 
     def update_links_metadata_changed(self, event) -> None:
         """Update the graph when links' metadata are added or removed."""
@@ -260,7 +637,11 @@ class Main(KytosNApp):
                     and self._links_updated_at[link.id] > event.timestamp
                 ):
                     return
-                self.graph.update_link_metadata(link)
+                graph = self.graph.copy(
+                    edges=[(link.endpoint_a.id, link.endpoint_b.id)]
+                )
+                graph.update_link_metadata(link)
+                self._publish(graph)
                 self._links_updated_at[link.id] = event.timestamp
             metadata = event.content["metadata"]
             log.debug(f"Topology graph updated link id: {link.id} metadata: {metadata}")
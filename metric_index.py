@@ -0,0 +1,185 @@
+"""Metric index module of kytos/pathfinder Kytos Network Application."""
+
+from bisect import bisect_left, bisect_right
+from math import isnan
+
+from napps.kytos.pathfinder.utils import edge_key
+
+
+def _is_number(value):
+    """Return whether a value can be ordered among numbers."""
+    return isinstance(value, int) or isinstance(value, float) and not isnan(value)
+
+
+def _is_hashable(value):
+    """Return whether a value can be used as a dict key."""
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class MetricIndex:
+    """Bitset index of the edges of a graph by metric value.
+
+    Edges are numbered and sets of edges are represented as int bitsets.
+    For each metric, the edges holding each hashable value are grouped in
+    a bitset, and metrics whose filter is an ordered comparison, "ge" or
+    "le" in ``orders``, also keep their numeric values sorted along with
+    the cumulative bitsets, so that a threshold maps to the bitset of the
+    edges that pass it. Other values are matched by running the metric
+    filter on a single edge per distinct value, so the results and errors
+    are the same as the ones of ``filter_functions``. Edges without the
+    metric always pass its filter.
+    """
+
+    def __init__(self, graph, filter_functions, orders):
+        self.filter_functions = filter_functions
+        self.orders = orders
+        self.edge_ends = []
+        self.edge_ids = {}
+        self.edge_values = {metric: {} for metric in filter_functions}
+        self.values = {metric: {} for metric in filter_functions}
+        self.others = {metric: {} for metric in filter_functions}
+        self.present = dict.fromkeys(filter_functions, 0)
+        self._sorted = {}
+        value_ids = {metric: {} for metric in filter_functions}
+        for endpoint_a, endpoint_b, data in graph.edges(data=True):
+            edge_id = len(self.edge_ends)
+            self.edge_ends.append((endpoint_a, endpoint_b))
+            self.edge_ids[edge_key(endpoint_a, endpoint_b)] = edge_id
+            for metric in filter_functions:
+                if metric not in data:
+                    continue
+                value = data[metric]
+                self.edge_values[metric][edge_id] = value
+                if _is_hashable(value):
+                    value_ids[metric].setdefault(value, []).append(edge_id)
+                else:
+                    self.others[metric][edge_id] = value
+        self.all_edges = (1 << len(self.edge_ends)) - 1
+        for metric, ids in value_ids.items():
+            for value, edge_ids in ids.items():
+                self.values[metric][value] = self._bitset(edge_ids)
+            self.present[metric] = self._bitset(self.edge_values[metric])
+
+    def _bitset(self, edge_ids):
+        """Return the bitset of some edge indexes."""
+        data = bytearray((len(self.edge_ends) + 7) // 8)
+        for edge_id in edge_ids:
+            data[edge_id >> 3] |= 1 << (edge_id & 7)
+        return int.from_bytes(data, "little")
+
+    def copy(self):
+        """Return a copy that can be updated on its own."""
+        state = dict(self.__dict__)
+        for name in ("edge_values", "values", "others"):
+            state[name] = {
+                metric: dict(items) for metric, items in state[name].items()
+            }
+        state["present"] = dict(self.present)
+        state["_sorted"] = dict(self._sorted)
+        index = MetricIndex.__new__(MetricIndex)
+        index.__dict__.update(state)
+        return index
+
+    def _add(self, metric, edge_id, value):
+        """Add the value of a metric of an edge."""
+        bit = 1 << edge_id
+        self.edge_values[metric][edge_id] = value
+        self.present[metric] |= bit
+        if _is_hashable(value):
+            values = self.values[metric]
+            values[value] = values.get(value, 0) | bit
+        else:
+            self.others[metric][edge_id] = value
+        self._sorted.pop(metric, None)
+
+    def _remove(self, metric, edge_id):
+        """Remove the value of a metric of an edge, if any."""
+        if edge_id not in self.edge_values[metric]:
+            return
+        value = self.edge_values[metric].pop(edge_id)
+        bit = 1 << edge_id
+        self.present[metric] &= ~bit
+        if self.others[metric].pop(edge_id, None) is None:
+            values = self.values[metric]
+            values[value] &= ~bit
+            if not values[value]:
+                del values[value]
+        self._sorted.pop(metric, None)
+
+    def update(self, endpoint_a, endpoint_b, data):
+        """Update the metric values of an edge given its data."""
+        edge_id = self.edge_ids.get(edge_key(endpoint_a, endpoint_b))
+        if edge_id is None:
+            return
+        for metric in self.filter_functions:
+            self._remove(metric, edge_id)
+            if metric in data:
+                self._add(metric, edge_id, data[metric])
+
+    def _sorted_values(self, metric):
+        """Return the sorted numeric values and their cumulative bitsets.
+
+        For "ge" metrics the bitsets accumulate from the largest value and
+        for "le" ones from the smallest, the first bitset being empty.
+        """
+        if metric not in self._sorted:
+            keys = sorted(
+                value for value in self.values[metric] if _is_number(value)
+            )
+            if self.orders[metric] == "ge":
+                keys.reverse()
+            cumulative = [0]
+            for value in keys:
+                cumulative.append(cumulative[-1] | self.values[metric][value])
+            if self.orders[metric] == "ge":
+                keys.reverse()
+                cumulative.reverse()
+            self._sorted[metric] = (keys, cumulative)
+        return self._sorted[metric]
+
+    def _matches(self, metric, value, metric_values):
+        """Return which of the given metric values pass its filter."""
+        edges = [(None, None, {metric: item}) for item in metric_values]
+        passed = self.filter_functions[metric](value, edges)
+        return [edge[2][metric] for edge in passed]
+
+    def filter(self, metric, value, edges):
+        """Return the bitset of the given edges that pass a metric filter."""
+        self.filter_functions[metric](value, ())
+        present = self.present[metric] & edges
+        matched = 0
+        candidates = self.values[metric].items()
+        order = self.orders.get(metric)
+        if order is not None and _is_number(value):
+            keys, cumulative = self._sorted_values(metric)
+            if order == "ge":
+                matched = cumulative[bisect_left(keys, value)]
+            else:
+                matched = cumulative[bisect_right(keys, value)]
+            candidates = [
+                (item, bits)
+                for item, bits in candidates
+                if not _is_number(item)
+            ]
+        candidates = [(item, bits) for item, bits in candidates if bits & present]
+        passed = set(self._matches(metric, value, [item for item, _ in candidates]))
+        for item, bits in candidates:
+            if item in passed:
+                matched |= bits
+        for edge_id, item in self.others[metric].items():
+            if present >> edge_id & 1 and self._matches(metric, value, [item]):
+                matched |= 1 << edge_id
+        return edges & ~present | matched & present
+
+    def edges(self, bitset):
+        """Yield the (endpoint_a, endpoint_b) edges of a bitset."""
+        data = bitset.to_bytes((len(self.edge_ends) + 7) // 8, "little")
+        for byte_id, byte in enumerate(data):
+            while byte:
+                low = byte & -byte
+                yield self.edge_ends[(byte_id << 3) + low.bit_length() - 1]
+                byte ^= low
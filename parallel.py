@@ -0,0 +1,337 @@
+"""Parallel module of kytos/pathfinder Kytos Network Application."""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from math import inf
+from multiprocessing import get_context
+from threading import Lock
+
+from kytos.core import log
+from napps.kytos.pathfinder import csr
+from napps.kytos.pathfinder.utils import Path
+
+try:
+    import networkx as nx
+except ImportError:
+    PACKAGE = "networkx==2.5.1"
+    log.error(f"Package {PACKAGE} not found. Please 'pip install {PACKAGE}'")
+
+_REPLICA = None
+
+
+class _Stale:
+    """Marker of the calls for an older snapshot than a worker replica."""
+
+
+def _load_replica(graph):
+    """Keep the graph replica of a worker process."""
+    global _REPLICA  # pylint: disable=global-statement
+    _REPLICA = graph
+
+
+def _call_replica(generation, deltas, method, *args):
+    """Call a method of the graph replica of a worker process.
+
+    The (generation, delta) ``deltas`` from the base replica that it hasn't
+    applied yet are applied first, and ``_Stale`` is returned if it then
+    replicates a newer snapshot than the ``generation`` of the call.
+    """
+    for delta_generation, delta in deltas:
+        if delta_generation > _REPLICA.generation:
+            _apply_delta(_REPLICA, delta)
+            _REPLICA.generation = delta_generation
+    if _REPLICA.generation != generation:
+        return _Stale()
+    return getattr(_REPLICA, method)(*args)
+
+
+def _graph_delta(old, new):
+    """Return the delta from a networkx graph to another or None.
+
+    It is a (nodes, removed_nodes, adjacency) tuple of the added or changed
+    (node, data), of the removed nodes and of the (node, [(nbr, data)])
+    adjacency of the nodes whose neighbors changed, in order, so that it
+    yields the same iteration order. None is returned if the order of the
+    nodes isn't the one of the old graph with the new nodes appended. The
+    adjacency dicts that the graphs share, like the ones of a
+    ``KytosGraph.copy`` of some edges, are skipped.
+    """
+    # pylint: disable=protected-access
+    old_nodes, new_nodes = old._node, new._node
+    removed_nodes = [node for node in old_nodes if node not in new_nodes]
+    added_nodes = [node for node in new_nodes if node not in old_nodes]
+    order = [node for node in old_nodes if node in new_nodes] + added_nodes
+    if order != list(new_nodes):
+        return None
+    nodes = [
+        (node, data)
+        for node, data in new_nodes.items()
+        if old_nodes.get(node) != data
+    ]
+    adjacency = []
+    for node, nbrs in new._adj.items():
+        old_nbrs = old._adj.get(node)
+        if nbrs is old_nbrs:
+            continue
+        if old_nbrs is None or list(nbrs.items()) != list(old_nbrs.items()):
+            adjacency.append((node, list(nbrs.items())))
+    return nodes, removed_nodes, adjacency
+
+
+def _apply_delta(graph, delta):
+    """Apply a ``_graph_delta`` to a KytosGraph and reset its indexes."""
+    # pylint: disable=protected-access
+    nodes, removed_nodes, adjacency = delta
+    nx_graph = graph.graph
+    for node in removed_nodes:
+        del nx_graph._node[node]
+        del nx_graph._adj[node]
+    for node, data in nodes:
+        nx_graph._node[node] = data
+        nx_graph._adj.setdefault(node, {})
+    rebuilt = {node for node, _ in adjacency}
+    for node, nbrs in adjacency:
+        # the data of the edges to nodes that aren't rebuilt is unchanged,
+        # while the pickled delta already shares the data of the others
+        nx_graph._adj[node] = {
+            nbr: data if nbr in rebuilt else nx_graph._adj[nbr][node]
+            for nbr, data in nbrs
+        }
+    graph._reset_indexes()
+
+
+def _delta_size(delta):
+    """Return the number of nodes and adjacencies of a delta."""
+    nodes, removed_nodes, adjacency = delta
+    return (
+        len(nodes) + len(removed_nodes) + sum(len(nbrs) for _, nbrs in adjacency)
+    )
+
+
+class ReplicaPool:
+    """Process pool whose workers hold a read-only replica of a graph.
+
+    The workers are spawned, rather than forked from the threads of the
+    controller, with a replica of the graph snapshot they are first used
+    with. Newer snapshots are replicated by sending their deltas from that
+    base replica along with the calls, which the workers apply before
+    running them, until the deltas outgrow the graph and the workers are
+    respawned with a new base replica. Calls for older snapshots than the
+    latest replicated one are not run.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._executor = None
+        self._latest = None
+        self._deltas = ()
+        self._deltas_size = 0
+        self._lock = Lock()
+
+    def _replicate(self, graph):
+        """Return the (executor, deltas) that replicate a graph or None."""
+        with self._lock:
+            latest = self._latest
+            if latest is graph:
+                return self._executor, self._deltas
+            if latest is not None and graph.generation <= latest.generation:
+                return None
+            if self._executor is not None:
+                delta = _graph_delta(latest.graph, graph.graph)
+                if delta is not None:
+                    size = self._deltas_size + _delta_size(delta)
+                    if size <= graph.graph.number_of_edges():
+                        self._deltas += ((graph.generation, delta),)
+                        self._deltas_size = size
+                        self._latest = graph
+                        return self._executor, self._deltas
+                # calls already submitted to it still run
+                self._executor.shutdown(wait=False)
+            self._executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=get_context("spawn"),
+                initializer=_load_replica,
+                initargs=(graph,),
+            )
+            self._latest = graph
+            self._deltas = ()
+            self._deltas_size = 0
+            return self._executor, self._deltas
+
+    def _discard(self, executor):
+        """Discard an executor that can't run new calls if still in use."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self._latest = None
+
+    def map(self, graph, method, args_list):
+        """Call a method of the replica of a graph once per args.
+
+        The results are returned in order, or None if the workers are
+        replicating a newer snapshot and the calls should be made locally.
+        The calls that reach a worker once it replicates a newer snapshot
+        are made locally.
+        """
+        while True:
+            replica = self._replicate(graph)
+            if replica is None:
+                return None
+            executor, deltas = replica
+            try:
+                futures = [
+                    executor.submit(
+                        _call_replica, graph.generation, deltas, method, *args
+                    )
+                    for args in args_list
+                ]
+                break
+            except RuntimeError:
+                # it was shut down for a newer replica or its pool broke
+                self._discard(executor)
+        results = []
+        for args, future in zip(args_list, futures):
+            result = future.result()
+            if isinstance(result, _Stale):
+                result = getattr(graph, method)(*args)
+            results.append(result)
+        return results
+
+    def shutdown(self):
+        """Shutdown the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+            self._latest = None
+
+
+class _EdgeWeights:
+    """Weights of the (endpoint_a, endpoint_b) edges of a networkx graph."""
+
+    def __init__(self, graph, weight):
+        self.graph = graph
+        self.weight = weight
+
+    def __getitem__(self, edge):
+        return self.graph[edge[0]][edge[1]][self.weight]
+
+
+class _SpurSearch:
+    """Spur path searches of ``shortest_simple_paths`` to a target.
+
+    The spur paths are searched by ``KytosGraph._spur_path`` on a networkx
+    ``view`` of the graph, or on the whole graph. If the ``distances`` to
+    the target are set, the spur nodes farther than the cutoff of their
+    spur path aren't searched.
+    """
+
+    def __init__(self, graph, target, weight, view=None):
+        self.graph = graph
+        self.target = target
+        self.weight = weight
+        self.view = view
+        self.distances = None
+
+    def bounded(self, spur_node, cutoff):
+        """Return whether a spur node is within a cutoff of the target."""
+        return cutoff is None or self.distances.get(spur_node, inf) <= cutoff
+
+    @staticmethod
+    def spur_path(spur, cutoff):
+        """Return the (length, nodes, edges) of a (length, nodes) spur."""
+        if spur is None or cutoff is not None and spur[0] > cutoff:
+            return None
+        length, nodes = spur
+        return length, nodes, list(zip(nodes, nodes[1:]))
+
+    def __call__(self, spur_node, ignore_nodes, ignore_edges, cutoff):
+        if not self.bounded(spur_node, cutoff):
+            return None
+        # pylint: disable=protected-access
+        return self.spur_path(
+            self.graph._spur_path(
+                spur_node,
+                self.target,
+                self.weight,
+                ignore_nodes,
+                ignore_edges,
+                self.view,
+            ),
+            cutoff,
+        )
+
+    def search_many(self, pool, searches):
+        """Search the spur paths of a path on the workers of a pool.
+
+        They are searched locally if the workers replicate a newer snapshot.
+        """
+        searched = [self.bounded(task[0], task[3]) for task in searches]
+        spurs = pool.map(
+            self.graph,
+            "_spur_path",
+            [
+                (spur_node, self.target, self.weight, ignore_nodes, ignore_edges)
+                for (spur_node, ignore_nodes, ignore_edges, _), bound in zip(
+                    searches, searched
+                )
+                if bound
+            ],
+        )
+        if spurs is None:
+            return [self(*task) for task in searches]
+        spurs = iter(spurs)
+        return [
+            self.spur_path(next(spurs), task[3]) if bound else None
+            for task, bound in zip(searches, searched)
+        ]
+
+
+def shortest_simple_paths(
+    pool, graph, source, target, weight, view=None, max_cost=None, first=None
+):
+    """Yield the same paths as networkx.shortest_simple_paths, in order.
+
+    The paths are ``Path`` lists with their cost, weighed by ``weight``,
+    which must be one of the callbacks of the KytosGraph ``graph`` or its
+    spf weight attribute. They are enumerated by the Yen's algorithm of
+    ``csr.shortest_simple_paths`` with the spur paths of
+    ``KytosGraph._spur_path``, and the spur paths of each path are
+    computed concurrently by the workers of a ``pool``, if any, on their
+    replica of the graph. A networkx ``view`` of the graph, like a filtered
+    subgraph, can be searched instead, whose spur paths are computed
+    locally.
+
+    If a ``max_cost`` is given, only the paths that cost at most it are
+    yielded. The distances to the target, which are computed once up to
+    it, bound the spur paths, so the spur paths whose root path plus
+    distance exceeds it aren't searched.
+
+    The ``first`` (length, path) shortest path can be given if it is already
+    known, like the ones of a ``search.shortest_path_tree``.
+    """
+    # pylint: disable=protected-access,too-many-arguments
+    weight = graph._weight_keys.get(weight, weight)
+    nx_graph = graph.graph if view is None else view
+    if source not in nx_graph:
+        raise nx.NodeNotFound(f"source node {source} not in graph")
+    if target not in nx_graph:
+        raise nx.NodeNotFound(f"target node {target} not in graph")
+    search = _SpurSearch(graph, target, weight, view)
+    if max_cost is not None:
+        search.distances = nx.single_source_dijkstra_path_length(
+            nx_graph, target, cutoff=max_cost, weight=weight
+        )
+    search_spurs = None
+    if pool is not None and view is None:
+        search_spurs = partial(search.search_many, pool)
+    attribute = graph._spf_attributes[weight]
+    for cost, nodes, _ in csr.shortest_simple_paths(
+        search,
+        _EdgeWeights(nx_graph, weight),
+        source,
+        max_cost,
+        search_spurs,
+        None if first is None else search.spur_path(first, max_cost),
+    ):
+        yield Path(nodes, cost, attribute)
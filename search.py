@@ -0,0 +1,260 @@
+"""Search module of kytos/pathfinder Kytos Network Application."""
+
+# pylint: disable=too-many-arguments,too-many-locals,too-many-branches
+from collections import deque
+from heapq import heappop, heappush
+from itertools import count
+from math import isclose
+
+from kytos.core import log
+
+try:
+    import networkx as nx
+except ImportError:
+    PACKAGE = "networkx==2.5.1"
+    log.error(f"Package {PACKAGE} not found. Please 'pip install {PACKAGE}'")
+
+# Relative difference under which two path costs are taken as a tie, since
+# the floats summed in another order can differ in their last digits.
+TIE_TOLERANCE = 1e-9
+
+
+def bidirectional_dijkstra(
+    graph, source, target, weight, ignore_nodes=None, ignore_edges=None
+):
+    """Return the (length, path) shortest path of an undirected graph.
+
+    It expands the same nodes in the same order, and so returns the same
+    path, as the bidirectional Dijkstra of networkx.shortest_simple_paths,
+    but ``weight`` must be the name of an edge attribute that every edge
+    has, like the ``spf_weight_attributes`` of KytosGraph, which is read
+    inline instead of calling a weight function on every edge relaxation.
+    The path avoids the ``ignore_nodes`` and ``ignore_edges``, which are only
+    read, never mutated.
+    """
+    if ignore_nodes and (source in ignore_nodes or target in ignore_nodes):
+        raise nx.NetworkXNoPath(f"No path between {source} and {target}.")
+    if source == target:
+        if source not in graph:
+            raise nx.NodeNotFound(f"Node {source} not in graph")
+        return (0, [source])
+    ignore_nodes = ignore_nodes or ()
+    ignore_edges = ignore_edges or ()
+    # the adjacency dicts of the graph, which views filter lazily
+    adj = graph._adj  # pylint: disable=protected-access
+    dists = ({}, {})
+    preds = ({source: None}, {target: None})
+    seen = ({source: 0}, {target: 0})
+    counter = count()
+    fringe = ([(0, next(counter), source)], [(0, next(counter), target)])
+    final_dist, final_path = None, []
+    direction = 1
+    while fringe[0] and fringe[1]:
+        direction = 1 - direction
+        dist, _, node = heappop(fringe[direction])
+        settled = dists[direction]
+        if node in settled:
+            continue
+        settled[node] = dist
+        if node in dists[1 - direction]:
+            return (final_dist, final_path)
+        node_seen, node_preds = seen[direction], preds[direction]
+        for nbr, data in adj[node].items():
+            if nbr in ignore_nodes:
+                continue
+            if ignore_edges and (
+                (node, nbr) in ignore_edges or (nbr, node) in ignore_edges
+            ):
+                continue
+            length = dist + data[weight]
+            if nbr in settled:
+                if length < settled[nbr]:
+                    raise ValueError("Contradictory paths found: negative weights?")
+            elif nbr not in node_seen or length < node_seen[nbr]:
+                node_seen[nbr] = length
+                heappush(fringe[direction], (length, next(counter), nbr))
+                node_preds[nbr] = node
+                if nbr in seen[0] and nbr in seen[1]:
+                    total = seen[0][nbr] + seen[1][nbr]
+                    if not final_path or final_dist > total:
+                        final_dist = total
+                        final_path = _join_path(preds, nbr)
+    raise nx.NetworkXNoPath(f"No path between {source} and {target}.")
+
+
+def _join_path(preds, meet):
+    """Join the forward and backward predecessors at the meeting node."""
+    path = []
+    node = meet
+    while node is not None:
+        path.append(node)
+        node = preds[0][node]
+    path.reverse()
+    node = preds[1][meet]
+    while node is not None:
+        path.append(node)
+        node = preds[1][node]
+    return path
+
+
+def bidirectional_bfs(graph, source, target, ignore_nodes=None, ignore_edges=None):
+    """Return the (length, path) shortest path of a graph of unit weights.
+
+    It is ``bidirectional_dijkstra`` for a graph whose edges all weigh 1,
+    whose fringes are then FIFO queues: the nodes are discovered in order
+    of distance and at their shortest distance, so a queue pops them in
+    the same (distance, discovery) order as the heaps and the same path
+    is returned.
+    """
+    if ignore_nodes and (source in ignore_nodes or target in ignore_nodes):
+        raise nx.NetworkXNoPath(f"No path between {source} and {target}.")
+    if source == target:
+        if source not in graph:
+            raise nx.NodeNotFound(f"Node {source} not in graph")
+        return (0, [source])
+    ignore_nodes = ignore_nodes or ()
+    ignore_edges = ignore_edges or ()
+    adj = graph._adj  # pylint: disable=protected-access
+    dists = ({}, {})
+    preds = ({source: None}, {target: None})
+    seen = ({source: 0}, {target: 0})
+    fringe = (deque([(0, source)]), deque([(0, target)]))
+    final_dist, final_path = None, []
+    direction = 1
+    while fringe[0] and fringe[1]:
+        direction = 1 - direction
+        dist, node = fringe[direction].popleft()
+        settled = dists[direction]
+        settled[node] = dist
+        if node in dists[1 - direction]:
+            return (final_dist, final_path)
+        node_seen, node_preds = seen[direction], preds[direction]
+        length = dist + 1
+        for nbr in adj[node]:
+            if nbr in node_seen or nbr in ignore_nodes:
+                continue
+            if ignore_edges and (
+                (node, nbr) in ignore_edges or (nbr, node) in ignore_edges
+            ):
+                continue
+            node_seen[nbr] = length
+            fringe[direction].append((length, nbr))
+            node_preds[nbr] = node
+            if nbr in seen[1 - direction]:
+                total = seen[0][nbr] + seen[1][nbr]
+                if not final_path or final_dist > total:
+                    final_dist = total
+                    final_path = _join_path(preds, nbr)
+    raise nx.NetworkXNoPath(f"No path between {source} and {target}.")
+
+
+def bidirectional_dial(
+    graph, source, target, weight, max_weight, ignore_nodes=None, ignore_edges=None
+):
+    """Return the (length, path) shortest path of bounded integer weights.
+
+    It is ``bidirectional_dijkstra`` for a graph whose edges weigh integers
+    from 0 to ``max_weight`` by the ``weight`` attribute, whose fringes are
+    then Dial's bucket queues: ``max_weight + 1`` circular FIFO buckets of
+    the nodes pushed at each distance, which is at most ``max_weight`` away
+    from the last one popped. The entries of a bucket are popped in the
+    order they were pushed, stale ones included, which is the (distance,
+    counter) order of the heaps, so the same path is returned.
+    """
+    if ignore_nodes and (source in ignore_nodes or target in ignore_nodes):
+        raise nx.NetworkXNoPath(f"No path between {source} and {target}.")
+    if source == target:
+        if source not in graph:
+            raise nx.NodeNotFound(f"Node {source} not in graph")
+        return (0, [source])
+    ignore_nodes = ignore_nodes or ()
+    ignore_edges = ignore_edges or ()
+    adj = graph._adj  # pylint: disable=protected-access
+    size = max_weight + 1
+    dists = ({}, {})
+    preds = ({source: None}, {target: None})
+    seen = ({source: 0}, {target: 0})
+    buckets = ([deque() for _ in range(size)], [deque() for _ in range(size)])
+    buckets[0][0].append(source)
+    buckets[1][0].append(target)
+    # the distance of the last popped bucket and number of pushed entries
+    current, pending = [0, 0], [1, 1]
+    final_dist, final_path = None, []
+    direction = 1
+    while pending[0] and pending[1]:
+        direction = 1 - direction
+        fringe = buckets[direction]
+        dist = current[direction]
+        while not fringe[dist % size]:
+            dist += 1
+        current[direction] = dist
+        pending[direction] -= 1
+        node = fringe[dist % size].popleft()
+        settled = dists[direction]
+        if node in settled:
+            continue
+        settled[node] = dist
+        if node in dists[1 - direction]:
+            return (final_dist, final_path)
+        node_seen, node_preds = seen[direction], preds[direction]
+        for nbr, data in adj[node].items():
+            if nbr in settled or nbr in ignore_nodes:
+                continue
+            if ignore_edges and (
+                (node, nbr) in ignore_edges or (nbr, node) in ignore_edges
+            ):
+                continue
+            length = dist + data[weight]
+            if nbr not in node_seen or length < node_seen[nbr]:
+                node_seen[nbr] = length
+                fringe[length % size].append(nbr)
+                pending[direction] += 1
+                node_preds[nbr] = node
+                if nbr in seen[1 - direction]:
+                    total = seen[0][nbr] + seen[1][nbr]
+                    if not final_path or final_dist > total:
+                        final_dist = total
+                        final_path = _join_path(preds, nbr)
+    raise nx.NetworkXNoPath(f"No path between {source} and {target}.")
+
+
+def shortest_path_tree(graph, source, weight, cutoff=None):
+    """Return the (dists, preds, ties) shortest path tree from a source.
+
+    ``dists`` maps the nodes up to the ``cutoff``, if given, from the source
+    to their distance, summed along their path, ``preds`` maps them to their
+    predecessor on a shortest path and ``ties`` are the nodes reached at the
+    same distance, within ``TIE_TOLERANCE``, from more than one predecessor.
+    The shortest path to a node is unique if none of the nodes on its tree
+    path are ties, so any other search of the shortest path to it, like
+    ``bidirectional_dijkstra``, returns it too. ``weight`` is read inline
+    like ``bidirectional_dijkstra`` does.
+    """
+    # the adjacency dicts of the graph, which views filter lazily
+    adj = graph._adj  # pylint: disable=protected-access
+    dists = {}
+    seen = {source: 0}
+    preds = {source: None}
+    ties = set()
+    counter = count()
+    fringe = [(0, next(counter), source)]
+    while fringe:
+        dist, _, node = heappop(fringe)
+        if node in dists:
+            continue
+        dists[node] = dist
+        for nbr, data in adj[node].items():
+            length = dist + data[weight]
+            best = dists[nbr] if nbr in dists else seen.get(nbr)
+            if best is not None and isclose(length, best, rel_tol=TIE_TOLERANCE):
+                ties.add(nbr)
+            elif (
+                nbr not in dists
+                and (best is None or length < best)
+                and (cutoff is None or length <= cutoff)
+            ):
+                seen[nbr] = length
+                preds[nbr] = node
+                ties.discard(nbr)
+                heappush(fringe, (length, next(counter), nbr))
+    return dists, preds, ties
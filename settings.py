@@ -1 +1,65 @@
 """Settings for the pathfinder NApp."""
+
+# Diff incoming topologies against the current graph and only apply the
+# added, removed or changed nodes, links and metadata instead of clearing
+# and rebuilding the whole graph on every topology event. The nodes and links
+# are kept in the order of a rebuild, so equal cost paths keep their order.
+INCREMENTAL_TOPOLOGY_UPDATE = False
+
+# Engine used to compute the k shortest paths, either "networkx", which runs
+# networkx.shortest_simple_paths on KytosGraph.graph, "csr", which runs on
+# a compact array backed copy of the graph kept in sync with it, or
+# "deviation", which also runs on it but deviates the paths from a single
+# shortest path tree to the destination, or "alt", which also runs on it but
+# searches the paths with A* guided by the LANDMARK_COUNT landmarks. The
+# engines other than "networkx" return paths of the same costs, but paths of
+# equal cost can have other hops or come in another order. v2/ requests can
+# override it with their "spf_engine".
+SPF_ENGINE = "networkx"
+
+# Maximum number of v2/ results kept in the LRU result cache, which is keyed
+# on the normalized payload and the graph generation, 0 disables the cache.
+RESULT_CACHE_SIZE = 1024
+
+# Seconds a cached v2/ result can be served for, 0 keeps it until evicted.
+RESULT_CACHE_TTL = 300
+
+# Maximum number of filtered links and subgraph views, keyed by their
+# normalized metric constraints, that each graph snapshot keeps for reuse
+# across constrained path requests, 0 disables the cache.
+FILTERED_GRAPH_CACHE_SIZE = 16
+
+# Number of worker processes holding a read-only replica of the graph that
+# search the flexible metrics combinations of constrained paths and the Yen
+# spur paths of unconstrained ones in parallel, 0 disables the workers and
+# searches them in the request thread. They are spawned once and kept in sync
+# with the graph snapshots by the deltas sent along with their calls.
+PARALLEL_WORKERS = 0
+
+# Minimum spf_max_paths of unconstrained paths for their Yen spur paths to be
+# computed by the PARALLEL_WORKERS, fewer paths are computed sequentially.
+PARALLEL_SPUR_MIN_PATHS = 10
+
+# Maximum number of desired_links of v2/ requests with the "waypoints"
+# desired_links_mode, whose paths are searched through every order and
+# orientation of the desired links.
+WAYPOINT_MAX_LINKS = 4
+
+# Maximum integer spf weight for the spur paths of networkx engine searches to
+# use Dial's bucket queues, one bucket per distance up to it, instead of heaps
+# when every link weighs a non-negative integer up to it by the spf_attribute.
+BUCKET_QUEUE_MAX_WEIGHT = 64
+
+# Number of landmark switches whose distances to every switch, by each
+# spf_attribute, bound the A* searches of the "alt" engine. They are only built
+# in the background once a request uses the "alt" engine, and then refreshed
+# after the topology or link metadata updates that change the graph structure
+# or lower a weight, 0 disables them.
+LANDMARK_COUNT = 4
+
+# Build a contraction hierarchy of the switch level graph per spf_attribute,
+# which answers the requests for a single path without constraints of the
+# engines other than "networkx". They are only built in the background once a
+# request uses one of these engines, and then refreshed after the topology or
+# link metadata updates that change it.
+CONTRACTION_HIERARCHY = True
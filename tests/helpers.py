@@ -240,6 +240,20 @@ def get_topology_with_metadata():
     return topology
 
 
+def get_enabled_topology_with_metadata():
+    """Create a topology with metadata where all entities are UP."""
+    topology = get_topology_with_metadata()
+    for switch in topology.switches.values():
+        switch.enable()
+        for interface in switch.interfaces.values():
+            interface.enable()
+            interface.activate()
+    for link in topology.links.values():
+        link.enable()
+        link.activate()
+    return topology
+
+
 def _get_interfaces(count, switch):
     """Add a new interface to the list of interfaces."""
     for i in range(1, count + 1):
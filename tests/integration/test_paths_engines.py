@@ -0,0 +1,267 @@
+"""Module to test the path engines of the KytosGraph in graph.py."""
+from itertools import permutations, product
+
+from napps.kytos.pathfinder.destinations import (
+    constrained_k_shortest_paths_many, k_shortest_paths_many)
+from napps.kytos.pathfinder.parallel import ReplicaPool
+
+# pylint: disable=import-error
+from tests.integration.edges_settings import EdgesSettings
+
+ENDPOINTS = [
+    "User1",
+    "User2",
+    "User3",
+    "User4",
+    "S1",
+    "S5",
+    "S8",
+    "User1:4",
+    "S5:3",
+    "S8:8",
+    "User2:1",
+]
+
+
+class TestPathsEngines(EdgesSettings):
+    """Tests that the path engines agree with the networkx one.
+
+    The engines only promise the same costs as networkx, paths of equal
+    cost can have other hops or come in another order.
+    """
+
+    def search_cost(self, path, weight):
+        """Return the cost of a path as computed by the search."""
+        return sum(
+            weight(node, nbr, self.graph.graph[node][nbr])
+            for node, nbr in zip(path, path[1:])
+        )
+
+    def assert_valid_path(self, path, source, destination):
+        """Assert that a path is a loopless walk in the graph."""
+        assert path[0] == source
+        assert path[-1] == destination
+        assert len(set(path)) == len(path)
+        for node, nbr in zip(path, path[1:]):
+            assert self.graph.graph.has_edge(node, nbr)
+
+    def assert_same_costs(self, engine, k=4, **metrics):
+        """Assert that an engine finds paths as good as the networkx ones.
+
+        The paths must be distinct loopless paths whose costs are the ones
+        of the networkx paths, rank by rank.
+        """
+        self.initializer()
+        if engine == "alt":
+            self.graph.refresh_landmarks()
+        for source, destination in permutations(ENDPOINTS, 2):
+            for weight in self.graph.spf_edge_data_cbs.values():
+                with self.subTest(
+                    source=source, destination=destination, weight=weight
+                ):
+                    expected, paths = (
+                        self.graph.constrained_k_shortest_paths(
+                            source,
+                            destination,
+                            weight=weight,
+                            k=k,
+                            engine=path_engine,
+                            **metrics,
+                        )
+                        for path_engine in ("networkx", engine)
+                    )
+                    for path in paths:
+                        self.assert_valid_path(path["hops"], source, destination)
+                    hops = [tuple(path["hops"]) for path in paths]
+                    assert len(set(hops)) == len(hops)
+                    assert [
+                        self.search_cost(path["hops"], weight) for path in paths
+                    ] == [
+                        self.search_cost(path["hops"], weight) for path in expected
+                    ]
+
+    def test_csr_engine(self):
+        """Test the csr engine."""
+        self.assert_same_costs("csr")
+
+    def test_csr_engine_constrained(self):
+        """Test the csr engine with constraints."""
+        self.assert_same_costs(
+            "csr",
+            mandatory_metrics={"bandwidth": 20},
+            flexible_metrics={"delay": 100, "reliability": 5},
+        )
+
+    def test_deviation_engine(self):
+        """Test the deviation engine."""
+        self.assert_same_costs("deviation", k=10)
+
+    def test_deviation_engine_constrained(self):
+        """Test the deviation engine with constraints."""
+        self.assert_same_costs(
+            "deviation",
+            mandatory_metrics={"bandwidth": 20},
+            flexible_metrics={"delay": 100, "reliability": 5},
+        )
+
+    def test_alt_engine(self):
+        """Test the alt engine."""
+        self.assert_same_costs("alt", k=10)
+
+    def test_alt_engine_constrained(self):
+        """Test the alt engine with constraints."""
+        self.assert_same_costs(
+            "alt",
+            mandatory_metrics={"bandwidth": 20},
+            flexible_metrics={"delay": 100, "reliability": 5},
+        )
+
+    def test_hierarchy(self):
+        """Test that the contraction hierarchy paths are the shortest ones."""
+        self.initializer()
+        for weight in self.graph.spf_edge_data_cbs.values():
+            expected = {
+                (source, destination): self.graph.k_shortest_paths(
+                    source, destination, weight=weight, k=1
+                )
+                for source, destination in permutations(ENDPOINTS, 2)
+            }
+            self.graph.refresh_hierarchies()
+            for (source, destination), paths in expected.items():
+                with self.subTest(
+                    source=source, destination=destination, weight=weight
+                ):
+                    found = self.graph.k_shortest_paths(
+                        source, destination, weight=weight, k=1, engine="csr"
+                    )
+                    for path in found:
+                        self.assert_valid_path(path, source, destination)
+                    assert [self.search_cost(path, weight) for path in found] == [
+                        self.search_cost(path, weight) for path in paths
+                    ]
+            self.graph._hierarchies.clear()  # pylint: disable=protected-access
+
+    def test_replica_pool_constrained(self):
+        """Test that constrained paths searched on a pool are the same."""
+        self.initializer()
+        pool = ReplicaPool(2)
+        self.addCleanup(pool.shutdown)
+        metrics = {
+            "mandatory_metrics": {"bandwidth": 20},
+            "flexible_metrics": {"delay": 60, "reliability": 5, "priority": 1},
+        }
+        for source, destination in permutations(ENDPOINTS[:6], 2):
+            for engine in ("networkx", "csr"):
+                with self.subTest(
+                    source=source, destination=destination, engine=engine
+                ):
+                    assert self.graph.constrained_k_shortest_paths(
+                        source,
+                        destination,
+                        weight=self.graph.spf_edge_data_cbs["delay"],
+                        k=4,
+                        minimum_hits=1,
+                        engine=engine,
+                        pool=pool,
+                        **metrics,
+                    ) == self.graph.constrained_k_shortest_paths(
+                        source,
+                        destination,
+                        weight=self.graph.spf_edge_data_cbs["delay"],
+                        k=4,
+                        minimum_hits=1,
+                        engine=engine,
+                        **metrics,
+                    )
+
+    def test_replica_pool_spur_paths(self):
+        """Test that paths with spur paths searched on a pool are the same."""
+        self.initializer()
+        pool = ReplicaPool(2)
+        self.addCleanup(pool.shutdown)
+        for source, destination in permutations(ENDPOINTS[:6], 2):
+            for weight in self.graph.spf_edge_data_cbs.values():
+                with self.subTest(
+                    source=source, destination=destination, weight=weight
+                ):
+                    assert self.graph.k_shortest_paths(
+                        source, destination, weight=weight, k=20, pool=pool
+                    ) == self.graph.k_shortest_paths(
+                        source, destination, weight=weight, k=20
+                    )
+
+    def test_k_shortest_paths_many(self):
+        """Test that the paths to many destinations are the same ones."""
+        self.initializer()
+        for source, k in product(ENDPOINTS, (1, 4)):
+            for weight in self.graph.spf_edge_data_cbs.values():
+                paths = k_shortest_paths_many(
+                    self.graph,
+                    source,
+                    ENDPOINTS,
+                    weight=weight,
+                    k=k,
+                    engine="networkx",
+                )
+                for destination in ENDPOINTS:
+                    with self.subTest(
+                        source=source, destination=destination, weight=weight, k=k
+                    ):
+                        expected = self.graph.k_shortest_paths(
+                            source, destination, weight=weight, k=k
+                        )
+                        assert paths[destination] == expected
+                        assert [path.cost for path in paths[destination]] == [
+                            path.cost for path in expected
+                        ]
+
+    def test_constrained_k_shortest_paths_many(self):
+        """Test that constrained paths to many destinations are the same."""
+        self.initializer()
+        weight = self.graph.spf_edge_data_cbs["delay"]
+        for metrics in (
+            {"mandatory_metrics": {"bandwidth": 20}},
+            {
+                "mandatory_metrics": {"bandwidth": 20},
+                "flexible_metrics": {"delay": 60, "reliability": 5},
+            },
+        ):
+            for source in ENDPOINTS[:4]:
+                paths = constrained_k_shortest_paths_many(
+                    self.graph, source, ENDPOINTS, weight=weight, k=3, **metrics
+                )
+                for destination in ENDPOINTS:
+                    with self.subTest(
+                        source=source, destination=destination, metrics=metrics
+                    ):
+                        expected = self.graph.constrained_k_shortest_paths(
+                            source, destination, weight=weight, k=3, **metrics
+                        )
+                        assert paths[destination] == expected
+
+    def test_anycast(self):
+        """Test that anycast paths are the best ones to any destination."""
+        self.initializer()
+        candidates = ["User2", "User4", "S8:8"]
+        weight = self.graph.spf_edge_data_cbs["delay"]
+        for metrics in ({}, {"mandatory_metrics": {"bandwidth": 20}}):
+            for source in ENDPOINTS:
+                with self.subTest(source=source, metrics=metrics):
+                    paths = self.graph.constrained_k_shortest_paths(
+                        source, candidates, weight=weight, k=5, **metrics
+                    )
+                    expected = sorted(
+                        self.search_cost(path["hops"], weight)
+                        for candidate in candidates
+                        for path in self.graph.constrained_k_shortest_paths(
+                            source, candidate, weight=weight, k=5, **metrics
+                        )
+                    )[:5]
+                    for path in paths:
+                        assert path["hops"][-1] in candidates
+                        self.assert_valid_path(
+                            path["hops"], source, path["hops"][-1]
+                        )
+                    assert [
+                        self.search_cost(path["hops"], weight) for path in paths
+                    ] == expected
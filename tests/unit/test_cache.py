@@ -0,0 +1,74 @@
+"""Test ResultCache methods."""
+from unittest import TestCase
+from unittest.mock import patch
+
+from napps.kytos.pathfinder.cache import ResultCache
+
+
+class TestResultCache(TestCase):
+    """Tests for the ResultCache class."""
+
+    def setUp(self):
+        """Execute steps before each tests."""
+        self.cache = ResultCache(2, ttl=10)
+
+    def test_key(self):
+        """Test that keys are normalized."""
+        key = self.cache.key({"source": "A", "destination": "B"})
+        assert key == self.cache.key({"destination": "B", "source": "A"})
+        assert key != self.cache.key({"source": "B", "destination": "A"})
+
+    def test_get_put(self):
+        """Test hits, misses and LRU evictions."""
+        assert self.cache.get("a", 0) is None
+        self.cache.put("a", 1, 0, ())
+        self.cache.put("b", 2, 0, ())
+        assert self.cache.get("a", 0) == 1
+        self.cache.put("c", 3, 0, ())
+        assert self.cache.get("b", 0) is None
+        assert self.cache.get("a", 0) == 1
+        assert self.cache.get("c", 0) == 3
+        assert self.cache.stats == {
+            "size": 2,
+            "hits": 3,
+            "misses": 2,
+            "evictions": 1,
+            "invalidations": 0,
+        }
+
+    def test_invalidate(self):
+        """Test that only the affected results are invalidated."""
+        self.cache.put("a", 1, 0, {"x", "y"})
+        self.cache.put("b", 2, 0, {"y", "z"})
+        self.cache.invalidate(1, {"x"})
+        assert self.cache.get("a", 1) is None
+        assert self.cache.get("b", 1) == 2
+        assert self.cache.get("b", 0) is None
+
+        self.cache.invalidate(2)
+        assert not self.cache
+        assert self.cache.invalidations == 2
+
+    def test_put_stale_generation(self):
+        """Test that results of older generations are discarded."""
+        self.cache.invalidate(1, ())
+        self.cache.put("a", 1, 0, ())
+        assert not self.cache
+
+    @patch("napps.kytos.pathfinder.cache.monotonic")
+    def test_ttl(self, mock_monotonic):
+        """Test that expired results are evicted."""
+        mock_monotonic.return_value = 100
+        self.cache.put("a", 1, 0, ())
+        mock_monotonic.return_value = 110
+        assert self.cache.get("a", 0) == 1
+        mock_monotonic.return_value = 111
+        assert self.cache.get("a", 0) is None
+        assert not self.cache
+        assert self.cache.evictions == 1
+
+    def test_disabled(self):
+        """Test that a cache of size 0 never caches results."""
+        cache = ResultCache(0)
+        cache.put("a", 1, 0, ())
+        assert cache.get("a", 0) is None
@@ -0,0 +1,264 @@
+"""Test CSR graph methods."""
+from unittest import TestCase
+
+import networkx as nx
+
+from napps.kytos.pathfinder import csr
+from napps.kytos.pathfinder.landmarks import Landmarks
+from napps.kytos.pathfinder.utils import nx_edge_data_delay, nx_edge_data_weight
+
+
+class TestCSRGraph(TestCase):
+    """Tests for the CSRGraph class and its search functions."""
+
+    def setUp(self):
+        """Execute steps before each tests."""
+        self.graph = nx.Graph()
+        self.graph.add_edge("A", "B", delay=1)
+        self.graph.add_edge("B", "D", delay=1)
+        self.graph.add_edge("A", "C", delay=1)
+        self.graph.add_edge("C", "D", delay=5)
+        self.graph.add_edge("D", "E")
+        self.weight_funcs = {
+            "hop": nx_edge_data_weight,
+            "delay": nx_edge_data_delay,
+        }
+        self.csr = csr.CSRGraph(self.graph, self.weight_funcs)
+
+    def test_structure(self):
+        """Test the nodes, arcs and weights arrays."""
+        assert len(self.csr) == self.graph.number_of_nodes()
+        assert self.csr.number_of_edges == self.graph.number_of_edges()
+        assert len(self.csr.targets) == 2 * self.graph.number_of_edges()
+        for node, nbrs in self.graph.adjacency():
+            idx = self.csr.node_index[node]
+            arcs = range(self.csr.offsets[idx], self.csr.offsets[idx + 1])
+            assert {self.csr.node_ids[self.csr.targets[arc]] for arc in arcs} == set(
+                nbrs
+            )
+        edge_id = self.csr.edge_id("D", "C")
+        assert edge_id == self.csr.edge_id("C", "D")
+        assert self.csr.weights["delay"][edge_id] == 5
+        assert self.csr.weights["hop"][edge_id] == 1
+        assert self.csr.edge_id("A", "E") is None
+
+    def test_copy_update_weights(self):
+        """Test that copies have their own weights."""
+        copy = self.csr.copy()
+        copy.update_weights("C", "D", {"delay": 2}, self.weight_funcs)
+        edge_id = self.csr.edge_id("C", "D")
+        assert copy.weights["delay"][edge_id] == 2
+        assert self.csr.weights["delay"][edge_id] == 5
+        assert copy.targets is self.csr.targets
+
+    def test_k_shortest_paths(self):
+        """Test k shortest paths in increasing cost order."""
+        paths = csr.k_shortest_paths(self.csr, "A", "E", "delay", k=3)
+        assert paths == [["A", "B", "D", "E"], ["A", "C", "D", "E"]]
+
+        paths = csr.k_shortest_paths(self.csr, "A", "E", "hop", k=1)
+        assert len(paths) == 1
+
+        assert csr.k_shortest_paths(self.csr, "A", "A", "hop", k=2) == [["A"]]
+        assert not csr.k_shortest_paths(self.csr, "A", "Z", "hop")
+
+    def test_k_shortest_paths_mask(self):
+        """Test k shortest paths restricted to a mask of edges."""
+        mask = self.csr.edge_mask([("A", "C"), ("C", "D"), ("D", "E")])
+        paths = csr.k_shortest_paths(self.csr, "A", "E", "delay", k=3, mask=mask)
+        assert paths == [["A", "C", "D", "E"]]
+
+        mask = self.csr.edge_mask([("A", "C"), ("D", "E")])
+        assert not csr.k_shortest_paths(self.csr, "A", "E", "delay", mask=mask)
+
+    def test_bidirectional_dijkstra_ignore(self):
+        """Test the search ignoring nodes and edges."""
+        weights = self.csr.weights["delay"]
+        node = self.csr.node_index
+        cost, nodes, edges = csr.bidirectional_dijkstra(
+            self.csr, weights, node["A"], node["E"]
+        )
+        assert cost == 3
+        assert self.csr.path_ids(nodes) == ["A", "B", "D", "E"]
+        assert len(edges) == 3
+
+        cost, nodes, _ = csr.bidirectional_dijkstra(
+            self.csr, weights, node["A"], node["E"], ignore_nodes={node["B"]}
+        )
+        assert cost == 7
+        assert self.csr.path_ids(nodes) == ["A", "C", "D", "E"]
+
+        assert (
+            csr.bidirectional_dijkstra(
+                self.csr,
+                weights,
+                node["A"],
+                node["E"],
+                ignore_edges={self.csr.edge_id("D", "E")},
+            )
+            is None
+        )
+
+
+class TestContractedCSRGraph(TestCase):
+    """Tests for the CSRGraph class contracting interfaces."""
+
+    def setUp(self):
+        """Execute steps before each tests."""
+        self.graph = nx.Graph()
+        for switch, ports in (("S1", 2), ("S2", 2), ("S3", 3)):
+            self.graph.add_node(switch)
+            for port in range(1, ports + 1):
+                self.graph.add_node(f"{switch}:{port}", switch=switch)
+                self.graph.add_edge(switch, f"{switch}:{port}")
+        self.graph.add_edge("S1:1", "S2:1", delay=1)
+        self.graph.add_edge("S2:2", "S3:1", delay=1)
+        self.graph.add_edge("S1:2", "S3:2", delay=5)
+        self.weight_funcs = {
+            "hop": nx_edge_data_weight,
+            "delay": nx_edge_data_delay,
+        }
+        self.csr = csr.CSRGraph(self.graph, self.weight_funcs)
+
+    def test_structure(self):
+        """Test that interfaces are contracted into their switches."""
+        assert self.csr.node_ids == ["S1", "S2", "S3"]
+        assert self.csr.number_of_edges == 3
+        assert self.csr.owners["S3:3"] == "S3"
+        edge_id = self.csr.edge_id("S3:2", "S1:2")
+        assert self.csr.weights["delay"][edge_id] == 5 + 2
+        assert self.csr.weights["hop"][edge_id] == 3
+        assert self.csr.edge_id("S1", "S1:1") is None
+
+    def test_k_shortest_paths(self):
+        """Test that paths are expanded back to interface hops."""
+        paths = csr.k_shortest_paths(self.csr, "S1", "S3", "delay", k=3)
+        assert paths == [
+            ["S1", "S1:1", "S2:1", "S2", "S2:2", "S3:1", "S3"],
+            ["S1", "S1:2", "S3:2", "S3"],
+        ]
+        paths = csr.k_shortest_paths(self.csr, "S1:1", "S3:3", "delay", k=3)
+        assert paths == [
+            ["S1:1", "S2:1", "S2", "S2:2", "S3:1", "S3", "S3:3"],
+            ["S1:1", "S1", "S1:2", "S3:2", "S3", "S3:3"],
+        ]
+        paths = csr.k_shortest_paths(self.csr, "S1:1", "S2:1", "hop", k=3)
+        assert paths == [
+            ["S1:1", "S2:1"],
+            ["S1:1", "S1", "S1:2", "S3:2", "S3", "S3:1", "S2:2", "S2", "S2:1"],
+        ]
+        assert csr.k_shortest_paths(self.csr, "S1:1", "S1", "hop", k=1) == [
+            ["S1:1", "S1"]
+        ]
+
+    def path_cost(self, path, func):
+        """Return the cost of a path of the graph."""
+        return sum(
+            func(node, nbr, self.graph[node][nbr])
+            for node, nbr in zip(path, path[1:])
+        )
+
+    def assert_same_costs(self, tree, landmarks=False):
+        """Assert that the paths have the costs of the networkx ones."""
+        bounds = {}
+        if landmarks:
+            bounds = {name: Landmarks(self.csr, name, 2) for name in self.weight_funcs}
+        for source in self.graph:
+            for target in self.graph:
+                for name, func in self.weight_funcs.items():
+                    with self.subTest(source=source, target=target, weight=name):
+                        expected = [
+                            self.path_cost(path, func)
+                            for path in nx.shortest_simple_paths(
+                                self.graph, source, target, weight=func
+                            )
+                        ]
+                        paths = csr.k_shortest_paths(
+                            self.csr,
+                            source,
+                            target,
+                            name,
+                            k=len(expected) + 1,
+                            tree=tree,
+                            landmarks=bounds.get(name),
+                        )
+                        for path in paths:
+                            assert path[0] == source and path[-1] == target
+                            assert len(set(path)) == len(path)
+                        assert [
+                            self.path_cost(path, func) for path in paths
+                        ] == expected
+
+    def test_k_shortest_paths_costs(self):
+        """Test that the paths have the costs of the networkx ones."""
+        self.assert_same_costs(tree=False)
+
+    def test_k_shortest_paths_tree_costs(self):
+        """Test that the tree deviation paths have the networkx costs."""
+        self.assert_same_costs(tree=True)
+
+    def test_k_shortest_paths_landmarks_costs(self):
+        """Test that the landmark A* paths have the networkx costs."""
+        self.assert_same_costs(tree=False, landmarks=True)
+
+    def test_k_shortest_paths_anycast(self):
+        """Test that paths to any candidate are the best ones to each."""
+        for candidates in (["S2:2", "S3:3"], ["S1", "S3:1", "S3"], ["S2:1", "X"]):
+            for source in self.graph:
+                for name, func in self.weight_funcs.items():
+                    with self.subTest(
+                        source=source, candidates=candidates, weight=name
+                    ):
+                        expected = sorted(
+                            self.path_cost(path, func)
+                            for candidate in candidates
+                            if candidate in self.graph
+                            for path in nx.shortest_simple_paths(
+                                self.graph, source, candidate, weight=func
+                            )
+                        )
+                        for tree in (False, True):
+                            paths = csr.k_shortest_paths(
+                                self.csr,
+                                source,
+                                candidates,
+                                name,
+                                k=len(expected) + 1,
+                                tree=tree,
+                            )
+                            for path in paths:
+                                assert path[0] == source
+                                assert path[-1] in candidates
+                                assert len(set(path)) == len(path)
+                            assert [
+                                self.path_cost(path, func) for path in paths
+                            ] == expected
+        assert not csr.k_shortest_paths(self.csr, "S1", ["X", "Y"], "hop")
+
+    def test_k_shortest_paths_mask(self):
+        """Test that masks apply to the detached interfaces links."""
+        mask = self.csr.edge_mask([("S1:2", "S3:2"), ("S2:2", "S3:1")])
+        paths = csr.k_shortest_paths(self.csr, "S1:1", "S3", "hop", k=3, mask=mask)
+        assert paths == [["S1:1", "S1", "S1:2", "S3:2", "S3"]]
+
+    def test_k_shortest_paths_max_cost(self):
+        """Test that the paths are pruned to the ones up to a max cost."""
+        for tree in (False, True):
+            for max_cost in (0, 3, 7, 9):
+                with self.subTest(tree=tree, max_cost=max_cost):
+                    paths = csr.k_shortest_paths(
+                        self.csr, "S1:1", "S3:3", "delay", k=3, tree=tree
+                    )
+                    assert csr.k_shortest_paths(
+                        self.csr,
+                        "S1:1",
+                        "S3:3",
+                        "delay",
+                        k=3,
+                        tree=tree,
+                        max_cost=max_cost,
+                    ) == [
+                        path
+                        for path in paths
+                        if self.path_cost(path, nx_edge_data_delay) <= max_cost
+                    ]
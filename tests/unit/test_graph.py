@@ -1,18 +1,24 @@
 """Test Graph methods."""
+from itertools import islice
+from random import Random
 from unittest import TestCase
 from unittest.mock import MagicMock, call, patch
 
+import networkx as nx
 from kytos.core.common import EntityStatus
+from napps.kytos.pathfinder import engines
 from napps.kytos.pathfinder.graph import KytosGraph
+from napps.kytos.pathfinder.utils import Path
 
 # pylint: disable=import-error
 from tests.helpers import (
+    get_enabled_topology_with_metadata,
     get_filter_links_fake,
     get_topology_mock,
-    get_topology_with_metadata_mock,
 )
 
 # pylint: disable=arguments-differ, protected-access, no-member
+# pylint: disable=too-many-public-methods
 
 
 class TestGraph(TestCase):
@@ -55,6 +61,174 @@ class TestGraph(TestCase):
         _, mock_update_links, topology = self.setting_update_topology(*args)
         mock_update_links.assert_called_with(topology.links)
 
+    @staticmethod
+    def graph_elements(graph):
+        """Return the nodes and edges data of a graph."""
+        edges = {frozenset((u, v)): data for u, v, data in graph.edges(data=True)}
+        return dict(graph.nodes(data=True)), edges
+
+    def test_update_topology_incremental(self):
+        """Test update topology only applying the deltas."""
+        self.kytos_graph.graph = nx.Graph()
+        topology = get_enabled_topology_with_metadata()
+        self.kytos_graph.update_topology(topology, incremental=False)
+
+        deltas = self.kytos_graph.update_topology(topology, incremental=True)
+        assert not any(deltas.values())
+
+        topology.links["0"].disable()
+        topology.links["1"].metadata = {"bandwidth": 10, "delay": 5}
+        switch = topology.switches["S11"]
+        switch.disable()
+        deltas = self.kytos_graph.update_topology(topology, incremental=True)
+
+        expected = KytosGraph()
+        expected.update_topology(topology, incremental=False)
+        assert self.graph_elements(self.kytos_graph.graph) == self.graph_elements(
+            expected.graph
+        )
+        assert deltas["edges_updated"] == 1
+        assert deltas["nodes_removed"] == 1 + len(switch.interfaces)
+        assert deltas["edges_removed"] == 1 + 2 * len(switch.interfaces)
+        assert not deltas["nodes_added"]
+        assert not deltas["edges_added"]
+
+        switch.enable()
+        for interface in switch.interfaces.values():
+            interface.enable()
+        deltas = self.kytos_graph.update_topology(topology, incremental=True)
+        assert deltas["nodes_added"] == 1 + len(switch.interfaces)
+        assert deltas["edges_added"] == 2 * len(switch.interfaces)
+        assert self.kytos_graph.applied_deltas["nodes_added"] == deltas["nodes_added"]
+
+    def test_update_topology_incremental_order(self):
+        """Test incremental updates keep the paths order of a full rebuild."""
+        self.kytos_graph.graph = nx.Graph()
+        topology = get_enabled_topology_with_metadata()
+        self.kytos_graph.update_topology(topology, incremental=False)
+        random = Random(1)
+        entities = list(topology.links.values()) + list(topology.switches.values())
+        switches = sorted(topology.switches)
+        for _ in range(30):
+            for entity in random.sample(entities, 3):
+                if entity.is_enabled():
+                    entity.disable()
+                else:
+                    entity.enable()
+            self.kytos_graph.update_topology(topology, incremental=True)
+            expected = KytosGraph()
+            expected.update_topology(topology, incremental=False)
+
+            graph = self.kytos_graph.graph
+            assert list(graph) == list(expected.graph)
+            assert list(graph.edges) == list(expected.graph.edges)
+            for source, destination in zip(switches, reversed(switches)):
+                assert self.kytos_graph.k_shortest_paths(
+                    source, destination, k=5
+                ) == expected.k_shortest_paths(source, destination, k=5)
+
+    def test_csr_sync(self):
+        """Test the CSR graph is kept in sync with the graph."""
+        self.kytos_graph.graph = nx.Graph()
+        topology = get_enabled_topology_with_metadata()
+        self.kytos_graph.update_topology(topology)
+        csr = self.kytos_graph.csr
+        assert len(csr) == len(topology.switches)
+        assert csr.number_of_edges == len(topology.links)
+
+        link = topology.links["0"]
+        link.extend_metadata({"delay": 7})
+        graph = self.kytos_graph.copy()
+        graph.update_link_metadata(link)
+        edge_id = csr.edge_id(link.endpoint_a.id, link.endpoint_b.id)
+        assert graph.csr.weights["delay"][edge_id] == 7 + 2
+        assert csr.weights["delay"][edge_id] == 105 + 2
+
+        graph.update_links(topology.links)
+        assert graph.csr is not csr
+
+    def test_copy_edges(self):
+        """Test a copy that only copies the data of some edges."""
+        self.kytos_graph.graph = nx.Graph()
+        topology = get_enabled_topology_with_metadata()
+        self.kytos_graph.update_topology(topology)
+        link = topology.links["0"]
+        endpoints = (link.endpoint_a.id, link.endpoint_b.id)
+        link.extend_metadata({"delay": 7})
+
+        graph = self.kytos_graph.copy(edges=[endpoints])
+        graph.update_link_metadata(link)
+        assert graph.generation == self.kytos_graph.generation + 1
+        assert graph.get_link_metadata(*endpoints)["delay"] == 7
+        assert self.kytos_graph.get_link_metadata(*endpoints)["delay"] == 105
+        assert graph.graph[endpoints[1]][endpoints[0]]["delay"] == 7
+
+        expected = self.kytos_graph.copy()
+        expected.update_link_metadata(link)
+        assert self.graph_elements(graph.graph) == self.graph_elements(
+            expected.graph
+        )
+        switch = topology.switches["S11"].id
+        adj, parent_adj = graph.graph._adj, self.kytos_graph.graph._adj
+        assert adj[switch] is parent_adj[switch]
+        assert adj[endpoints[0]] is not parent_adj[endpoints[0]]
+
+    def test_metric_index_sync(self):
+        """Test the metric index is kept in sync with the graph."""
+        self.kytos_graph.graph = nx.Graph()
+        topology = get_enabled_topology_with_metadata()
+        self.kytos_graph.update_topology(topology)
+        index = self.kytos_graph.metric_index
+        link = topology.links["0"]
+        edge = {link.endpoint_a.id, link.endpoint_b.id}
+
+        def delay_le(graph, value):
+            edges = graph.metric_index.filter("delay", value, index.all_edges)
+            return [set(edge) for edge in graph.metric_index.edges(edges)]
+
+        assert edge not in delay_le(self.kytos_graph, 10)
+        link.extend_metadata({"delay": 7})
+        graph = self.kytos_graph.copy()
+        graph.update_link_metadata(link)
+        assert edge in delay_le(graph, 10)
+        assert edge not in delay_le(self.kytos_graph, 10)
+
+        graph.update_links(topology.links)
+        assert graph.metric_index is not index
+
+    def test_changed_dependencies(self):
+        """Test the path dependencies affected by the changes of a copy."""
+        self.kytos_graph.graph = nx.Graph()
+        topology = get_enabled_topology_with_metadata()
+        self.kytos_graph.update_topology(topology)
+        link = topology.links["0"]
+        key = frozenset((link.endpoint_a.id, link.endpoint_b.id))
+
+        graph = self.kytos_graph.copy()
+        graph.update_topology(topology)
+        assert graph.changed_dependencies() == set()
+
+        link.extend_metadata({"delay": 7})
+        graph = self.kytos_graph.copy()
+        graph.update_link_metadata(link)
+        assert graph.changed_dependencies() == {
+            ("edge", key),
+            ("weight", "delay"),
+            ("metric", "delay"),
+        }
+
+        link.disable()
+        for incremental in (False, True):
+            graph = self.kytos_graph.copy()
+            graph.update_topology(topology, incremental=incremental)
+            assert graph.changed_dependencies() == {("edge", key)}
+
+            restored = graph.copy()
+            link.enable()
+            restored.update_topology(topology, incremental=incremental)
+            assert restored.changed_dependencies() is None
+            link.disable()
+
     def test_update_links(self):
         """Test update_links."""
         topology = get_topology_mock()
@@ -151,6 +325,7 @@ class TestGraph(TestCase):
             return_value=constrained_k_shortest_paths
         )
         self.kytos_graph._filter_links = MagicMock(side_effect=get_filter_links_fake)
+        self.kytos_graph._connected = MagicMock(return_value=True)
         k_shortest_paths = self.kytos_graph.constrained_k_shortest_paths(
             source,
             dest,
@@ -167,6 +342,8 @@ class TestGraph(TestCase):
                     weight=None,
                     k=1,
                     graph=None,
+                    engine=None,
+                    max_cost=None,
                 )
             ]
         )
@@ -178,19 +355,393 @@ class TestGraph(TestCase):
                 "utilization": 2,
             }
 
+    def test_constrained_k_shortest_paths_disconnected(self):
+        """Test that disconnected combinations are not searched."""
+        self.kytos_graph.graph = nx.Graph()
+        self.kytos_graph.update_topology(get_enabled_topology_with_metadata())
+        self.kytos_graph.k_shortest_paths = MagicMock(return_value=[])
+        flexible_metrics = {"bandwidth": 1000, "reliability": 1000, "delay": 0.1}
+        paths = self.kytos_graph.constrained_k_shortest_paths(
+            "User1", "User4", minimum_hits=1, flexible_metrics=flexible_metrics
+        )
+        assert not paths
+        assert self.kytos_graph.k_shortest_paths.call_count == 0
+
+        self.kytos_graph.constrained_k_shortest_paths(
+            "User1", "User4", flexible_metrics=flexible_metrics
+        )
+        assert self.kytos_graph.k_shortest_paths.call_count == 1
+
+    def test_constrained_k_shortest_paths_lattice(self):
+        """Test that infeasible metrics prune their combinations."""
+        self.kytos_graph.graph = nx.Graph()
+        self.kytos_graph.update_topology(get_enabled_topology_with_metadata())
+        connected = MagicMock(wraps=self.kytos_graph._connected)
+        self.kytos_graph._connected = connected
+        paths = self.kytos_graph.constrained_k_shortest_paths(
+            "User1",
+            "User4",
+            k=2,
+            flexible_metrics={"bandwidth": 1000, "delay": 1000, "reliability": 1},
+        )
+        assert [path["metrics"] for path in paths] == [
+            {"delay": 1000, "reliability": 1},
+            {"delay": 1000, "reliability": 1},
+        ]
+        # the empty and full combinations, the three single metrics and
+        # the only pair without bandwidth
+        assert connected.call_count == 6
+
+    def test_constrained_k_shortest_paths_filtered_graphs(self):
+        """Test that filtered subgraph views are reused across requests."""
+        self.kytos_graph.graph = nx.Graph()
+        topology = get_enabled_topology_with_metadata()
+        self.kytos_graph.update_topology(topology)
+        edge_subgraph = MagicMock(wraps=self.kytos_graph.graph.edge_subgraph)
+        self.kytos_graph.graph.edge_subgraph = edge_subgraph
+        expected = self.kytos_graph.constrained_k_shortest_paths(
+            "User1",
+            "User4",
+            mandatory_metrics={"bandwidth": 20},
+            flexible_metrics={"delay": 100},
+        )
+        assert edge_subgraph.call_count == 1
+
+        paths = self.kytos_graph.constrained_k_shortest_paths(
+            "User1",
+            "User4",
+            mandatory_metrics={"delay": 100},
+            flexible_metrics={"bandwidth": 20},
+        )
+        assert edge_subgraph.call_count == 1
+        assert [path["hops"] for path in paths] == [
+            path["hops"] for path in expected
+        ]
+
+        self.kytos_graph.update_link_metadata(topology.links["0"])
+        self.kytos_graph.constrained_k_shortest_paths(
+            "User1",
+            "User4",
+            mandatory_metrics={"bandwidth": 20},
+            flexible_metrics={"delay": 100},
+        )
+        assert edge_subgraph.call_count == 2
+
+    @patch("napps.kytos.pathfinder.graph.settings.FILTERED_GRAPH_CACHE_SIZE", 2)
+    def test_filtered_graph_lru(self):
+        """Test that the least recently used filtered graphs are evicted."""
+        filter_links = MagicMock(side_effect=range(10))
+        entries = [
+            self.kytos_graph._filtered_graph([("delay", delay)], filter_links)
+            for delay in (1, 2, 1, 3)
+        ]
+        assert entries[0] is entries[2]
+        assert filter_links.call_count == 3
+        assert self.kytos_graph._filtered_graph(
+            [("delay", 1)], filter_links
+        ) is entries[0]
+        self.kytos_graph._filtered_graph([("delay", 2)], filter_links)
+        assert filter_links.call_count == 4
+
+    def test_k_shortest_paths_max_cost(self):
+        """Test that paths are pruned to a max cost of the reported costs."""
+        self.kytos_graph.graph = nx.Graph()
+        self.kytos_graph.update_topology(get_enabled_topology_with_metadata())
+        weight = self.kytos_graph.spf_edge_data_cbs["delay"]
+        for engine in KytosGraph.SPF_ENGINES:
+            with self.subTest(engine=engine):
+                expected = self.kytos_graph.path_cost_builder(
+                    self.kytos_graph.k_shortest_paths(
+                        "User1", "User4", weight=weight, k=20, engine=engine
+                    ),
+                    weight="delay",
+                )
+                max_cost = expected[len(expected) // 2]["cost"]
+                paths = self.kytos_graph.k_shortest_paths(
+                    "User1",
+                    "User4",
+                    weight=weight,
+                    k=20,
+                    engine=engine,
+                    max_cost=max_cost,
+                )
+                assert paths == [
+                    path["hops"] for path in expected if path["cost"] <= max_cost
+                ]
+
+        endpoint_a, endpoint_b = next(iter(self.kytos_graph.graph.edges))
+        assert self.kytos_graph._cost_bound(weight, 10) == 10
+        self.kytos_graph.graph[endpoint_a][endpoint_b]["delay"] = 0
+        self.kytos_graph._update_indexes(endpoint_a, endpoint_b, {"delay": 0})
+        assert self.kytos_graph._cost_bound(weight, 10) is None
+        assert self.kytos_graph._cost_bound(lambda *args: 1, 10) is None
+
+    def test_path_cost_builder_search_costs(self):
+        """Test that the costs accumulated by the searches are reused."""
+        self.kytos_graph.graph = nx.Graph()
+        self.kytos_graph.update_topology(get_enabled_topology_with_metadata())
+        weight = self.kytos_graph.spf_edge_data_cbs["delay"]
+        for engine in KytosGraph.SPF_ENGINES:
+            with self.subTest(engine=engine):
+                paths = self.kytos_graph.k_shortest_paths(
+                    "User1", "User4", weight=weight, k=5, engine=engine
+                )
+                assert paths
+                for path in paths:
+                    assert isinstance(path, Path)
+                    assert path.cost == self.kytos_graph._path_cost(
+                        list(path), weight="delay"
+                    )
+
+        path = Path(paths[0], -1, "delay")
+        assert self.kytos_graph.path_cost_builder([path], weight="delay") == [
+            {"hops": path, "cost": -1}
+        ]
+        assert self.kytos_graph.path_cost_builder([path])[0]["cost"] > 0
+        endpoint_a, endpoint_b = path[0], path[1]
+        self.kytos_graph.graph[endpoint_a][endpoint_b]["delay"] = 0
+        self.kytos_graph._update_indexes(endpoint_a, endpoint_b, {"delay": 0})
+        assert self.kytos_graph.path_cost_builder([path], weight="delay") == [
+            {"hops": path, "cost": self.kytos_graph._path_cost(list(path), "delay")}
+        ]
+
+        rand = Random(7)
+        for endpoint_a, endpoint_b, data in self.kytos_graph.graph.edges(data=True):
+            data["delay"] = rand.choice([0.1, 0.2, 0.3, 0.7])
+            self.kytos_graph._update_indexes(
+                endpoint_a, endpoint_b, {"delay": data["delay"]}
+            )
+        paths = self.kytos_graph.k_shortest_paths(
+            "User1", "User4", weight=weight, k=5, engine="networkx"
+        )
+        for path in [*paths, Path(paths[0], -1, "delay")]:
+            cost = 0
+            for endpoint_a, endpoint_b in zip(path, path[1:]):
+                cost += self.kytos_graph.graph[endpoint_a][endpoint_b]["delay"]
+            assert self.kytos_graph.path_cost_builder([path], weight="delay") == [
+                {"hops": path, "cost": cost}
+            ]
+
+    def test_k_shortest_paths_unit_weights(self):
+        """Test that hop paths are the networkx ones in the same order."""
+        self.kytos_graph.graph = nx.Graph()
+        self.kytos_graph.update_topology(get_enabled_topology_with_metadata())
+        weight = self.kytos_graph.spf_edge_data_cbs["hop"]
+        checks, graph = self.kytos_graph._weight_checks, self.kytos_graph.graph
+        assert checks.unit(graph, "hop_weight")
+        assert not checks.unit(graph, "delay_weight")
+        for source, destination in (("User1", "User4"), ("S2", "User3:1")):
+            paths = self.kytos_graph.k_shortest_paths(
+                source, destination, weight=weight, k=30
+            )
+            expected = nx.shortest_simple_paths(
+                self.kytos_graph.graph, source, destination, weight=weight
+            )
+            assert paths == list(islice(expected, 30))
+            assert [path.cost for path in paths] == [
+                len(path) - 1 for path in paths
+            ]
+
+    def test_k_shortest_paths_bucket_weights(self):
+        """Test that delay paths are the networkx ones in the same order."""
+        self.kytos_graph.graph = nx.Graph()
+        self.kytos_graph.update_topology(get_enabled_topology_with_metadata())
+        weight = self.kytos_graph.spf_edge_data_cbs["delay"]
+        checks, graph = self.kytos_graph._weight_checks, self.kytos_graph.graph
+        assert checks.bucket(graph, "delay_weight") is None
+        assert checks.bucket(graph, "hop_weight") == 1
+        self.kytos_graph._reset_indexes()
+        with patch("napps.kytos.pathfinder.settings.BUCKET_QUEUE_MAX_WEIGHT", 112):
+            assert checks.bucket(graph, "delay_weight") == 112
+            for source, destination in (("User1", "User4"), ("S2", "User3:1")):
+                paths = self.kytos_graph.k_shortest_paths(
+                    source, destination, weight=weight, k=30
+                )
+                expected = nx.shortest_simple_paths(
+                    self.kytos_graph.graph, source, destination, weight=weight
+                )
+                assert paths == list(islice(expected, 30))
+                assert [path.cost for path in paths] == [
+                    self.kytos_graph._path_cost(list(path), "delay")
+                    for path in paths
+                ]
+
+    def test_spur_paths_weight_checks(self):
+        """Test that constrained searches don't check the weights of views."""
+        graph = nx.Graph()
+        for endpoint_a, endpoint_b, delay, ownership in (
+            ("A", "B", 1, "X"),
+            ("B", "D", 1, "X"),
+            ("A", "C", 20, "Y"),
+            ("C", "D", 20, "Y"),
+            ("A", "D", 10, "Y"),
+        ):
+            graph.add_edge(endpoint_a, endpoint_b, delay=delay, ownership=ownership)
+            self.kytos_graph._set_weights(graph[endpoint_a][endpoint_b])
+        self.kytos_graph.graph = graph
+        self.kytos_graph._reset_indexes()
+        weight = self.kytos_graph.spf_edge_data_cbs["delay"]
+        paths = self.kytos_graph.constrained_k_shortest_paths(
+            "A", "D", weight=weight, k=1, mandatory_metrics={"ownership": "X"}
+        )
+        assert [path["hops"] for path in paths] == [["A", "B", "D"]]
+
+        paths = self.kytos_graph.constrained_k_shortest_paths(
+            "A", "D", weight=weight, k=3, mandatory_metrics={"ownership": "Y"}
+        )
+        assert [path["hops"] for path in paths] == [["A", "D"], ["A", "C", "D"]]
+        assert [
+            path["cost"]
+            for path in self.kytos_graph.path_cost_builder(paths, weight="delay")
+        ] == [10, 40]
+        paths = self.kytos_graph.k_shortest_paths("A", "D", weight=weight, k=3)
+        assert paths == list(nx.shortest_simple_paths(graph, "A", "D", weight=weight))
+        assert [path.cost for path in paths] == [2, 10, 40]
+
+    def test_landmarks(self):
+        """Test that landmarks are kept until a weight they bound is lowered."""
+        self.kytos_graph.graph = nx.Graph()
+        self.kytos_graph.update_topology(get_enabled_topology_with_metadata())
+        assert self.kytos_graph.landmarks("delay") is None
+        assert self.kytos_graph.stale_landmarks() == ["hop", "delay", "priority"]
+        self.kytos_graph.refresh_landmarks()
+        assert not self.kytos_graph.stale_landmarks()
+        landmarks = self.kytos_graph.landmarks("delay")
+
+        graph = self.kytos_graph.copy()
+        endpoint_a, endpoint_b = "S1:1", "S2:1"
+        data = graph.graph[endpoint_a][endpoint_b]
+        data["delay"] += 1
+        graph._update_indexes(endpoint_a, endpoint_b, data)
+        assert graph.landmarks("delay") is landmarks
+        data["delay"] -= 2
+        graph._update_indexes(endpoint_a, endpoint_b, data)
+        assert graph.landmarks("delay") is None
+        assert graph.stale_landmarks() == ["delay"]
+        assert self.kytos_graph.landmarks("delay") is landmarks
+
+        paths = graph.k_shortest_paths(
+            "User1", "User4", weight=graph.spf_edge_data_cbs["delay"], k=4
+        )
+        graph.refresh_landmarks()
+        assert [
+            path.cost
+            for path in graph.k_shortest_paths(
+                "User1",
+                "User4",
+                weight=graph.spf_edge_data_cbs["delay"],
+                k=4,
+                engine="alt",
+            )
+        ] == [path.cost for path in paths]
+        graph._reset_indexes()
+        assert graph.landmarks("hop") is None
+
+    def test_k_shortest_paths_hierarchy(self):
+        """Test that single paths are searched on the contraction hierarchy."""
+        self.kytos_graph.graph = nx.Graph()
+        self.kytos_graph.update_topology(get_enabled_topology_with_metadata())
+        weight = self.kytos_graph.spf_edge_data_cbs["delay"]
+        endpoints = ["User1", "User4", "S2", "User3:1", "S5:1"]
+        expected = {
+            (source, destination): self.kytos_graph.k_shortest_paths(
+                source, destination, weight=weight, k=1
+            )
+            for source in endpoints
+            for destination in endpoints
+        }
+        assert self.kytos_graph.stale_hierarchies() == ["hop", "delay", "priority"]
+        self.kytos_graph.refresh_hierarchies()
+        for source, destination in expected:
+            if source == destination:
+                continue
+            assert self.kytos_graph.k_shortest_paths(
+                source, destination, weight=weight, k=1
+            ) == list(
+                islice(
+                    nx.shortest_simple_paths(
+                        self.kytos_graph.graph, source, destination, weight=weight
+                    ),
+                    1,
+                )
+            )
+        contraction = self.kytos_graph.hierarchy("delay")
+        with patch(
+            "napps.kytos.pathfinder.engines.hierarchy_paths",
+            wraps=engines.hierarchy_paths,
+        ) as mock_hierarchy_paths:
+            for (source, destination), paths in expected.items():
+                found = self.kytos_graph.k_shortest_paths(
+                    source, destination, weight=weight, k=1, engine="csr"
+                )
+                assert [path.cost for path in found] == [path.cost for path in paths]
+            assert mock_hierarchy_paths.call_count == len(endpoints) * (
+                len(endpoints) - 1
+            )
+            self.kytos_graph.k_shortest_paths(
+                "User1", "User4", weight=weight, k=2, engine="csr"
+            )
+            self.kytos_graph.k_shortest_paths(
+                "User1",
+                "User4",
+                weight=weight,
+                k=1,
+                graph=self.kytos_graph.without_links([("S1:1", "S2:1")]),
+                engine="csr",
+            )
+            assert mock_hierarchy_paths.call_count == len(endpoints) * (
+                len(endpoints) - 1
+            )
+        assert (
+            self.kytos_graph.k_shortest_paths(
+                "User1", "User4", weight=weight, k=1, max_cost=1
+            )
+            == []
+        )
+
+        graph = self.kytos_graph.copy()
+        endpoint_a, endpoint_b = "S1:1", "S2:1"
+        data = graph.graph[endpoint_a][endpoint_b]
+        data["delay"] += 1
+        graph._update_indexes(endpoint_a, endpoint_b, data)
+        assert graph.hierarchy("delay") is None
+        assert graph.hierarchy("hop") is self.kytos_graph.hierarchy("hop")
+        assert self.kytos_graph.hierarchy("delay") is contraction
+
+    def test_connected(self):
+        """Test the connectivity check of bitsets of links."""
+        self.kytos_graph.graph = nx.Graph()
+        self.kytos_graph.update_topology(get_enabled_topology_with_metadata())
+        index = self.kytos_graph.metric_index
+        links = self.kytos_graph._filter_links(index.all_edges, bandwidth=100)
+        connectivity = {}
+        assert self.kytos_graph._connected(
+            index.all_edges, "User1", "User4", connectivity
+        )
+        assert not self.kytos_graph._connected(0, "User1", "User4", connectivity)
+        assert connectivity == {index.all_edges: True, 0: False}
+        connected = self.kytos_graph._connected(links, "User1", "User4", {})
+        assert connected == nx.has_path(
+            self.kytos_graph.graph.edge_subgraph(index.edges(links)), "User1", "User4"
+        )
+
     def test_get_link_metadata(self):
-        """Test metadata retrieval."""
-        topology = get_topology_with_metadata_mock()
-        self.kytos_graph.update_nodes(topology.switches)
-        self.kytos_graph.update_links(topology.links)
-        endpoint_a = "S1:1"
-        endpoint_b = "S2:1"
-        metadata = {"reliability": 5, "bandwidth": 100, "delay": 105}
-        self.kytos_graph.get_link_metadata = MagicMock(return_value=metadata)
+        """Test metadata retrieval without the spf weights."""
+        self.kytos_graph.graph = nx.Graph()
+        topology = get_enabled_topology_with_metadata()
+        self.kytos_graph.update_topology(topology)
+        link = topology.links["0"]
+        endpoints = (link.endpoint_a.id, link.endpoint_b.id)
 
-        result = self.kytos_graph.get_link_metadata(endpoint_a, endpoint_b)
+        result = self.kytos_graph.get_link_metadata(*endpoints)
 
-        assert result == metadata
+        assert result == {
+            key: value
+            for key, value in link.metadata.items()
+            if key in self.kytos_graph._filter_functions
+        }
+        assert self.kytos_graph.graph[endpoints[0]][endpoints[1]]["delay_weight"]
+        assert self.kytos_graph.get_link_metadata(endpoints[0], "User1") is None
 
     def test_update_link_metadata(self):
         """Test update link metadata."""
@@ -0,0 +1,73 @@
+"""Test the contraction hierarchies of hierarchy.py."""
+import random
+from unittest import TestCase
+
+import networkx as nx
+
+from napps.kytos.pathfinder import csr, hierarchy
+from napps.kytos.pathfinder.utils import nx_edge_data_delay, nx_edge_data_weight
+
+
+class TestContractionHierarchy(TestCase):
+    """Tests for the ContractionHierarchy class and its shortest paths."""
+
+    def setUp(self):
+        """Execute steps before each tests."""
+        rand = random.Random(7)
+        self.graph = nx.gnm_random_graph(40, 70, seed=7)
+        self.graph.add_edge(40, 41)
+        for _, _, data in self.graph.edges(data=True):
+            data["delay"] = rand.randint(1, 20)
+        for switch in (1, 2, 3):
+            for port in (1, 2):
+                interface = f"{switch}:{port}"
+                self.graph.add_node(interface, switch=switch)
+                self.graph.add_edge(switch, interface)
+        self.graph.add_edge("1:1", "2:1", delay=3)
+        self.graph.add_edge("1:2", "3:2", delay=30)
+        self.weight_funcs = {"hop": nx_edge_data_weight, "delay": nx_edge_data_delay}
+        self.csr = csr.CSRGraph(self.graph, self.weight_funcs)
+
+    def path_cost(self, path, func):
+        """Return the cost of a path of the graph."""
+        return sum(
+            func(node, nbr, self.graph[node][nbr])
+            for node, nbr in zip(path, path[1:])
+        )
+
+    def test_shortest_path(self):
+        """Test that the paths are valid and have the networkx costs."""
+        for name, func in self.weight_funcs.items():
+            contraction = hierarchy.ContractionHierarchy(self.csr, name)
+            lengths = dict(nx.all_pairs_dijkstra_path_length(self.graph, weight=func))
+            for source in self.graph:
+                for target in self.graph:
+                    if source == target:
+                        continue
+                    with self.subTest(source=source, target=target, weight=name):
+                        query = csr.Query(self.csr, source, target, name)
+                        path = hierarchy.shortest_path(contraction, query)
+                        if target not in lengths[source]:
+                            assert path is None
+                            continue
+                        assert path[0] == source and path[-1] == target
+                        assert len(set(path)) == len(path)
+                        assert all(
+                            self.graph.has_edge(node, nbr)
+                            for node, nbr in zip(path, path[1:])
+                        )
+                        assert path.cost == lengths[source][target]
+                        assert self.path_cost(path, func) == path.cost
+
+    def test_valid(self):
+        """Test that any weight change of an edge invalidates it."""
+        contraction = hierarchy.ContractionHierarchy(self.csr, "delay")
+        copy = self.csr.copy()
+        assert contraction.built_on(copy)
+        endpoint_a, endpoint_b = "1:1", "2:1"
+        edge_id = copy.edge_id(endpoint_a, endpoint_b)
+        copy.update_weights(endpoint_a, endpoint_b, {"delay": 3}, self.weight_funcs)
+        assert contraction.valid(copy, edge_id)
+        copy.update_weights(endpoint_a, endpoint_b, {"delay": 4}, self.weight_funcs)
+        assert not contraction.valid(copy, edge_id)
+        assert not contraction.built_on(csr.CSRGraph(self.graph, self.weight_funcs))
@@ -0,0 +1,77 @@
+"""Test the landmarks of landmarks.py."""
+import random
+from unittest import TestCase
+
+import networkx as nx
+
+from napps.kytos.pathfinder import csr
+from napps.kytos.pathfinder.landmarks import Landmarks
+from napps.kytos.pathfinder.utils import nx_edge_data_delay
+
+
+class TestLandmarks(TestCase):
+    """Tests for the Landmarks class and the searches they guide."""
+
+    def setUp(self):
+        """Execute steps before each tests."""
+        rand = random.Random(7)
+        self.graph = nx.gnm_random_graph(40, 90, seed=7)
+        self.graph.add_edge(40, 41, delay=1)
+        for _, _, data in self.graph.edges(data=True):
+            data["delay"] = rand.randint(1, 20)
+        self.weight_funcs = {"delay": nx_edge_data_delay}
+        self.csr = csr.CSRGraph(self.graph, self.weight_funcs)
+        self.landmarks = Landmarks(self.csr, "delay", 4)
+
+    def test_bounds(self):
+        """Test that the landmark distances bound the distances."""
+        assert len(self.landmarks.nodes) == 4
+        lengths = dict(nx.all_pairs_dijkstra_path_length(self.graph, weight="delay"))
+        index = self.csr.node_index
+        for node in self.graph:
+            for other in self.graph:
+                for dists in self.landmarks.dists:
+                    if dists[index[other]] == float("inf"):
+                        continue
+                    bound = abs(dists[index[node]] - dists[index[other]])
+                    assert bound <= lengths[node].get(other, float("inf"))
+
+    def test_admissible(self):
+        """Test that only lowered weights invalidate the landmarks."""
+        copy = self.csr.copy()
+        assert self.landmarks.built_on(copy)
+        edge_id = copy.edge_id(0, next(iter(self.graph[0])))
+        data = dict(self.graph.edges[copy.edge_ends[edge_id]])
+        data["delay"] += 1
+        copy.update_weights(*copy.edge_ends[edge_id], data, self.weight_funcs)
+        assert self.landmarks.admissible(copy, edge_id)
+        data["delay"] -= 2
+        copy.update_weights(*copy.edge_ends[edge_id], data, self.weight_funcs)
+        assert not self.landmarks.admissible(copy, edge_id)
+        assert not self.landmarks.built_on(
+            csr.CSRGraph(self.graph, self.weight_funcs)
+        )
+
+    def test_k_shortest_paths(self):
+        """Test that the landmark A* paths have the csr search costs."""
+        rand = random.Random(7)
+        for _ in range(50):
+            source, target = rand.sample(list(self.graph), 2)
+            with self.subTest(source=source, target=target):
+                expected = csr.k_shortest_paths(self.csr, source, target, "delay", k=8)
+                paths = csr.k_shortest_paths(
+                    self.csr, source, target, "delay", k=8, landmarks=self.landmarks
+                )
+                assert [path.cost for path in paths] == [
+                    path.cost for path in expected
+                ]
+                max_cost = expected[-1].cost - 1 if expected else 0
+                assert csr.k_shortest_paths(
+                    self.csr,
+                    source,
+                    target,
+                    "delay",
+                    k=8,
+                    max_cost=max_cost,
+                    landmarks=self.landmarks,
+                ) == [path for path in paths if path.cost <= max_cost]
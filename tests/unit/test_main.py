@@ -8,11 +8,15 @@ from kytos.core.events import KytosEvent
 from kytos.lib.helpers import get_controller_mock, get_test_client
 
 # pylint: disable=import-error
+from napps.kytos.pathfinder.destinations import (
+    constrained_k_shortest_paths_many, k_shortest_paths_many)
 from napps.kytos.pathfinder.main import Main
-from tests.helpers import get_topology_mock, get_topology_with_metadata
+from napps.kytos.pathfinder.search import shortest_path_tree
+from tests.helpers import (get_enabled_topology_with_metadata, get_topology_mock,
+                           get_topology_with_metadata)
 
 
-# pylint: disable=protected-access
+# pylint: disable=protected-access, too-many-public-methods
 class TestMain(TestCase):
     """Tests for the Main class."""
 
@@ -53,6 +57,51 @@ class TestMain(TestCase):
         self.napp.update_topology(second_event)
         assert self.napp._topology == topology
 
+    def test_update_topology_publishes_snapshot(self):
+        """Test update topology publishes a new graph snapshot."""
+        snapshot = self.napp.graph
+        event = KytosEvent(
+            name="kytos.topology.updated",
+            content={"topology": get_enabled_topology_with_metadata()}
+        )
+        self.napp.update_topology(event)
+
+        assert self.napp.graph is not snapshot
+        assert self.napp.graph.generation == snapshot.generation + 1
+        assert self.napp.graph.graph.number_of_nodes()
+        assert not snapshot.graph.number_of_nodes()
+
+    def test_update_topology_refreshes_indexes(self):
+        """Test that the graph indexes are refreshed in the background."""
+        event = KytosEvent(
+            name="kytos.topology.updated",
+            content={"topology": get_enabled_topology_with_metadata()}
+        )
+        self.napp.update_topology(event)
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/"
+        data = {"source": "User1", "destination": "User4"}
+        api.open(url, method="POST", json=data)
+        assert self.napp._index_refresh is None
+        assert self.napp.graph.stale_hierarchies()
+        assert self.napp.graph.stale_landmarks()
+
+        api.open(url, method="POST", json={**data, "spf_engine": "csr"})
+        self.napp._index_refresh.result()
+        assert not self.napp.graph.stale_hierarchies()
+        assert self.napp.graph.stale_landmarks()
+
+        api.open(url, method="POST", json={**data, "spf_engine": "alt"})
+        refresh = self.napp._index_refresh
+        refresh.result()
+        assert not self.napp.graph.stale_landmarks()
+
+        self.napp.update_topology(event)
+        assert self.napp._index_refresh is not refresh
+        self.napp._index_refresh.result()
+        assert not self.napp.graph.stale_landmarks()
+        assert not self.napp.graph.stale_hierarchies()
+
     def test_update_topology_failure_case(self):
         """Test update topology method to failure case."""
         event = KytosEvent(name="kytos.topology.updated")
@@ -88,7 +137,8 @@ class TestMain(TestCase):
         response = api.open(url, method="POST", json=data)
 
         expected_response = {
-            "paths": [{"hops": path, "cost": cost_mocked_value}]
+            "paths": [{"hops": path, "cost": cost_mocked_value}],
+            "graph_generation": self.napp.graph.generation,
         }
         self.assertEqual(response.json, expected_response)
 
@@ -282,21 +332,21 @@ class TestMain(TestCase):
         )
         self.napp.update_topology(event)
 
-    def test_update_links_changed(self):
+    @patch("napps.kytos.pathfinder.graph.KytosGraph.update_link_metadata")
+    def test_update_links_changed(self, mock_update_link_metadata):
         """Test update_links_metadata_changed."""
-        self.napp.graph.update_link_metadata = MagicMock()
         self.napp.controller.buffers.app.put = MagicMock()
         event = KytosEvent(
             name="kytos.topology.links.metadata.added",
             content={"link": MagicMock(), "metadata": {}}
         )
         self.napp.update_links_metadata_changed(event)
-        assert self.napp.graph.update_link_metadata.call_count == 1
+        assert mock_update_link_metadata.call_count == 1
         assert self.napp.controller.buffers.app.put.call_count == 0
 
-    def test_update_links_changed_out_of_order(self):
+    @patch("napps.kytos.pathfinder.graph.KytosGraph.update_link_metadata")
+    def test_update_links_changed_out_of_order(self, mock_update_link_metadata):
         """Test update_links_metadata_changed out of order."""
-        self.napp.graph.update_link_metadata = MagicMock()
         self.napp.controller.buffers.app.put = MagicMock()
         link = MagicMock(id="1")
         assert link.id not in self.napp._links_updated_at
@@ -305,7 +355,7 @@ class TestMain(TestCase):
             content={"link": link, "metadata": {}}
         )
         self.napp.update_links_metadata_changed(event)
-        assert self.napp.graph.update_link_metadata.call_count == 1
+        assert mock_update_link_metadata.call_count == 1
         assert self.napp.controller.buffers.app.put.call_count == 0
         assert self.napp._links_updated_at[link.id] == event.timestamp
 
@@ -315,22 +365,43 @@ class TestMain(TestCase):
         )
         second_event.timestamp = event.timestamp - timedelta(seconds=10)
         self.napp.update_links_metadata_changed(second_event)
-        assert self.napp.graph.update_link_metadata.call_count == 1
+        assert mock_update_link_metadata.call_count == 1
         assert self.napp.controller.buffers.app.put.call_count == 0
         assert self.napp._links_updated_at[link.id] == event.timestamp
 
-    def test_update_links_changed_key_error(self):
+    @patch("napps.kytos.pathfinder.graph.KytosGraph.update_link_metadata")
+    def test_update_links_changed_key_error(self, mock_update_link_metadata):
         """Test update_links_metadata_changed key_error."""
-        self.napp.graph.update_link_metadata = MagicMock()
         self.napp.controller.buffers.app.put = MagicMock()
         event = KytosEvent(
             name="kytos.topology.links.metadata.added",
             content={"link": MagicMock()}
         )
         self.napp.update_links_metadata_changed(event)
-        assert self.napp.graph.update_link_metadata.call_count == 1
+        assert mock_update_link_metadata.call_count == 1
         assert self.napp.controller.buffers.app.put.call_count == 1
 
+    def test_update_links_changed_publishes_snapshot(self):
+        """Test update_links_metadata_changed publishes a new snapshot."""
+        topology = get_enabled_topology_with_metadata()
+        self.napp.update_topology(
+            KytosEvent(name="kytos.topology.updated", content={"topology": topology})
+        )
+        snapshot = self.napp.graph
+        link = topology.links["0"]
+        endpoints = (link.endpoint_a.id, link.endpoint_b.id)
+        link.extend_metadata({"bandwidth": 1})
+        event = KytosEvent(
+            name="kytos.topology.links.metadata.added",
+            content={"link": link, "metadata": {"bandwidth": 1}}
+        )
+        self.napp.update_links_metadata_changed(event)
+
+        assert self.napp.graph is not snapshot
+        assert self.napp.graph.generation == snapshot.generation + 1
+        assert self.napp.graph.get_link_metadata(*endpoints)["bandwidth"] == 1
+        assert snapshot.get_link_metadata(*endpoints)["bandwidth"] == 100
+
     def test_shortest_path(self):
         """Test shortest path."""
         self.setting_path()
@@ -347,6 +418,363 @@ class TestMain(TestCase):
             assert source == path["hops"][0]
             assert destination == path["hops"][-1]
 
+    def test_shortest_path_spf_engine(self):
+        """Test shortest path with the spf_engine of the request."""
+        self.setting_path()
+
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/"
+
+        data = {"source": "User1", "destination": "User4", "spf_max_paths": 4}
+        expected = api.open(url, method="POST", json=data).json["paths"]
+        for spf_engine in ("csr", "deviation", "alt"):
+            data["spf_engine"] = spf_engine
+            response = api.open(url, method="POST", json=data)
+            assert [path["cost"] for path in response.json["paths"]] == [
+                path["cost"] for path in expected
+            ]
+
+        data["spf_engine"] = "dijkstra"
+        response = api.open(url, method="POST", json=data)
+        assert response.status_code == 400
+
+    def test_shortest_path_cost_type(self):
+        """Test that the costs of integer metadata are JSON integers."""
+        self.napp.update_topology(
+            KytosEvent(
+                name="kytos.topology.updated",
+                content={"topology": get_enabled_topology_with_metadata()},
+            )
+        )
+        self.napp.graph.refresh_hierarchies()
+
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/"
+        data = {"source": "User1", "destination": "User4"}
+        for spf_engine in ("networkx", "csr", "deviation", "alt"):
+            for spf_attribute in ("hop", "delay"):
+                for spf_max_paths in (1, 4):
+                    payload = {
+                        **data,
+                        "spf_engine": spf_engine,
+                        "spf_attribute": spf_attribute,
+                        "spf_max_paths": spf_max_paths,
+                    }
+                    with self.subTest(**payload):
+                        paths = api.open(url, method="POST", json=payload).json[
+                            "paths"
+                        ]
+                        assert paths
+                        for path in paths:
+                            assert isinstance(path["cost"], int)
+
+    def test_shortest_path_cached(self):
+        """Test that results are cached until the graph changes them."""
+        topology = get_enabled_topology_with_metadata()
+        event = KytosEvent(
+            name="kytos.topology.updated", content={"topology": topology}
+        )
+        self.napp.update_topology(event)
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/"
+        data = {"source": "User1", "destination": "User4"}
+        cache = self.napp.result_cache
+
+        first = api.open(url, method="POST", json=data)
+        second = api.open(url, method="POST", json=data)
+        assert first.json == second.json
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        self.napp.update_topology(event)
+        third = api.open(url, method="POST", json=data)
+        assert third.json["paths"] == first.json["paths"]
+        assert third.json["graph_generation"] == first.json["graph_generation"] + 1
+        assert (cache.hits, cache.misses) == (2, 1)
+
+        traversed = {
+            frozenset(hops)
+            for path in first.json["paths"]
+            for hops in zip(path["hops"], path["hops"][1:])
+        }
+        links = sorted(
+            topology.links.values(),
+            key=lambda link: frozenset(
+                (link.endpoint_a.id, link.endpoint_b.id)
+            ) in traversed,
+        )
+        for link, misses in ((links[0], 1), (links[-1], 2)):
+            link.extend_metadata({"delay": 1})
+            self.napp.update_links_metadata_changed(
+                KytosEvent(
+                    name="kytos.topology.links.metadata.added",
+                    content={"link": link, "metadata": {"delay": 1}},
+                )
+            )
+            api.open(url, method="POST", json=data)
+            assert cache.misses == misses
+
+    def test_shortest_path_destinations(self):
+        """Test shortest paths to several destinations."""
+        self.napp.update_topology(
+            KytosEvent(
+                name="kytos.topology.updated",
+                content={"topology": get_enabled_topology_with_metadata()},
+            )
+        )
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/"
+        destinations = ["User2", "User4", "User3", "S9"]
+        for extra in ({}, {"mandatory_metrics": {"bandwidth": 50}}):
+            data = {"source": "User1", "spf_attribute": "delay", **extra}
+            response = api.open(
+                url, method="POST", json={**data, "destinations": destinations}
+            )
+            assert response.status_code == 200
+            expected = []
+            for destination in destinations:
+                expected.extend(
+                    api.open(
+                        url, method="POST", json={**data, "destination": destination}
+                    ).json["paths"]
+                )
+            assert expected
+            assert [path["cost"] for path in response.json["paths"]] == [
+                path["cost"] for path in expected
+            ]
+            assert [path["hops"][-1] for path in response.json["paths"]] == [
+                path["hops"][-1] for path in expected
+            ]
+
+        data = {"source": "User1", "destinations": "User2"}
+        response = api.open(url, method="POST", json=data)
+        assert response.status_code == 400
+
+    def test_shortest_path_undesired_links(self):
+        """Test that undesired links are excluded before searching."""
+        topology = get_enabled_topology_with_metadata()
+        self.napp.update_topology(
+            KytosEvent(
+                name="kytos.topology.updated", content={"topology": topology}
+            )
+        )
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/"
+        data = {"source": "User1", "destination": "User4", "spf_max_paths": 3}
+        best = api.open(url, method="POST", json=data).json["paths"][0]
+        hops = set(zip(best["hops"], best["hops"][1:]))
+        undesired = [
+            link_id
+            for link_id, link in topology.links.items()
+            if (link.endpoint_a.id, link.endpoint_b.id) in hops
+            or (link.endpoint_b.id, link.endpoint_a.id) in hops
+        ]
+        assert undesired
+
+        for extra in ({}, {"mandatory_metrics": {"bandwidth": 10}}):
+            payload = {**data, **extra}
+            response = api.open(
+                url, method="POST", json={**payload, "undesired_links": undesired}
+            )
+            paths = api.open(
+                url, method="POST", json={**payload, "spf_max_paths": 50}
+            ).json["paths"]
+            expected = self.napp._filter_paths_undesired_links(paths, undesired)
+            assert len(response.json["paths"]) == 3
+            assert [path["cost"] for path in response.json["paths"]] == [
+                path["cost"] for path in expected[:3]
+            ]
+            assert (
+                self.napp._filter_paths_undesired_links(
+                    response.json["paths"], undesired
+                )
+                == response.json["paths"]
+            )
+
+    def test_shortest_path_desired_links_waypoints(self):
+        """Test that waypoint paths are the best ones with the desired links."""
+        topology = get_enabled_topology_with_metadata()
+        self.napp.update_topology(
+            KytosEvent(
+                name="kytos.topology.updated", content={"topology": topology}
+            )
+        )
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/"
+        data = {"source": "User1", "destination": "User4", "spf_max_paths": 300}
+        paths = api.open(url, method="POST", json=data).json["paths"]
+        hops = set(zip(paths[-1]["hops"], paths[-1]["hops"][1:]))
+        desired = [
+            link_id
+            for link_id, link in topology.links.items()
+            if (link.endpoint_a.id, link.endpoint_b.id) in hops
+            or (link.endpoint_b.id, link.endpoint_a.id) in hops
+        ][:2]
+        assert len(desired) == 2
+
+        for extra in ({}, {"mandatory_metrics": {"bandwidth": 10}}):
+            payload = {**data, **extra, "desired_links": desired}
+            expected = api.open(url, method="POST", json=payload).json["paths"]
+            assert expected
+            response = api.open(
+                url,
+                method="POST",
+                json={
+                    **payload,
+                    "spf_max_paths": 3,
+                    "desired_links_mode": "waypoints",
+                },
+            )
+            assert response.status_code == 200
+            paths = response.json["paths"]
+            assert paths
+            assert self.napp._filter_paths_desired_links(paths, desired) == paths
+            for path in paths:
+                assert len(set(path["hops"])) == len(path["hops"])
+            assert [path["cost"] for path in paths] == [
+                path["cost"] for path in sorted(expected, key=lambda p: p["cost"])
+            ][:3]
+
+        for extra in (
+            {"desired_links_mode": "any"},
+            {"desired_links_mode": "waypoints", "destinations": ["User2"]},
+            {"desired_links_mode": "waypoints", "desired_links": ["1"] * 5},
+        ):
+            response = api.open(url, method="POST", json={**data, **extra})
+            assert response.status_code == 400
+
+    def test_shortest_path_anycast(self):
+        """Test shortest paths to the nearest of several destinations."""
+        self.napp.update_topology(
+            KytosEvent(
+                name="kytos.topology.updated",
+                content={"topology": get_enabled_topology_with_metadata()},
+            )
+        )
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/"
+        data = {
+            "source": "User1",
+            "destinations": ["User2", "User4", "S9"],
+            "spf_attribute": "delay",
+            "spf_max_paths": 3,
+        }
+        expected = api.open(url, method="POST", json=data).json["paths"]
+        expected = sorted(path["cost"] for path in expected)[:3]
+
+        response = api.open(url, method="POST", json={**data, "anycast": True})
+        assert response.status_code == 200
+        assert [path["cost"] for path in response.json["paths"]] == expected
+
+        del data["destinations"]
+        data["destination"] = "User2"
+        response = api.open(url, method="POST", json={**data, "anycast": True})
+        assert response.status_code == 400
+
+    def test_shortest_paths_batch(self):
+        """Test that batch results are the v2/ ones in order."""
+        self.napp.update_topology(
+            KytosEvent(
+                name="kytos.topology.updated",
+                content={"topology": get_enabled_topology_with_metadata()},
+            )
+        )
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/"
+        payloads = [
+            {"source": "User1", "destination": "User4"},
+            {"source": "User2", "destination": "User4", "spf_attribute": "delay"},
+            {"source": "User1", "destination": "User4", "spf_attribute": "cost"},
+            {
+                "source": "User1",
+                "destination": "User3",
+                "mandatory_metrics": {"bandwidth": 50},
+            },
+            "User1",
+            {"source": "User1", "destination": "User2", "spf_max_paths": 3},
+            {"source": "User1"},
+            {"destination": "User4"},
+            {"source": "User1", "destination": "User4", "destinations": ["User2"]},
+        ]
+
+        response = api.open(url + "batch", method="POST", json=payloads)
+        assert response.status_code == 200
+        results = response.json["results"]
+        assert len(results) == len(payloads)
+        for payload, result in zip(payloads, results):
+            if not isinstance(payload, dict):
+                assert "TypeError" in result["error"]
+                continue
+            expected = api.open(url, method="POST", json=payload)
+            if expected.status_code == 400:
+                assert result["error"]
+                assert "paths" not in result
+            else:
+                assert result == {"paths": expected.json["paths"]}
+                assert result["paths"]
+        assert "Invalid 'spf_attribute'" in results[2]["error"]
+        assert results[6] == {
+            "error": "Exactly one of destination or destinations is required"
+        }
+        assert results[7] == {"error": "source is required"}
+
+        with patch.object(
+            self.napp.graph, "constrained_k_shortest_paths", side_effect=KeyError
+        ), patch.object(self.napp.result_cache, "get", return_value=None):
+            response = api.open(url + "batch", method="POST", json=payloads)
+        assert response.status_code == 200
+        results = response.json["results"]
+        assert results[3] == {"error": "KeyError: "}
+        assert results[0]["paths"]
+
+        response = api.open(url + "batch", method="POST", json=payloads[0])
+        assert response.status_code == 400
+
+    def test_shortest_paths_batch_grouped(self):
+        """Test that batch payloads to several destinations are searched once."""
+        self.napp.update_topology(
+            KytosEvent(
+                name="kytos.topology.updated",
+                content={"topology": get_enabled_topology_with_metadata()},
+            )
+        )
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/"
+        constrained = {"source": "User1", "mandatory_metrics": {"bandwidth": 50}}
+        payloads = [
+            {"source": "User1", "destination": "User4", "spf_max_paths": 3},
+            {**constrained, "destination": "User2"},
+            {"source": "User1", "destination": "User2", "spf_max_paths": 3},
+            {**constrained, "destination": "User3"},
+            {"source": "User1", "destination": "User3", "spf_max_paths": 3},
+            {"source": "User2", "destination": "User3", "spf_max_paths": 3},
+        ]
+        expected = [
+            api.open(url, method="POST", json=payload).json["paths"]
+            for payload in payloads
+        ]
+        self.napp.result_cache.clear()
+
+        with patch(
+            "napps.kytos.pathfinder.main.k_shortest_paths_many",
+            wraps=k_shortest_paths_many,
+        ) as many, patch(
+            "napps.kytos.pathfinder.main.constrained_k_shortest_paths_many",
+            wraps=constrained_k_shortest_paths_many,
+        ) as constrained_many, patch(
+            "napps.kytos.pathfinder.destinations.shortest_path_tree",
+            wraps=shortest_path_tree,
+        ) as tree:
+            response = api.open(url + "batch", method="POST", json=payloads)
+        assert response.status_code == 200
+        assert response.json["results"] == [
+            {"paths": paths} for paths in expected
+        ]
+        assert many.call_count == 1
+        assert many.call_args[0][1:3] == ("User1", ["User4", "User2", "User3"])
+        assert constrained_many.call_count == 1
+        assert constrained_many.call_args[0][1:3] == ("User1", ["User2", "User3"])
+        assert [call[0][1] for call in tree.call_args_list] == ["User1", "User1"]
+
     def setting_shortest_constrained_path_exception(self, side_effect):
         """Set the primary elements needed to test the shortest
         constrained path behavior under exception actions."""
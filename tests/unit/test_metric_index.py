@@ -0,0 +1,89 @@
+"""Test MetricIndex methods."""
+# pylint: disable=protected-access
+from unittest import TestCase
+
+import networkx as nx
+
+from napps.kytos.pathfinder.graph import KytosGraph
+from napps.kytos.pathfinder.metric_index import MetricIndex
+
+
+class TestMetricIndex(TestCase):
+    """Tests for the MetricIndex class."""
+
+    def setUp(self):
+        """Execute steps before each tests."""
+        self.graph = nx.Graph()
+        self.graph.add_edge("A", "B", bandwidth=100, delay=5, ownership="red")
+        self.graph.add_edge("B", "C", bandwidth=10, delay=50, ownership="blue")
+        self.graph.add_edge("C", "D", bandwidth=100.0, ownership="red,blue")
+        self.graph.add_edge("D", "E", delay=20, ownership={"green": {}})
+        self.graph.add_edge("E", "F")
+        self.kytos_graph = KytosGraph()
+        self.index = MetricIndex(
+            self.graph,
+            self.kytos_graph._filter_functions,
+            self.kytos_graph._filter_orders,
+        )
+
+    def filtered(self, metric, value, edges=None):
+        """Return the edges passing a metric filter as sets of endpoints."""
+        if edges is None:
+            edges = self.index.all_edges
+        return {
+            frozenset(edge)
+            for edge in self.index.edges(self.index.filter(metric, value, edges))
+        }
+
+    def expected(self, metric, value):
+        """Return the edges passing a metric filter function."""
+        func = self.kytos_graph._filter_functions[metric]
+        return {
+            frozenset((u, v))
+            for u, v, _ in func(value, self.graph.edges(data=True))
+        }
+
+    def test_filter(self):
+        """Test that filters match the filter functions."""
+        for metric, values in (
+            ("bandwidth", (5, 10, 11, 100, 101, 10.5)),
+            ("delay", (1, 5, 20, 49, 50, 51)),
+            ("ownership", ("red", "blue", "green", "yellow")),
+        ):
+            for value in values:
+                with self.subTest(metric=metric, value=value):
+                    assert self.filtered(metric, value) == self.expected(
+                        metric, value
+                    )
+
+    def test_filter_and(self):
+        """Test that filters are combined as bitset ANDs."""
+        edges = self.index.filter("bandwidth", 50, self.index.all_edges)
+        assert self.filtered("delay", 10, edges) == {
+            frozenset(("A", "B")),
+            frozenset(("C", "D")),
+            frozenset(("E", "F")),
+        }
+
+    def test_filter_type_error(self):
+        """Test that filters raise the errors of the filter functions."""
+        with self.assertRaises(TypeError):
+            self.index.filter("ownership", 1, self.index.all_edges)
+        self.graph["E"]["F"]["delay"] = "slow"
+        self.index.update("E", "F", self.graph["E"]["F"])
+        with self.assertRaises(TypeError):
+            self.index.filter("delay", 10, self.index.all_edges)
+
+    def test_update_copy(self):
+        """Test updating a copy of the index."""
+        copy = self.index.copy()
+        copy.update("B", "A", {"bandwidth": 1})
+        assert frozenset(("A", "B")) not in {
+            frozenset(edge)
+            for edge in copy.edges(copy.filter("bandwidth", 50, copy.all_edges))
+        }
+        assert frozenset(("A", "B")) in self.filtered("bandwidth", 50)
+        assert frozenset(("A", "B")) in {
+            frozenset(edge)
+            for edge in copy.edges(copy.filter("delay", 1, copy.all_edges))
+        }
@@ -0,0 +1,145 @@
+"""Test ReplicaPool methods."""
+import pickle
+from itertools import islice, takewhile
+from unittest import TestCase
+
+import networkx as nx
+
+from napps.kytos.pathfinder.graph import KytosGraph
+from napps.kytos.pathfinder.parallel import (ReplicaPool, _apply_delta,
+                                             _graph_delta,
+                                             shortest_simple_paths)
+
+# pylint: disable=protected-access
+
+
+class TestReplicaPool(TestCase):
+    """Tests for the ReplicaPool class."""
+
+    def setUp(self):
+        """Execute steps before each tests."""
+        self.graph = KytosGraph()
+        self.graph.graph.add_edge("S1", "S1:1")
+        self.graph.graph.add_edge("S1:1", "S2:1", bandwidth=100)
+        self.graph.graph.add_edge("S2", "S2:1")
+        self.pool = ReplicaPool(1)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_replica(self):
+        """Test that graphs are replicated without their indexes."""
+        assert self.graph.metric_index.all_edges == 7
+        replica = pickle.loads(pickle.dumps(self.graph))
+        assert replica.generation == self.graph.generation
+        assert list(replica.graph.edges(data=True)) == list(
+            self.graph.graph.edges(data=True)
+        )
+        assert replica._metric_index is None
+
+    def test_map(self):
+        """Test calling the replicas of newer and older snapshots."""
+        args = [("S1", "S2"), ("S2", "S1:1")]
+        assert self.pool.map(self.graph, "k_shortest_paths", args) == [
+            [["S1", "S1:1", "S2:1", "S2"]],
+            [["S2", "S2:1", "S1:1"]],
+        ]
+        graph = self.graph.copy()
+        graph.graph.remove_edge("S1:1", "S2:1")
+        assert self.pool.map(graph, "k_shortest_paths", args) == [[], []]
+        assert self.pool.map(self.graph, "k_shortest_paths", args) is None
+
+    def test_map_deltas(self):
+        """Test that newer snapshots are replicated by their deltas."""
+        self.graph.graph = nx.grid_2d_graph(5, 5)
+        for _, _, data in self.graph.graph.edges(data=True):
+            self.graph._set_weights(data)
+        weight = self.graph.spf_edge_data_cbs["delay"]
+        args = [((0, 0), (4, 4), weight, 3)]
+        self.pool.map(self.graph, "k_shortest_paths", args)
+        executor = self.pool._executor
+
+        graph = self.graph
+        for delay in (5, 7):
+            graph = graph.copy(edges=[((0, 0), (0, 1))])
+            graph.graph[(0, 0)][(0, 1)]["delay"] = delay
+            graph._update_indexes((0, 0), (0, 1), graph.graph[(0, 0)][(0, 1)])
+            assert self.pool.map(graph, "k_shortest_paths", args) == [
+                graph.k_shortest_paths(*args[0])
+            ]
+        assert self.pool._executor is executor
+        assert len(self.pool._deltas) == 2
+
+    def test_graph_delta(self):
+        """Test that a delta replicates a graph in the same order."""
+        graph = nx.grid_2d_graph(4, 4)
+        for index, (endpoint_a, endpoint_b) in enumerate(graph.edges):
+            graph[endpoint_a][endpoint_b]["delay"] = index
+        new_graph = graph.copy()
+        new_graph.remove_node((1, 1))
+        new_graph.remove_edge((2, 2), (2, 3))
+        new_graph[(0, 0)][(0, 1)]["delay"] = 100
+        new_graph.nodes[(3, 3)]["switch"] = (3, 2)
+        new_graph.add_edge((0, 0), (4, 4), delay=1)
+        new_graph.add_edge((4, 4), (3, 3))
+
+        replica = KytosGraph()
+        replica.graph = graph.copy()
+        delta = _graph_delta(graph, new_graph)
+        _apply_delta(replica, pickle.loads(pickle.dumps(delta)))
+        assert list(replica.graph.nodes(data=True)) == list(
+            new_graph.nodes(data=True)
+        )
+        assert [
+            (node, list(nbrs.items())) for node, nbrs in replica.graph.adjacency()
+        ] == [(node, list(nbrs.items())) for node, nbrs in new_graph.adjacency()]
+        for endpoint_a, endpoint_b in replica.graph.edges:
+            assert (
+                replica.graph[endpoint_a][endpoint_b]
+                is replica.graph[endpoint_b][endpoint_a]
+            )
+
+        reordered = nx.Graph()
+        reordered.add_nodes_from(reversed(list(graph)))
+        reordered.add_edges_from(graph.edges)
+        assert _graph_delta(graph, reordered) is None
+
+    def test_map_shut_down_executor(self):
+        """Test that the calls are retried when the executor is shut down."""
+        args = [("S1", "S2")]
+        expected = self.pool.map(self.graph, "k_shortest_paths", args)
+        executor = self.pool._executor
+        executor.shutdown()
+        assert self.pool.map(self.graph, "k_shortest_paths", args) == expected
+        assert self.pool._executor is not executor
+
+    def test_shortest_simple_paths(self):
+        """Test that the paths are the same as the networkx ones in order."""
+        self.graph.graph = nx.grid_2d_graph(5, 5)
+        for index, (_, _, data) in enumerate(self.graph.graph.edges(data=True)):
+            data["delay"] = index % 3
+            self.graph._set_weights(data)
+        for attribute in ("hop", "delay"):
+            weight = self.graph.spf_edge_data_cbs[attribute]
+            with self.subTest(attribute=attribute):
+                expected = nx.shortest_simple_paths(
+                    self.graph.graph, (0, 0), (4, 3), weight=weight
+                )
+                paths = shortest_simple_paths(
+                    self.pool, self.graph, (0, 0), (4, 3), weight=weight
+                )
+                assert list(islice(paths, 40)) == list(islice(expected, 40))
+
+    def test_shortest_simple_paths_max_cost(self):
+        """Test that only the paths up to a max cost are yielded in order."""
+        self.graph.graph = nx.grid_2d_graph(5, 5)
+        for index, (_, _, data) in enumerate(self.graph.graph.edges(data=True)):
+            data["delay"] = index % 3 + 1
+            self.graph._set_weights(data)
+        weight = self.graph.spf_edge_data_cbs["delay"]
+        expected = takewhile(
+            lambda path: self.graph._path_cost(path, "delay") <= 13,
+            nx.shortest_simple_paths(self.graph.graph, (0, 0), (4, 3), weight=weight),
+        )
+        paths = shortest_simple_paths(
+            None, self.graph, (0, 0), (4, 3), weight=weight, max_cost=13
+        )
+        assert list(paths) == list(expected)
@@ -0,0 +1,149 @@
+"""Test the search functions of search.py."""
+import random
+from unittest import TestCase
+
+import networkx as nx
+from networkx.algorithms.simple_paths import _bidirectional_dijkstra
+
+from napps.kytos.pathfinder import search
+
+
+class TestSearch(TestCase):
+    """Tests for the searches on materialized weights."""
+
+    def setUp(self):
+        """Execute steps before each tests."""
+        rand = random.Random(7)
+        self.graph = nx.gnm_random_graph(40, 90, seed=7)
+        for _, _, data in self.graph.edges(data=True):
+            data["delay_weight"] = rand.randint(1, 4)
+
+    def test_bidirectional_dijkstra(self):
+        """Test that the paths are the networkx ones, ties included."""
+        rand = random.Random(7)
+        for _ in range(200):
+            source, target = rand.sample(list(self.graph), 2)
+            ignore_nodes = set(rand.sample(list(self.graph), 3)) - {source}
+            ignore_edges = set(rand.sample(list(self.graph.edges), 5))
+            with self.subTest(source=source, target=target):
+                try:
+                    expected = _bidirectional_dijkstra(
+                        self.graph,
+                        source,
+                        target,
+                        weight="delay_weight",
+                        ignore_nodes=ignore_nodes,
+                        ignore_edges=ignore_edges,
+                    )
+                except nx.NetworkXNoPath:
+                    expected = None
+                try:
+                    found = search.bidirectional_dijkstra(
+                        self.graph,
+                        source,
+                        target,
+                        "delay_weight",
+                        ignore_nodes,
+                        ignore_edges,
+                    )
+                except nx.NetworkXNoPath:
+                    found = None
+                assert found == expected
+
+        assert search.bidirectional_dijkstra(self.graph, 0, 0, "delay_weight") == (
+            0,
+            [0],
+        )
+        with self.assertRaises(nx.NodeNotFound):
+            search.bidirectional_dijkstra(self.graph, "X", "X", "delay_weight")
+
+    def test_bidirectional_bfs(self):
+        """Test that the paths are the networkx ones of unit weights."""
+        for _, _, data in self.graph.edges(data=True):
+            data["hop_weight"] = 1
+        rand = random.Random(7)
+        for _ in range(200):
+            source, target = rand.sample(list(self.graph), 2)
+            ignore_nodes = set(rand.sample(list(self.graph), 3)) - {source}
+            ignore_edges = set(rand.sample(list(self.graph.edges), 5))
+            with self.subTest(source=source, target=target):
+                try:
+                    expected = _bidirectional_dijkstra(
+                        self.graph,
+                        source,
+                        target,
+                        weight="hop_weight",
+                        ignore_nodes=ignore_nodes,
+                        ignore_edges=ignore_edges,
+                    )
+                except nx.NetworkXNoPath:
+                    expected = None
+                try:
+                    found = search.bidirectional_bfs(
+                        self.graph, source, target, ignore_nodes, ignore_edges
+                    )
+                except nx.NetworkXNoPath:
+                    found = None
+                assert found == expected
+
+    def test_bidirectional_dial(self):
+        """Test that the paths are the networkx ones of integer weights."""
+        rand = random.Random(7)
+        for _, _, data in self.graph.edges(data=True):
+            data["delay_weight"] = rand.randint(0, 12)
+        for _ in range(200):
+            source, target = rand.sample(list(self.graph), 2)
+            ignore_nodes = set(rand.sample(list(self.graph), 3)) - {source}
+            ignore_edges = set(rand.sample(list(self.graph.edges), 5))
+            with self.subTest(source=source, target=target):
+                try:
+                    expected = _bidirectional_dijkstra(
+                        self.graph,
+                        source,
+                        target,
+                        weight="delay_weight",
+                        ignore_nodes=ignore_nodes,
+                        ignore_edges=ignore_edges,
+                    )
+                except nx.NetworkXNoPath:
+                    expected = None
+                try:
+                    found = search.bidirectional_dial(
+                        self.graph,
+                        source,
+                        target,
+                        "delay_weight",
+                        12,
+                        ignore_nodes,
+                        ignore_edges,
+                    )
+                except nx.NetworkXNoPath:
+                    found = None
+                assert found == expected
+
+    def test_shortest_path_tree(self):
+        """Test that the tree paths are the networkx ones unless tied."""
+        dists, preds, ties = search.shortest_path_tree(self.graph, 0, "delay_weight")
+        assert dists == nx.single_source_dijkstra_path_length(
+            self.graph, 0, weight="delay_weight"
+        )
+        for target in dists:
+            nodes = [target]
+            while preds[nodes[-1]] is not None:
+                nodes.append(preds[nodes[-1]])
+            shortest = list(
+                nx.all_shortest_paths(self.graph, 0, target, weight="delay_weight")
+            )
+            with self.subTest(target=target):
+                assert nodes[::-1] in shortest
+                if not ties.intersection(nodes):
+                    assert shortest == [nodes[::-1]]
+        assert any(
+            len(list(nx.all_shortest_paths(self.graph, 0, node, "delay_weight"))) > 1
+            for node in dists
+        )
+
+        dists, _, _ = search.shortest_path_tree(self.graph, 0, "delay_weight", 3)
+        assert dists == nx.single_source_dijkstra_path_length(
+            self.graph, 0, cutoff=3, weight="delay_weight"
+        )
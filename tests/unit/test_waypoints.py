@@ -0,0 +1,52 @@
+"""Test the waypoint paths of waypoints.py."""
+from random import Random
+from unittest import TestCase
+
+import networkx as nx
+from napps.kytos.pathfinder.graph import KytosGraph
+from napps.kytos.pathfinder.waypoints import waypoint_paths
+
+# pylint: disable=protected-access
+
+
+class TestWaypoints(TestCase):
+    """Tests for the paths through waypoint links."""
+
+    def setUp(self):
+        """Execute steps before each tests."""
+        self.kytos_graph = KytosGraph()
+
+    def test_waypoint_paths_brute_force(self):
+        """Test that waypoint paths are the best loopless ones through them."""
+        rng = Random(7)
+        for seed in range(100):
+            graph = nx.gnm_random_graph(8, 14, seed=seed)
+            for _, _, data in graph.edges(data=True):
+                data["delay"] = rng.randint(1, 5)
+            self.kytos_graph.graph = graph
+            self.kytos_graph._reset_indexes()
+            source, destination = rng.sample(list(graph), 2)
+            edges = list(graph.edges)
+            waypoints = rng.sample(edges, rng.randint(1, min(2, len(edges))))
+            expected = sorted(
+                self.kytos_graph._path_cost(path, "delay")
+                for path in nx.all_simple_paths(graph, source, destination)
+                if all(
+                    set(link) <= set(path)
+                    and abs(path.index(link[0]) - path.index(link[1])) == 1
+                    for link in waypoints
+                )
+            )
+            with self.subTest(seed=seed, waypoints=waypoints):
+                paths = waypoint_paths(
+                    self.kytos_graph,
+                    source,
+                    destination,
+                    waypoints,
+                    weight="delay",
+                    k=3,
+                )
+                for path in paths:
+                    assert len(set(path)) == len(path)
+                    assert all(graph.has_edge(*hop) for hop in zip(path, path[1:]))
+                assert [path.cost for path in paths] == expected[:3]
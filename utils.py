@@ -2,6 +2,19 @@
 # pylint: disable=unused-argument
 
 
+class Path(list):
+    """List of the hops of a path with the cost its search accumulated.
+
+    ``cost`` is the cost of the path weighed by the ``weight`` spf
+    attribute, or None if it is unknown.
+    """
+
+    def __init__(self, hops=(), cost=None, weight=None):
+        super().__init__(hops)
+        self.cost = cost
+        self.weight = weight
+
+
 def lazy_filter(filter_type, filter_func):
     """
     Lazy typed filter on top of the built-in function.
@@ -52,3 +65,8 @@ def filter_ge(metric):
 def filter_in(metric):
     """Lazy filter_in."""
     return lambda x: (lambda nx_edge_tup: x in nx_edge_tup[2].get(metric, {x}))
+
+
+def edge_key(endpoint_a, endpoint_b):
+    """Return an orientation independent key of an undirected edge."""
+    return frozenset((endpoint_a, endpoint_b))
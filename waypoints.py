@@ -0,0 +1,164 @@
+"""Waypoints module of kytos/pathfinder Kytos Network Application."""
+
+# pylint: disable=too-many-arguments,too-many-locals
+from bisect import insort
+from itertools import count, permutations, product
+
+from kytos.core import log
+from napps.kytos.pathfinder.utils import Path
+
+try:
+    import networkx as nx
+    from networkx.exception import NetworkXNoPath, NodeNotFound
+except ImportError:
+    PACKAGE = "networkx==2.5.1"
+    log.error(f"Package {PACKAGE} not found. Please 'pip install {PACKAGE}'")
+
+
+def waypoint_paths(
+    graph,
+    source,
+    destination,
+    waypoints,
+    weight="hop",
+    k=1,
+    max_cost=None,
+    **metrics,
+):
+    """Compute up to k shortest paths of a KytosGraph through waypoint links.
+
+    The ``waypoints`` are (endpoint_a, endpoint_b) links that every path
+    traverses, in any order and orientation. The paths are searched as
+    concatenations of the segments between consecutive waypoints, each
+    one avoiding the nodes already in the path, the endpoints of the
+    next waypoints and the destination, unless it's the last one, so
+    that the paths are loopless, and the orders and orientations that
+    would visit the source or the destination mid-path are skipped. The
+    paths are ranked by their ``weight`` attribute cost like
+    ``KytosGraph.path_cost_builder``.
+
+    The segments are enumerated in increasing cost order with a branch
+    and bound search: the waypoint orders are searched from the one with
+    the lowest cost bound, given by the distances of their segments on
+    their own, and a partial path is pruned once its cost plus the bound
+    of its remaining segments reaches the k-th best path found or
+    exceeds the ``max_cost``, if given. The ``mandatory_metrics`` and
+    ``excluded_links`` metrics filter the graph first, and the paths are
+    then returned with their metrics like the constrained ones.
+    """
+    # pylint: disable=protected-access
+    mandatory_metrics = metrics.get("mandatory_metrics", {})
+    constraints, first_pass = graph._first_pass(metrics)
+    view = graph._subgraph(first_pass) if constraints else graph.graph
+    if (
+        source not in view
+        or destination not in view
+        or not all(view.has_edge(*link) for link in waypoints)
+    ):
+        return []
+
+    def path_cost(path):
+        return graph._path_cost(path, weight=weight)
+
+    distances = {}
+
+    def distance(node, target):
+        if target not in distances:
+            distances[target] = nx.single_source_dijkstra_path_length(
+                view, target, weight=weight
+            )
+        return distances[target].get(node)
+
+    def bounds(links):
+        """Return the cost bounds of the segments from each link on."""
+        suffix, total = [], 0
+        starts = [source, *(endpoint_b for _, endpoint_b in links)]
+        targets = [*(endpoint_a for endpoint_a, _ in links), destination]
+        for i in range(len(links), -1, -1):
+            length = distance(starts[i], targets[i])
+            if length is None:
+                return None
+            if i < len(links):
+                total += path_cost(links[i])
+            suffix.append(total)
+            total += length
+        return [total, *reversed(suffix)]
+
+    best = []
+    order = count()
+
+    def pruned(cost):
+        if max_cost is not None and cost > max_cost:
+            return True
+        return len(best) == k and cost >= best[-1][0]
+
+    def extend(path, cost, links, suffix):
+        target = links[0][0] if links else destination
+        ignore_nodes = {destination}
+        for link in links:
+            ignore_nodes.update(link)
+        ignore_nodes.discard(target)
+        ignore_nodes.update(path[:-1])
+        for segment in _segment_paths(path[-1], target, weight, ignore_nodes, view):
+            segment_cost = cost + path_cost(segment)
+            if pruned(segment_cost + suffix[0]):
+                break
+            walk = path[:-1] + segment
+            if not links:
+                insort(best, (segment_cost, next(order), walk))
+                del best[k:]
+                continue
+            if links[0][1] in walk:
+                continue
+            extend(
+                walk + [links[0][1]],
+                segment_cost + path_cost(links[0]),
+                links[1:],
+                suffix[1:],
+            )
+
+    def loopless(links):
+        """Return whether the source and destination only end the path."""
+        last = len(links) - 1
+        return not any(
+            source in link
+            and (i, link[0]) != (0, source)
+            or destination in link
+            and (i, link[1]) != (last, destination)
+            for i, link in enumerate(links)
+        )
+
+    candidates = []
+    for links in permutations(waypoints):
+        for flips in product((False, True), repeat=len(links)):
+            oriented = [
+                tuple(link[::-1] if flip else link)
+                for link, flip in zip(links, flips)
+            ]
+            if not loopless(oriented):
+                continue
+            link_bounds = bounds(oriented)
+            if link_bounds is not None:
+                candidates.append((link_bounds[0], oriented, link_bounds[1:]))
+    candidates.sort(key=lambda candidate: candidate[0])
+    for lower_bound, oriented, suffix in candidates:
+        if pruned(lower_bound):
+            break
+        extend([source], 0, oriented, suffix)
+    paths = [Path(path, cost, weight) for cost, _, path in best]
+    if not constraints:
+        return paths
+    return [{"hops": path, "metrics": dict(mandatory_metrics)} for path in paths]
+
+
+def _segment_paths(start, target, weight, ignore_nodes, graph):
+    """Yield the shortest paths of a graph without some nodes in order."""
+    try:
+        yield from nx.shortest_simple_paths(
+            nx.restricted_view(graph, ignore_nodes, []),
+            start,
+            target,
+            weight=weight,
+        )
+    except (NodeNotFound, NetworkXNoPath):
+        pass